@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+"""Benchmark parsing price responses into date indexed DataFrames.
+
+Compares the previous date handling of get_dataframe (pandas.to_datetime
+inferring the format of every call, then tz_localize) against the current
+one, for daily and 1min data requested in csv and json. Responses are
+generated locally so that only the parsing cost is measured.
+
+Usage, from the repository root:
+    python -m benchmarks.bench_date_index [n_daily_rows n_minute_rows]
+"""
+
+import json
+import sys
+import timeit
+
+import pandas as pd
+
+from tiingo import TiingoClient
+from tiingo.api import get_stream_from_response
+from tiingo.restclient import build_response
+
+COLUMNS = ["close", "high", "low", "open", "volume"]
+
+
+def payloads(n, freq):
+    """Return the csv and json bodies of n bars at freq, as the API sends them"""
+    dates = pd.date_range("2010-01-04", periods=n, freq=freq, tz="UTC")
+    if freq == "D":
+        csv_dates = dates.strftime("%Y-%m-%d")
+        json_dates = dates.strftime("%Y-%m-%dT00:00:00.000Z")
+    else:
+        csv_dates = dates.strftime("%Y-%m-%d %H:%M:%S+00:00")
+        json_dates = dates.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+    rows = [[100.0 + i % 50, 101.5, 99.25, 100.5, 1000 + i] for i in range(n)]
+    csv = "date," + ",".join(COLUMNS) + "\n"
+    csv += "\n".join(
+        "{},{}".format(date, ",".join(map(str, row)))
+        for date, row in zip(csv_dates, rows)
+    )
+    records = [
+        dict(date=date, **dict(zip(COLUMNS, row)))
+        for date, row in zip(json_dates, rows)
+    ]
+    return {
+        "csv": csv.encode("utf-8"),
+        "json": json.dumps(records).encode("utf-8"),
+    }
+
+
+def previous(body, fmt):
+    """get_dataframe's parsing before the fast path"""
+    if fmt == "csv":
+        df = pd.read_csv(get_stream_from_response(build_response(200, body)))
+    else:
+        df = pd.DataFrame(json.loads(body))
+    df.set_index("date", inplace=True)
+    df.index = pd.to_datetime(df.index)
+    if df.index.tz is None:
+        df.index = df.index.tz_localize("UTC")
+    return df
+
+
+def current(client, body, fmt):
+    response = build_response(200, body)
+    return client._frame_from_response(response, None, {"format": fmt})
+
+
+def bench(fn):
+    number, total = timeit.Timer(fn).autorange()
+    return total / number
+
+
+def main(n_daily, n_minute):
+    client = TiingoClient({"api_key": "0" * 40, "json_decoder": "json"})
+    print(
+        "{:<8} {:<5} {:>9} {:>15} {:>15} {:>9}".format(
+            "data", "fmt", "rows", "previous (ms)", "current (ms)", "speedup"
+        )
+    )
+    for name, n, freq in (("daily", n_daily, "D"), ("1min", n_minute, "min")):
+        for fmt, body in payloads(n, freq).items():
+            expected = previous(body, fmt)
+            result = current(client, body, fmt)
+            assert (result.index == expected.index).all()
+            before = bench(lambda: previous(body, fmt)) * 1000
+            after = bench(lambda: current(client, body, fmt)) * 1000
+            print(
+                "{:<8} {:<5} {:>9} {:>15.2f} {:>15.2f} {:>8.1f}x".format(
+                    name, fmt, n, before, after, before / after
+                )
+            )
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:3]] or [5000, 300000]
+    main(*sizes)
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+"""Benchmark converting price records to objects for fmt="object".
+
+Compares the previous dict_to_object, which round-tripped every record through
+json and created a new namedtuple class per record, against the cached record
+types used now.
+
+Usage, from the repository root:
+    python -m benchmarks.bench_dict_to_object [n_bars]
+"""
+
+from collections import namedtuple
+import json
+import sys
+import time
+import tracemalloc
+
+from tiingo.api import dicts_to_objects
+
+
+def previous_dict_to_object(item, object_name):
+    fields = item.keys()
+    values = item.values()
+    return json.loads(
+        json.dumps(item), object_hook=lambda d: namedtuple(object_name, fields)(*values)
+    )
+
+
+def make_bars(n):
+    return [
+        {
+            "date": "2018-01-05T00:00:00.000Z",
+            "close": 1110.29 + i,
+            "high": 1113.58,
+            "low": 1053.02,
+            "open": 1053.02,
+            "volume": 5889084,
+            "adjClose": 1110.29,
+            "adjHigh": 1113.58,
+            "adjLow": 1053.02,
+            "adjOpen": 1053.02,
+            "adjVolume": 5889084,
+            "divCash": 0.0,
+            "splitFactor": 1.0,
+        }
+        for i in range(n)
+    ]
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def main(n):
+    bars = make_bars(n)
+    old_time, old_peak, old = measure(
+        lambda: [previous_dict_to_object(bar, "TickerPrice") for bar in bars]
+    )
+    new_time, new_peak, new = measure(lambda: dicts_to_objects(bars, "TickerPrice"))
+    assert [tuple(record) for record in old] == [tuple(record) for record in new]
+
+    print("{} bars".format(n))
+    print("{:>10} {:>10} {:>14}".format("", "time (s)", "peak (MiB)"))
+    print("{:>10} {:>10.3f} {:>14.1f}".format("previous", old_time, old_peak / 2**20))
+    print("{:>10} {:>10.3f} {:>14.1f}".format("cached", new_time, new_peak / 2**20))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
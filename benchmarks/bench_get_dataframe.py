@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+"""Benchmark assembling multi-ticker DataFrames in get_dataframe.
+
+Compares the previous approach (pd.concat inside the per-ticker loop) against
+the single-pass assembly used by TiingoClient.get_dataframe, with and without
+a pre-allocated date index. Network access is replaced by synthetic series so
+that only the assembly cost is measured.
+
+Usage, from the repository root:
+    python -m benchmarks.bench_get_dataframe [n_tickers ...]
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from tiingo import TiingoClient
+
+DATES = pd.date_range("2015-01-01", periods=1000, freq="B", tz="UTC")
+
+
+class SyntheticTiingoClient(TiingoClient):
+    """TiingoClient whose price requests return generated data."""
+
+    def __init__(self):
+        super(SyntheticTiingoClient, self).__init__({"api_key": "0" * 40})
+
+    def _request_pandas(self, ticker, metric_name, params):
+        # Each ticker covers a slightly different window, as listings do.
+        dates = DATES[int(ticker[1:]) % 50 :]
+        return pd.Series(np.random.random(len(dates)), index=dates, name=metric_name)
+
+
+def concat_in_loop(client, tickers):
+    prices = pd.DataFrame()
+    for stock in tickers:
+        ticker_series = client._request_pandas(stock, "adjClose", {})
+        ticker_series = ticker_series.rename(stock)
+        prices = pd.concat([prices, ticker_series], axis=1, sort=True)
+    return prices
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main(sizes):
+    client = SyntheticTiingoClient()
+    print(
+        "{:>8} {:>14} {:>14} {:>14}".format(
+            "tickers", "loop (s)", "single (s)", "index (s)"
+        )
+    )
+    for n in sizes:
+        tickers = ["T{}".format(i) for i in range(n)]
+        loop_time, expected = timed(lambda: concat_in_loop(client, tickers))
+        single_time, prices = timed(
+            lambda: client.get_dataframe(tickers, metric_name="adjClose")
+        )
+        index_time, _ = timed(
+            lambda: client.get_dataframe(tickers, metric_name="adjClose", index=DATES)
+        )
+        assert prices.shape == expected.shape
+        print(
+            "{:>8} {:>14.3f} {:>14.3f} {:>14.3f}".format(
+                n, loop_time, single_time, index_time
+            )
+        )
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1000, 5000])
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+"""Benchmark the JSON decoders available for config['json_decoder'].
+
+Decodes the response bodies recorded in tests/fixtures with every installed
+decoder. The recorded payloads are small, so list payloads are also repeated
+to n records to show the difference on large price and news responses.
+
+Usage, from the repository root:
+    python -m benchmarks.bench_json_decoders [n_records]
+"""
+
+import json
+import sys
+import timeit
+
+import yaml
+
+from tiingo.restclient import get_json_decoder
+
+FIXTURES = [
+    "ticker_price.yaml",
+    "ticker_price_with_date.yaml",
+    "intraday_price.yaml",
+    "news.yaml",
+    "crypto_price_history.yaml",
+    "fundamentals_daily.yaml",
+    "fundamentals_statements.yaml",
+]
+
+
+def load_body(fixture):
+    with open("tests/fixtures/{}".format(fixture)) as f:
+        cassette = yaml.safe_load(f)
+    body = cassette["interactions"][0]["response"]["body"]["string"]
+    return body.encode("utf-8") if isinstance(body, str) else body
+
+
+def repeat_records(body, n):
+    """Return a JSON list payload repeated to at least n records"""
+    records = json.loads(body)
+    if not isinstance(records, list) or not records:
+        return None
+    return json.dumps((records * (n // len(records) + 1))[:n]).encode("utf-8")
+
+
+def installed_decoders():
+    decoders = {"json": get_json_decoder("json")}
+    try:
+        decoders["orjson"] = get_json_decoder("orjson")
+    except Exception:
+        pass
+    try:
+        import simdjson
+
+        decoders["simdjson"] = get_json_decoder(simdjson.loads)
+    except ImportError:
+        pass
+    return decoders
+
+
+def bench(decoder, body):
+    number, total = timeit.Timer(lambda: decoder(body)).autorange()
+    return total / number
+
+
+def main(n):
+    decoders = installed_decoders()
+    payloads = []
+    for fixture in FIXTURES:
+        body = load_body(fixture)
+        payloads.append((fixture, body))
+        repeated = repeat_records(body, n)
+        if repeated is not None:
+            payloads.append(("{} x{}".format(fixture, n), repeated))
+
+    print(
+        "{:<42} {:>10}".format("payload", "size (KiB)")
+        + "".join("{:>12}".format(name + " (ms)") for name in decoders)
+    )
+    for name, body in payloads:
+        timings = [bench(decoder, body) * 1000 for decoder in decoders.values()]
+        print(
+            "{:<42} {:>10.1f}".format(name, len(body) / 1024)
+            + "".join("{:>12.3f}".format(timing) for timing in timings)
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
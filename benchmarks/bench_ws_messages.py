@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+"""Benchmark delivering websocket price updates to a consumer.
+
+Feeds generated IEX "A" messages through TiingoWebsocketClient's message
+handler, without a network connection, delivering them as raw strings
+decoded by the consumer (the previous behavior), as decoded dicts
+(parse=True) and in batches of records and columns.
+
+Usage, from the repository root:
+    python -m benchmarks.bench_ws_messages [n_messages]
+"""
+
+import json
+import sys
+import time
+from unittest import mock
+
+from tiingo.wsclient import TiingoWebsocketClient
+
+CONFIG = {"eventName": "subscribe", "authorization": "0" * 40}
+
+
+def messages(n):
+    return [
+        json.dumps(
+            {
+                "messageType": "A",
+                "service": "iex",
+                "data": [
+                    "T",
+                    "2019-01-30T13:33:45.594808294-05:00",
+                    1548873225594808294,
+                    "ticker{}".format(i % 500),
+                    None,
+                    None,
+                    None,
+                    None,
+                    None,
+                    100.0 + i % 7,
+                    100,
+                    0,
+                    0,
+                    0,
+                    0,
+                    0,
+                ],
+            }
+        )
+        for i in range(n)
+    ]
+
+
+def client(**kwargs):
+    with mock.patch.object(TiingoWebsocketClient, "start"):
+        return TiingoWebsocketClient(
+            CONFIG, endpoint="iex", blocking=False, heartbeat_timeout=None, **kwargs
+        )
+
+
+def bench(name, ws_client, msgs):
+    on_message = ws_client.get_on_msg_cb()
+    start = time.perf_counter()
+    for msg in msgs:
+        on_message(None, msg)
+    ws_client.close()
+    elapsed = time.perf_counter() - start
+    print("{:<22} {:>10.3f} {:>14.0f}".format(name, elapsed, len(msgs) / elapsed))
+
+
+def main(n):
+    msgs = messages(n)
+    prices = []
+
+    def raw(msg):
+        prices.append(json.loads(msg)["data"][9])
+
+    def parsed(msg):
+        prices.append(msg["data"][9])
+
+    def records(batch):
+        prices.extend(update.lastPrice for update in batch)
+
+    def columns(batch):
+        prices.extend(batch["lastPrice"])
+
+    print("{:<22} {:>10} {:>14}".format("delivery", "time (s)", "messages/s"))
+    bench("raw + json.loads", client(on_msg_cb=raw), msgs)
+    bench("parse=True", client(on_msg_cb=parsed, parse=True), msgs)
+    bench(
+        "batches of records",
+        client(on_msg_cb=records, batch_size=1000),
+        msgs,
+    )
+    bench(
+        "batches of columns",
+        client(on_msg_cb=columns, batch_size=1000, batch_format="columns"),
+        msgs,
+    )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
@@ -54,7 +54,13 @@ setup(
     packages=find_packages(include=[NAME]),
     include_package_data=True,
     install_requires=requirements,
-    extras_require={'pandas': ['pandas>=0.18']},
+    extras_require={
+        'pandas': ['pandas>=0.18'],
+        'async': ['aiohttp'],
+        'numpy': ['numpy'],
+        'arrow': ['pyarrow'],
+        'orjson': ['orjson'],
+    },
     license="MIT license",
     zip_safe=False,
     keywords=['tiingo', 'finance', 'stocks', 'rest'],
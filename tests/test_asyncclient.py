@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+"""Tests for the asyncio client, replaying the TiingoClient fixtures."""
+
+import asyncio
+import json
+from unittest import TestCase, mock
+
+import vcr
+
+from tiingo import AsyncTiingoClient
+from tiingo.asyncclient import aiohttp_is_installed
+from tiingo.restclient import RestClientError, build_response
+
+try:
+    import pandas as pd
+    pandas_is_installed = True
+except ImportError:
+    pandas_is_installed = False
+
+
+class TestAsyncTiingoClient(TestCase):
+
+    def setUp(self):
+        if not aiohttp_is_installed:
+            self.skipTest("test_asyncclient: aiohttp not installed.")
+
+    def run_client(self, method, *args, **kwargs):
+        async def run():
+            async with AsyncTiingoClient() as client:
+                return await getattr(client, method)(*args, **kwargs)
+        return asyncio.run(run())
+
+    def test_client_repr(self):
+        client = AsyncTiingoClient()
+        assert repr(client) == '<AsyncTiingoClient(url="https://api.tiingo.com")>'
+
+    @vcr.use_cassette('tests/fixtures/ticker_metadata.yaml')
+    def test_ticker_metadata_as_object(self):
+        metadata = self.run_client("get_ticker_metadata", "GOOGL", fmt="object")
+        assert metadata.ticker == "GOOGL"
+
+    @vcr.use_cassette('tests/fixtures/ticker_metadata.yaml')
+    def test_tickers_metadata(self):
+        metadata = self.run_client("get_tickers_metadata", ["GOOGL"], fields=["name"])
+        assert metadata["GOOGL"]["name"].startswith("Alphabet")
+
+    @vcr.use_cassette('tests/fixtures/ticker_price_weekly.yaml')
+    def test_ticker_price(self):
+        prices = self.run_client("get_ticker_price", "GOOGL", startDate='2018-01-05',
+                                 endDate='2018-01-19', frequency='weekly')
+        assert len(prices) == 3
+        assert prices[0].get('adjClose')
+
+    @vcr.use_cassette('tests/fixtures/news.yaml')
+    def test_get_news_articles(self):
+        articles = self.run_client("get_news", tickers=["aapl", "googl"],
+                                   tags=["Technology", "Bitcoin"],
+                                   startDate="2016-01-01", endDate="2017-08-31",
+                                   sources=['cnbc.com', 'altcointoday.com'], limit=1)
+        assert len(articles) == 1
+
+    @vcr.use_cassette('tests/fixtures/news.yaml')
+    def test_iter_news(self):
+        async def run():
+            async with AsyncTiingoClient() as client:
+                return [article async for article in client.iter_news(
+                    tickers=["aapl", "googl"], tags=["Technology", "Bitcoin"],
+                    startDate="2016-01-01", endDate="2017-08-31",
+                    sources=['cnbc.com', 'altcointoday.com'], limit=1,
+                    prefetch=0, max_articles=1)]
+        assert len(asyncio.run(run())) == 1
+
+    @vcr.use_cassette('tests/fixtures/news_bulk.yaml')
+    def test_get_news_bulk(self):
+        with self.assertRaises(RestClientError):
+            self.run_client("get_bulk_news", file_id="1")
+
+    @vcr.use_cassette('tests/fixtures/crypto_metadata.yaml')
+    def test_crypto_metadata(self):
+        metadata = self.run_client("get_crypto_metadata", tickers=['btcusd', 'fldcbtc'])
+        assert [item['ticker'] for item in metadata] == ['btcusd', 'fldcbtc']
+
+    @vcr.use_cassette('tests/fixtures/fundamentals_daily_csv.yaml')
+    def test_fundamentals_daily_csv(self):
+        daily = self.run_client("get_fundamentals_daily", "GOOGL", startDate='2020-1-1',
+                                endDate='2020-4-1', fmt='csv')
+        assert len(daily) > 1
+
+    @vcr.use_cassette('tests/fixtures/ticker_price_pandas_weekly_multiple_tickers.yaml')
+    def test_get_dataframe_multiple(self):
+        if not pandas_is_installed:
+            self.skipTest("test_asyncclient: Pandas not installed.")
+        tickers = ["GOOGL", "AAPL"]
+        prices = self.run_client("get_dataframe", tickers, startDate='2018-01-05',
+                                 endDate='2018-01-19', metric_name='adjClose',
+                                 frequency='weekly')
+        assert list(prices.columns) == tickers
+        assert len(prices.index) == 3
+
+
+class TestAsyncIntradayWindows(TestCase):
+
+    def setUp(self):
+        if not aiohttp_is_installed:
+            self.skipTest("test_asyncclient: aiohttp not installed.")
+        self.requested = []
+
+    async def fake_fetch(self, method, url, headers=None):
+        # One bar at the end of each window, and none in the first window
+        params = dict(part.split("=") for part in url.split("?")[1].split("&"))
+        self.requested.append((params['startDate'], params['endDate']))
+        if params['startDate'] == '2018-01-01':
+            bars = []
+        else:
+            bars = [{"date": params['endDate'] + "T14:30:00.000Z", "close": 1.0}]
+        return build_response(200, json.dumps(bars).encode('utf-8'))
+
+    def run_client(self, method, *args, **kwargs):
+        async def run():
+            async with AsyncTiingoClient({'intraday_max_bars': 2880}) as client:
+                with mock.patch.object(client, '_fetch', side_effect=self.fake_fetch):
+                    return await getattr(client, method)(*args, **kwargs)
+        return asyncio.run(run())
+
+    def test_ticker_price_is_stitched(self):
+        prices = self.run_client("get_ticker_price", "GOOGL", startDate="2018-01-01",
+                                 endDate="2018-01-06", frequency="1min")
+        assert sorted(self.requested) == [("2018-01-01", "2018-01-02"),
+                                          ("2018-01-03", "2018-01-04"),
+                                          ("2018-01-05", "2018-01-06")]
+        assert [bar['date'][:10] for bar in prices] == ["2018-01-04", "2018-01-06"]
+
+    def test_dataframe_is_stitched(self):
+        if not pandas_is_installed:
+            self.skipTest("test_asyncclient: Pandas not installed.")
+        prices = self.run_client("get_dataframe", "GOOGL", startDate="2018-01-01",
+                                 endDate="2018-01-06", metric_name="close",
+                                 frequency="1min")
+        assert len(self.requested) == 3
+        assert [str(date.date()) for date in prices.index] == ["2018-01-04", "2018-01-06"]
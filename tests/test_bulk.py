@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+"""Tests for downloading and reading bulk news files."""
+
+import gzip
+import hashlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import zipfile
+from unittest import TestCase, mock
+
+from requests.exceptions import ChunkedEncodingError
+
+from tiingo import TiingoClient
+from tiingo.bulk import download_file, iter_json_values
+from tiingo.exceptions import ChecksumMismatchError
+from tiingo.restclient import build_response
+
+ARTICLES = [{"id": i, "title": "Article {}".format(i), "tickers": ["aapl"]}
+            for i in range(500)]
+CONTENT = gzip.compress(json.dumps(ARTICLES).encode())
+MD5 = "md5:" + hashlib.md5(CONTENT).hexdigest()
+
+
+class FakeFileServer(object):
+    """Serve CONTENT, honoring Range requests, optionally dropping the
+    connection after the first drop_after bytes"""
+
+    def __init__(self, drop_after=None):
+        self.drop_after = drop_after
+        self.ranges = []
+
+    def get(self, url, headers=None, stream=False):
+        start = 0
+        if headers and "Range" in headers:
+            start = int(headers["Range"][len("bytes="):-1])
+        self.ranges.append(start)
+        if start >= len(CONTENT):
+            return build_response(416, b"")
+
+        body = CONTENT[start:]
+        if self.drop_after is not None:
+            self.drop_after, drop_after = None, self.drop_after
+            response = build_response(200, body[:drop_after])
+            chunks = response.iter_content
+
+            def iter_content(chunk_size=1):
+                yield from chunks(chunk_size)
+                raise ChunkedEncodingError("Connection broken: IncompleteRead")
+            response.iter_content = iter_content
+            return response
+
+        if start:
+            return build_response(206, body, {
+                "Content-Range": "bytes {}-{}/{}".format(start, len(CONTENT) - 1,
+                                                          len(CONTENT))})
+        return build_response(200, body, {"Content-Length": str(len(CONTENT))})
+
+
+class TestDownloadFile(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "news.json.gz")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def read(self):
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    def test_download_and_verify(self):
+        download_file(FakeFileServer(), "https://example.com/f", self.path,
+                      checksum=MD5, chunk_size=1000)
+        assert self.read() == CONTENT
+        assert not os.path.exists(self.path + ".part")
+
+    def test_resume_dropped_download(self):
+        server = FakeFileServer(drop_after=1000)
+        download_file(server, "https://example.com/f", self.path, checksum=MD5,
+                      chunk_size=100)
+        assert server.ranges == [0, 1000]
+        assert self.read() == CONTENT
+
+    def test_resume_partial_file(self):
+        with open(self.path + ".part", "wb") as f:
+            f.write(CONTENT[:500])
+        server = FakeFileServer()
+        download_file(server, "https://example.com/f", self.path)
+        assert server.ranges == [500]
+        assert self.read() == CONTENT
+
+    def test_checksum_mismatch(self):
+        with self.assertRaises(ChecksumMismatchError):
+            download_file(FakeFileServer(), "https://example.com/f", self.path,
+                          checksum="md5:0123")
+        assert not os.path.exists(self.path)
+        assert not os.path.exists(self.path + ".part")
+
+
+class TestIterJsonValues(TestCase):
+
+    def test_array_and_json_lines(self):
+        raw = json.dumps(ARTICLES).encode()
+        assert list(iter_json_values(io.BytesIO(raw), chunk_size=7)) == ARTICLES
+        lines = "\n".join(json.dumps(article) for article in ARTICLES).encode()
+        assert list(iter_json_values(io.BytesIO(lines), chunk_size=7)) == ARTICLES
+
+    def test_values_larger_than_chunks(self):
+        values = [{"body": "x" * 5000}, 12345, "text", [1, [2]], {"a": "],["}]
+        raw = json.dumps(values).encode()
+        assert list(iter_json_values(io.BytesIO(raw), chunk_size=3)) == values
+
+
+class TestBulkNews(TestCase):
+
+    def setUp(self):
+        self._client = TiingoClient()
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_download_and_iterate(self):
+        metadata = {"id": 1, "url": "https://example.com/files/news_1.json.gz",
+                    "md5": MD5.split(":")[1]}
+        with mock.patch.object(self._client, "get_bulk_news", return_value=metadata), \
+                mock.patch.object(self._client, "_session", FakeFileServer()):
+            path = self._client.download_bulk_news(1, self.directory)
+        assert path == os.path.join(self.directory, "news_1.json.gz")
+
+        articles = self._client.iter_bulk_news(path, fmt="object")
+        assert next(articles).title == "Article 0"
+        assert sum(1 for _ in articles) == len(ARTICLES) - 1
+
+    def test_iterate_zip(self):
+        path = os.path.join(self.directory, "news.zip")
+        with zipfile.ZipFile(path, "w") as archive:
+            archive.writestr("news.json", json.dumps(ARTICLES))
+        assert list(self._client.iter_bulk_news(path)) == ARTICLES
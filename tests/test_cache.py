@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+"""Tests for the on-disk response cache."""
+
+import shutil
+import tempfile
+from unittest import TestCase
+
+import vcr
+
+from tiingo import TiingoClient
+from tiingo.cache import ResponseCache
+
+
+class TestResponseCache(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = ResponseCache(self.directory, max_size=100)
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.directory)
+
+    def test_key_ignores_param_order(self):
+        url = "https://api.tiingo.com/tiingo/daily/GOOGL/prices"
+        key = self.cache.key("GET", url, {"startDate": "2018-01-05", "format": "json"})
+        assert key == self.cache.key("GET", url, {"format": "json",
+                                                  "startDate": "2018-01-05",
+                                                  "endDate": None})
+        assert key != self.cache.key("GET", url, {"format": "csv"})
+
+    def test_ttl_for_closed_and_open_ranges(self):
+        assert self.cache.ttl_for("tiingo/daily/GOOGL/prices",
+                                  {"endDate": "2018-01-19"}) is None
+        assert self.cache.ttl_for("iex/GOOGL/prices",
+                                  {"endDate": "2999-01-01"}) == self.cache.ttl
+        assert self.cache.ttl_for("tiingo/daily/GOOGL/prices") == self.cache.ttl
+        assert self.cache.ttl_for("tiingo/news", {"endDate": "2018-01-19"}) == self.cache.ttl
+
+    def test_ttl_per_endpoint(self):
+        cache = ResponseCache(self.directory, ttls={r"tiingo/daily/[^/]+$": 86400,
+                                                   r"tiingo/news": 0})
+        assert cache.ttl_for("tiingo/daily/GOOGL") == 86400
+        assert cache.ttl_for("tiingo/daily/GOOGL/prices") == cache.ttl
+        cache.set("news", 200, {}, b"[]", cache.ttl_for("tiingo/news"))
+        assert cache.get("news") is None
+        cache.close()
+
+    def test_hit_and_miss_counters(self):
+        assert self.cache.get("a") is None
+        self.cache.set("a", 200, {"Content-Type": "application/json"}, b"[1]")
+        assert self.cache.get("a") == (200, {"Content-Type": "application/json"}, b"[1]")
+        stats = self.cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["entries"] == 1
+        assert stats["size"] == 3
+
+    def test_expired_entries_are_misses(self):
+        self.cache.set("a", 200, {}, b"[1]", ttl=-1)
+        assert self.cache.get("a") is None
+        assert self.cache.stats()["entries"] == 0
+
+    def test_lru_eviction(self):
+        self.cache.set("a", 200, {}, b"a" * 40)
+        self.cache.set("b", 200, {}, b"b" * 40)
+        self.cache.get("a")  # b is now the least recently used
+        self.cache.set("c", 200, {}, b"c" * 40)
+        assert self.cache.get("b") is None
+        assert self.cache.get("a") is not None
+        assert self.cache.get("c") is not None
+        assert self.cache.evictions == 1
+
+    def test_persists_across_instances(self):
+        self.cache.set("a", 200, {}, b"[1]")
+        cache = ResponseCache(self.directory)
+        assert cache.get("a") == (200, {}, b"[1]")
+        cache.close()
+
+
+class TestTiingoClientWithCache(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self._client = TiingoClient({"cache": self.directory})
+
+    def tearDown(self):
+        self._client.close()
+        shutil.rmtree(self.directory)
+
+    @vcr.use_cassette('tests/fixtures/ticker_price_weekly.yaml')
+    def test_repeated_requests_hit_cache(self):
+        # The cassette holds a single response, so a second network call would fail.
+        for _ in range(3):
+            prices = self._client.get_ticker_price("GOOGL", startDate='2018-01-05',
+                                                   endDate='2018-01-19', frequency='weekly')
+            assert len(prices) == 3
+        stats = self._client._cache.stats()
+        assert stats["misses"] == 1
+        assert stats["hits"] == 2
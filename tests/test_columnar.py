@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+"""Tests for the columnar (numpy and arrow) price formats."""
+
+import io
+from unittest import TestCase
+
+import vcr
+
+from tiingo import TiingoClient
+from tiingo.columnar import (arrow_table_from_csv, numpy_columns_from_csv,
+                             numpy_is_installed, pyarrow_is_installed)
+
+try:
+    import numpy as np
+except ImportError:
+    pass
+
+
+class TestNumpyFormat(TestCase):
+
+    def setUp(self):
+        if not numpy_is_installed:
+            self.skipTest("test_columnar: numpy not installed.")
+        self._client = TiingoClient()
+
+    @vcr.use_cassette('tests/fixtures/ticker_price_with_date_csv.yaml')
+    def test_ticker_price_numpy(self):
+        prices = self._client.get_ticker_price("GOOGL", startDate="2015-01-01",
+                                               endDate="2015-01-05", fmt='numpy')
+        assert prices['date'].dtype == np.dtype('datetime64[ns]')
+        assert prices['date'][0] == np.datetime64('2015-01-02')
+        assert prices['close'].dtype == np.float64
+        assert prices['close'][0] == 529.55
+        assert prices['volume'].dtype == np.int64
+        assert len(prices['volume']) == 2
+
+    def test_intraday_dates_are_utc(self):
+        body = (b"date,close,volume\n"
+                b"2018-01-02T14:30:00.000Z,1.5,10\n"
+                b"2018-01-02T15:00:00.000Z,2.5,\n")
+        prices = numpy_columns_from_csv(io.BytesIO(body))
+        assert prices['date'][0] == np.datetime64('2018-01-02T14:30:00')
+        assert prices['date'][1] == np.datetime64('2018-01-02T15:00:00')
+        # A missing volume falls back to float64 with NaN
+        assert prices['volume'].dtype == np.float64
+        assert np.isnan(prices['volume'][1])
+
+    def test_dates_with_offsets_are_converted_to_utc(self):
+        body = (b"date,close\n"
+                b"2018-01-02 09:30:00-05:00,1.5\n"
+                b"2018-01-02 10:00:00-05:00,2.5\n")
+        prices = numpy_columns_from_csv(io.BytesIO(body))
+        assert prices['date'][0] == np.datetime64('2018-01-02T14:30:00')
+        assert prices['date'][1] == np.datetime64('2018-01-02T15:00:00')
+
+    def test_empty_response(self):
+        assert numpy_columns_from_csv(io.BytesIO(b"")) == {}
+
+
+class TestArrowFormat(TestCase):
+
+    def setUp(self):
+        if not pyarrow_is_installed:
+            self.skipTest("test_columnar: pyarrow not installed.")
+        self._client = TiingoClient()
+
+    @vcr.use_cassette('tests/fixtures/ticker_price_with_date_csv.yaml')
+    def test_ticker_price_arrow(self):
+        import pyarrow as pa
+        prices = self._client.get_ticker_price("GOOGL", startDate="2015-01-01",
+                                               endDate="2015-01-05", fmt='arrow')
+        assert prices.num_rows == 2
+        assert prices.schema.field('date').type == pa.timestamp('ns', tz='UTC')
+        assert prices.schema.field('close').type == pa.float64()
+        assert prices.schema.field('volume').type == pa.int64()
+
+    def test_empty_response_is_typed(self):
+        import pyarrow as pa
+        table = arrow_table_from_csv(io.BytesIO(b"date,open,close,volume\n"))
+        assert table.num_rows == 0
+        assert table.schema.field('date').type == pa.timestamp('ns', tz='UTC')
+        assert table.schema.field('open').type == pa.float64()
+        assert table.schema.field('close').type == pa.float64()
+        assert table.schema.field('volume').type == pa.int64()
+
+    def test_whole_prices_are_float(self):
+        import pyarrow as pa
+        table = arrow_table_from_csv(io.BytesIO(b"date,close,volume\n2018-01-02,100,10\n"))
+        assert table.schema.field('close').type == pa.float64()
+        assert table.schema.field('volume').type == pa.int64()
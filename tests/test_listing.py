@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+"""Tests for the cached and indexed supported tickers listing."""
+
+import io
+import shutil
+import tempfile
+import zipfile
+from unittest import TestCase, mock
+
+import vcr
+
+from tiingo import TiingoClient
+from tiingo.listing import ListingCache, TickerListing, pandas_is_installed
+from tiingo.restclient import build_response
+
+LISTING_CSV = (
+    "ticker,exchange,assetType,priceCurrency,startDate,endDate\n"
+    "AAPL,NASDAQ,Stock,USD,1980-12-12,2019-10-18\n"
+    "SPY,NYSE ARCA,ETF,USD,1993-01-29,2019-10-18\n"
+    "VFIAX,NMFQS,Mutual Fund,USD,2000-11-13,2019-10-18\n"
+    "GOOGL,NASDAQ,Stock,USD,2004-08-19,2019-10-18\n"
+    "AAPL,BATS,Stock,USD,2010-01-04,2012-01-04\n"
+    "000003,SHE,Stock,CNY,,\n"
+)
+
+
+def listing_zip():
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("supported_tickers.csv", LISTING_CSV)
+    return buffer.getvalue()
+
+
+class TestTickerListing(TestCase):
+
+    def setUp(self):
+        self.listing = TickerListing.from_zip(listing_zip())
+
+    def test_lookup_by_ticker(self):
+        assert len(self.listing) == 6
+        assert "aapl" in self.listing
+        assert self.listing.get("AAPL")["exchange"] == "NASDAQ"
+        assert [row["exchange"] for row in self.listing.lookup("AAPL")] == ["NASDAQ", "BATS"]
+        assert self.listing.get("ZZZZ") is None
+
+    def test_by_exchange_and_asset_type(self):
+        assert [row["ticker"] for row in self.listing.by_exchange("NASDAQ")] == ["AAPL", "GOOGL"]
+        tickers = [row["ticker"] for row in self.listing.by_asset_type("ETF", "Stock")]
+        assert tickers == ["AAPL", "SPY", "GOOGL", "AAPL", "000003"]
+
+    def test_covering(self):
+        rows = self.listing.covering("2005-01-03", "2015-01-02")
+        assert sorted(row["ticker"] for row in rows) == ["AAPL", "GOOGL", "SPY", "VFIAX"]
+        assert [row["exchange"] for row in self.listing.covering("2011-01-03")
+                if row["ticker"] == "AAPL"] == ["NASDAQ", "BATS"]
+
+    def test_rows_are_dict_like(self):
+        row = self.listing[1]
+        assert row == {"ticker": "SPY", "exchange": "NYSE ARCA", "assetType": "ETF",
+                       "priceCurrency": "USD", "startDate": "1993-01-29",
+                       "endDate": "2019-10-18"}
+        assert row.get("exchange") == "NYSE ARCA"
+        assert list(self.listing)[-1]["startDate"] == ""
+        assert self.listing[-1]["ticker"] == "000003"
+        dicts = self.listing.to_dicts()
+        assert dicts == [dict(row) for row in self.listing]
+        dicts[0]["ticker"] = "CHANGED"
+        assert self.listing[0]["ticker"] == "AAPL"
+
+    def test_from_dicts_with_other_date_formats(self):
+        listing = TickerListing([
+            {"ticker": "A", "exchange": "NYSE", "assetType": "Stock",
+             "startDate": "7/31/2007", "endDate": "10/18/2019"},
+            {"ticker": "B", "exchange": "NYSE", "assetType": "Stock",
+             "startDate": "2010-01-04", "endDate": "2019-10-18"},
+        ])
+        assert listing.get("A")["startDate"] == "7/31/2007"
+        assert [row["ticker"] for row in listing.covering("2008-01-02")] == ["A"]
+
+    def test_to_dataframe(self):
+        if not pandas_is_installed:
+            self.skipTest("test_listing: Pandas not installed.")
+        df = self.listing.to_dataframe()
+        assert list(df.columns) == self.listing.columns
+        assert df["exchange"].dtype == "category"
+        assert list(df["assetType"].cat.categories) == ["Stock", "ETF", "Mutual Fund"]
+        assert str(df["startDate"][0].date()) == "1980-12-12"
+        assert df["endDate"].isna().sum() == 1
+
+
+class TestListingCache(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_conditional_revalidation(self):
+        cache = ListingCache(self.directory, max_age=0)
+        assert cache.request_headers() == {}
+        cache.update(build_response(200, listing_zip(),
+                                    {"ETag": '"abc"', "Last-Modified": "Sun, 20 Oct 2019"}))
+        listing = cache.get_listing()
+        assert cache.request_headers() == {"If-None-Match": '"abc"',
+                                           "If-Modified-Since": "Sun, 20 Oct 2019"}
+        cache.update(build_response(304, b""))
+        assert cache.get_listing() is listing
+
+        # A new process reuses the file kept on disk
+        cache = ListingCache(self.directory)
+        assert cache.is_fresh()
+        assert cache.get_listing().get("SPY")["assetType"] == "ETF"
+
+    def test_listing_downloaded_once(self):
+        client = TiingoClient()
+        response = build_response(200, listing_zip(), {"ETag": '"abc"'})
+        with mock.patch.object(client._session, "get", return_value=response) as get:
+            assert len(client.list_stock_tickers()) == 4
+            assert len(client.list_etf_tickers()) == 1
+            assert len(client.list_tickers()) == 6
+        assert get.call_count == 1
+
+    @vcr.use_cassette('tests/fixtures/list_all_tickers.yaml')
+    def test_get_ticker_listing(self):
+        listing = TiingoClient().get_ticker_listing()
+        assert listing.get("GOOGL")["assetType"] == "Stock"
+        assert all(row["exchange"] == "NYSE" for row in listing.by_exchange("NYSE"))
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+"""Tests for the client-side rate limiter."""
+
+import asyncio
+import os
+import shutil
+import tempfile
+import threading
+import time
+from unittest import TestCase, mock
+
+from tiingo import TiingoClient
+from tiingo.ratelimit import RateLimiter, fcntl
+from tiingo.restclient import build_response
+
+
+class TestRateLimiter(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_burst_up_to_budget_then_wait(self):
+        limiter = RateLimiter(per_hour=3, per_day=100)
+        assert [limiter.try_acquire() for _ in range(3)] == [0, 0, 0]
+        wait = limiter.try_acquire()
+        # One token of an hourly budget of 3 refills in 20 minutes
+        assert 1199 < wait <= 1200
+        assert limiter.remaining() == {"hour": 0, "day": 97}
+        assert limiter.requests == 3
+
+    def test_acquire_timeout(self):
+        limiter = RateLimiter(per_day=1)
+        assert limiter.acquire(timeout=0)
+        assert not limiter.acquire(timeout=1)
+
+    def test_acquire_sleeps_until_refilled(self):
+        limiter = RateLimiter(per_hour=3600)
+        limiter._state["tokens"]["hour"] = 0.5
+        with mock.patch("tiingo.ratelimit.time.sleep") as sleep:
+            sleep.side_effect = lambda seconds: limiter._state["tokens"].update(
+                hour=1.0
+            )
+            assert limiter.acquire()
+        assert 0.49 < sleep.call_args[0][0] <= 0.5
+        assert limiter.waited == sleep.call_args[0][0]
+
+    def test_thread_safe(self):
+        limiter = RateLimiter(per_hour=100)
+        results = []
+
+        def take():
+            for _ in range(30):
+                results.append(limiter.try_acquire() == 0)
+
+        threads = [threading.Thread(target=take) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert results.count(True) == 100
+        assert limiter.requests == 100
+
+    def test_acquire_async(self):
+        limiter = RateLimiter(per_hour=3600)
+        assert asyncio.run(limiter.acquire_async())
+        assert limiter.remaining() == {"hour": 3599}
+
+    def test_shared_state_file(self):
+        path = os.path.join(self.directory, "quota.json")
+        first = RateLimiter(per_hour=2, state_file=path)
+        second = RateLimiter(per_hour=2, state_file=path)
+        assert first.try_acquire() == 0
+        assert second.try_acquire() == 0
+        assert first.try_acquire() > 0
+        assert second.remaining() == {"hour": 0}
+
+    def test_acquire_async_with_locked_state_file(self):
+        if fcntl is None:
+            self.skipTest("test_ratelimit: fcntl not available.")
+        path = os.path.join(self.directory, "quota.json")
+        limiter = RateLimiter(per_hour=3600, state_file=path)
+        ticks = []
+        released = []
+
+        def release(f):
+            released.append(time.monotonic())
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+        async def tick():
+            while len(ticks) < 5:
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.01)
+
+        async def main():
+            # Another process holds the lock while the event loop keeps running
+            with open(path, "a+") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                threading.Timer(0.2, release, (f,)).start()
+                acquired, _ = await asyncio.gather(limiter.acquire_async(), tick())
+            return acquired
+
+        assert asyncio.run(main())
+        # Every tick ran while the lock was held
+        assert len(ticks) == 5 and ticks[-1] < released[0]
+        assert limiter.remaining() == {"hour": 3599}
+
+    def test_state_file_requires_fcntl(self):
+        path = os.path.join(self.directory, "quota.json")
+        with mock.patch("tiingo.ratelimit.fcntl", None):
+            with self.assertRaises(RuntimeError):
+                RateLimiter(per_hour=2, state_file=path)
+
+
+class TestRestClientRateLimit(TestCase):
+
+    def test_requests_take_from_budget(self):
+        client = TiingoClient({"rate_limit": {"per_hour": 10}})
+        with mock.patch.object(client._session, "request",
+                               return_value=build_response(200, b"{}")):
+            client.get_ticker_metadata("GOOGL")
+            client.get_ticker_metadata("AAPL")
+        assert client.remaining_quota() == {"hour": 8}
+
+    def test_no_rate_limit_by_default(self):
+        assert TiingoClient().remaining_quota() is None
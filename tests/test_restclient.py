@@ -2,11 +2,13 @@
 # @Author: Cameron Yick
 
 
-from unittest import TestCase
+from unittest import TestCase, mock
 
+import requests
 import vcr
 
-from tiingo.restclient import (RestClient, RestClientError)
+from tiingo.restclient import (RestClient, RestClientError, build_response,
+                               get_json_decoder, orjson_is_installed)
 
 # Tests of basic REST API functionality
 BASE_URL = "http://www.google.com"
@@ -84,3 +86,66 @@ class TestRestClientWithSession(TestCase):
                 vcr.use_cassette('tests/fixtures/invalid_url.yaml'):
             # Should return 404 error
             self._client._request('GET', "bing_is_great")
+
+
+# Check the pooled session is configured from the client config
+class TestRestClientSessionConfig(TestCase):
+
+    def test_pooled_session_by_default(self):
+        client = RestClient()
+        self.assertIsInstance(client._session, requests.Session)
+
+    def test_session_disabled(self):
+        client = RestClient({'session': False})
+        self.assertIs(client._session, requests)
+
+    def test_existing_session_is_reused(self):
+        session = requests.Session()
+        with mock.patch.object(session, 'close') as close:
+            with RestClient({'session': session}) as client:
+                self.assertIs(client._session, session)
+        close.assert_not_called()
+
+    def test_pool_config(self):
+        client = RestClient({'pool_connections': 2, 'pool_maxsize': 32,
+                             'keep_alive': False, 'gzip': False})
+        adapter = client._session.get_adapter(BASE_URL)
+        self.assertEqual(adapter._pool_connections, 2)
+        self.assertEqual(adapter._pool_maxsize, 32)
+        self.assertEqual(client._session.headers['Connection'], 'close')
+        self.assertEqual(client._session.headers['Accept-Encoding'], 'identity')
+
+    def test_pool_size_follows_max_workers(self):
+        client = RestClient({'max_workers': 50})
+        adapter = client._session.get_adapter(BASE_URL)
+        self.assertEqual(adapter._pool_maxsize, 50)
+
+    def test_context_manager_closes_session(self):
+        with mock.patch.object(requests.Session, 'close') as close:
+            with RestClient():
+                pass
+        close.assert_called_once_with()
+
+
+class TestJsonDecoder(TestCase):
+
+    def test_default_decoder(self):
+        decoder = get_json_decoder()
+        if orjson_is_installed:
+            import orjson
+            self.assertIs(decoder, orjson.loads)
+        self.assertEqual(decoder(b'{"a": [1, 2.5, "\\u00e9"]}'), {"a": [1, 2.5, "\u00e9"]})
+
+    def test_named_and_custom_decoders(self):
+        import json
+        self.assertIs(get_json_decoder("json"), json.loads)
+        self.assertIs(get_json_decoder(len), len)
+        with self.assertRaises(ValueError):
+            get_json_decoder("yaml")
+
+    def test_client_uses_configured_decoder(self):
+        decoder = mock.Mock(return_value={"decoded": True})
+        client = RestClient({'json_decoder': decoder})
+        response = build_response(200, b'{"decoded": false}')
+        self.assertEqual(client._decode_json(response), {"decoded": True})
+        decoder.assert_called_once_with(b'{"decoded": false}')
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+"""Tests for retrying failed requests."""
+
+import asyncio
+from unittest import TestCase, mock
+
+from requests.exceptions import ConnectionError
+
+from tiingo import AsyncTiingoClient, TiingoClient
+from tiingo.asyncclient import aiohttp_is_installed
+from tiingo.restclient import RestClientError, build_response
+from tiingo.retry import RetryPolicy, retry_after_seconds
+
+
+def responses(*status_codes, headers=None):
+    return [build_response(code, b"{}", headers) for code in status_codes]
+
+
+class TestRetryPolicy(TestCase):
+
+    def test_retries_per_status_class(self):
+        policy = RetryPolicy(retries={429: 5, "5xx": 2, 503: 0})
+        assert policy.max_retries(429) == 5
+        assert policy.max_retries(502) == 2
+        assert policy.max_retries(503) == 0
+        assert policy.max_retries(404) == 0
+        assert policy.max_retries() == 0
+
+    def test_jittered_exponential_backoff(self):
+        policy = RetryPolicy(backoff=1, max_backoff=3)
+        response = build_response(502, b"")
+        with mock.patch("tiingo.retry.random.uniform", side_effect=max) as uniform:
+            assert policy.delay("GET", 0, response) == 1
+            assert policy.delay("GET", 1, response) == 2
+            assert policy.delay("GET", 2, response) == 3
+        assert uniform.call_args_list[2] == mock.call(0, 3)
+        assert policy.delay("GET", 3, response) is None
+        assert policy.stats()["gave_up"] == 1
+
+    def test_retry_after(self):
+        policy = RetryPolicy(max_retry_after=60)
+        assert policy.delay("GET", 0, responses(429, headers={"Retry-After": "7"})[0]) == 7
+        assert policy.delay("GET", 0, responses(429, headers={"Retry-After": "61"})[0]) is None
+        date = responses(429, headers={"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})
+        assert retry_after_seconds(date[0]) == 0
+        assert retry_after_seconds(responses(429)[0]) is None
+
+    def test_only_idempotent_methods(self):
+        policy = RetryPolicy()
+        assert policy.delay("POST", 0, responses(502)[0]) is None
+        assert policy.delay("GET", 0, responses(502)[0]) is not None
+
+    def test_budget(self):
+        policy = RetryPolicy(backoff=0, budget=2)
+        assert [policy.delay("GET", 0, responses(502)[0]) for _ in range(3)] == [0, 0, None]
+        stats = policy.stats()
+        assert stats["retries"] == 2
+        assert stats["by_status"] == {502: 2}
+        assert stats["budget_exhausted"] == 1
+
+
+class TestRestClientRetry(TestCase):
+
+    def setUp(self):
+        self.client = TiingoClient({"retry": {"backoff": 0}})
+
+    def test_retries_transient_errors(self):
+        with mock.patch.object(self.client._session, "request",
+                               side_effect=responses(502, 429, 200)) as request:
+            assert self.client.get_ticker_metadata("GOOGL") == {}
+        assert request.call_count == 3
+        assert self.client.retry_stats()["by_status"] == {502: 1, 429: 1}
+
+    def test_retries_connection_errors(self):
+        side_effect = [ConnectionError("reset")] + responses(200)
+        with mock.patch.object(self.client._session, "request",
+                               side_effect=side_effect):
+            assert self.client.get_ticker_metadata("GOOGL") == {}
+        assert self.client.retry_stats()["by_status"] == {"connection": 1}
+
+    def test_gives_up(self):
+        with mock.patch.object(self.client._session, "request",
+                               side_effect=responses(502, 502, 502, 502)) as request:
+            with self.assertRaises(RestClientError):
+                self.client.get_ticker_metadata("GOOGL")
+        assert request.call_count == 4
+
+    def test_client_errors_not_retried(self):
+        with mock.patch.object(self.client._session, "request",
+                               side_effect=responses(404)) as request:
+            with self.assertRaises(RestClientError):
+                self.client.get_ticker_metadata("GOOGL")
+        assert request.call_count == 1
+
+    def test_retry_disabled(self):
+        client = TiingoClient({"retry": False})
+        with mock.patch.object(client._session, "request",
+                               side_effect=responses(502)) as request:
+            with self.assertRaises(RestClientError):
+                client.get_ticker_metadata("GOOGL")
+        assert request.call_count == 1
+        assert client.retry_stats() is None
+
+
+class TestAsyncClientRetry(TestCase):
+
+    def setUp(self):
+        if not aiohttp_is_installed:
+            self.skipTest("test_retry: aiohttp not installed.")
+
+    def test_retries_transient_errors(self):
+        async def run():
+            async with AsyncTiingoClient({"retry": {"backoff": 0}}) as client:
+                with mock.patch.object(client, "_fetch",
+                                       side_effect=responses(503, 200)) as fetch:
+                    assert await client.get_ticker_metadata("GOOGL") == {}
+                    assert fetch.call_count == 2
+                return client._client.retry_stats()
+
+        assert asyncio.run(run())["by_status"] == {503: 1}
@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+"""Tests for incremental price syncing into a local store."""
+
+import shutil
+import tempfile
+from unittest import TestCase
+
+import vcr
+
+from tiingo import TiingoClient
+from tiingo.stores import CSVPriceStore
+
+
+class TestSyncPrices(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.store = CSVPriceStore(self.directory)
+        self._client = TiingoClient()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_empty_store(self):
+        assert self.store.last_date("GOOGL") is None
+        assert self.store.read("GOOGL") == []
+
+    @vcr.use_cassette('tests/fixtures/ticker_price_with_date.yaml')
+    def test_sync_new_ticker(self):
+        appended = self._client.sync_prices("GOOGL", self.store,
+                                            startDate="2015-01-01", endDate="2015-01-05")
+        assert appended == {"GOOGL": 2}
+        assert self.store.last_date("GOOGL") == "2015-01-05T00:00:00.000Z"
+        rows = self.store.read("GOOGL")
+        assert [row["date"][:10] for row in rows] == ["2015-01-02", "2015-01-05"]
+        assert rows[0]["adjClose"] == "529.55"
+
+    @vcr.use_cassette('tests/fixtures/ticker_price_sync.yaml')
+    def test_sync_fetches_only_missing_tail(self):
+        self.store.append("GOOGL", [{"date": "2015-01-02T00:00:00.000Z", "close": 529.55}])
+        appended = self._client.sync_prices(["GOOGL"], self.store, endDate="2015-01-05")
+        assert appended == {"GOOGL": 1}
+        rows = self.store.read("GOOGL")
+        assert [row["date"][:10] for row in rows] == ["2015-01-02", "2015-01-05"]
+        assert list(rows[1]) == ["date", "close"]
+
+    def test_sync_up_to_date_ticker_makes_no_request(self):
+        self.store.append("GOOGL", [{"date": "2015-01-05T00:00:00.000Z", "close": 519.46}])
+        # No cassette: any request would fail.
+        appended = self._client.sync_prices(["GOOGL"], self.store, endDate="2015-01-05")
+        assert appended == {"GOOGL": 0}
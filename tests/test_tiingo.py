@@ -2,12 +2,15 @@
 """Tests for `tiingo` package."""
 
 import csv
-from unittest import TestCase
+import json
+from unittest import TestCase, mock
 import vcr
 
 from tiingo import TiingoClient
-from tiingo.exceptions import InvalidFrequencyError
-from tiingo.restclient import RestClientError
+from tiingo.columnar import numpy_is_installed, pyarrow_is_installed
+from tiingo.exceptions import InvalidFrequencyError, TickerFetchError
+from tiingo.listing import TickerListing
+from tiingo.restclient import RestClientError, build_response
 
 
 # TODO
@@ -37,6 +40,54 @@ class TestClient(TestCase):
             assert client
 
 
+class TestTickersMetadata(TestCase):
+
+    def setUp(self):
+        self._client = TiingoClient({'max_workers': 4})
+
+    def fake_request(self, method, url, params=None, **kwargs):
+        ticker = url.split("/")[-1]
+        if ticker == "ZZZZNOTREAL":
+            raise RestClientError("404 Client Error: Not Found")
+        body = {"ticker": ticker, "name": ticker.title(), "exchangeCode": "NASDAQ",
+                "startDate": "2004-08-19", "endDate": "2017-10-06"}
+        return build_response(200, json.dumps(body).encode())
+
+    def test_fetches_and_caches(self):
+        with mock.patch.object(self._client, "_request",
+                               side_effect=self.fake_request) as request:
+            metadata = self._client.get_tickers_metadata(["GOOGL", "AAPL", "GOOGL"])
+            assert list(metadata) == ["GOOGL", "AAPL"]
+            assert metadata["AAPL"]["name"] == "Aapl"
+            assert request.call_count == 2
+
+            objects = self._client.get_tickers_metadata(["AAPL"], fmt="object",
+                                                        fields=["name"])
+            assert objects["AAPL"] == ("Aapl",)
+            assert request.call_count == 2
+
+    def test_partial_failure(self):
+        with mock.patch.object(self._client, "_request", side_effect=self.fake_request):
+            with self.assertRaises(TickerFetchError) as raised:
+                self._client.get_tickers_metadata(["GOOGL", "ZZZZNOTREAL"])
+        assert list(raised.exception.results) == ["GOOGL"]
+        assert list(raised.exception.errors) == ["ZZZZNOTREAL"]
+
+    def test_answers_from_listing(self):
+        listing = TickerListing([
+            {"ticker": "GOOGL", "exchange": "NASDAQ", "assetType": "Stock",
+             "priceCurrency": "USD", "startDate": "2004-08-19", "endDate": "2019-10-18"},
+        ])
+        with mock.patch.object(self._client, "get_ticker_listing", return_value=listing), \
+                mock.patch.object(self._client, "_request",
+                                  side_effect=self.fake_request) as request:
+            metadata = self._client.get_tickers_metadata(
+                ["GOOGL", "AAPL"], fields=["exchangeCode", "endDate"])
+        assert metadata == {"GOOGL": {"exchangeCode": "NASDAQ", "endDate": "2019-10-18"},
+                            "AAPL": {"exchangeCode": "NASDAQ", "endDate": "2017-10-06"}}
+        assert request.call_count == 1
+
+
 # PRICES ENDPOINTS
 class TestTickerPrices(TestCase):
 
@@ -79,6 +130,17 @@ class TestTickerPrices(TestCase):
         assert len(prices) == 1
         assert hasattr(prices[0], 'adjClose')
 
+    @vcr.use_cassette('tests/fixtures/ticker_price_weekly.yaml')
+    def test_ticker_price_as_object_shares_type(self):
+        """Test that all records of a response share one namedtuple class"""
+        prices = self._client.get_ticker_price("GOOGL", startDate='2018-01-05',
+                                               endDate='2018-01-19', frequency='weekly',
+                                               fmt="object")
+        assert len(prices) == 3
+        assert len(set(type(price) for price in prices)) == 1
+        assert prices[0].adjClose == 1110.29
+        assert prices[0]._asdict()['date'] == "2018-01-05T00:00:00.000Z"
+
     @vcr.use_cassette('tests/fixtures/ticker_price_with_date.yaml')
     def test_ticker_price_with_date(self):
         """Test the EOD Prices Endpoint with data param"""
@@ -214,6 +276,39 @@ class TestNews(TestCase):
         for article in articles:
             assert all(key in article for key in self.article_keys)
 
+    def fake_news(self, method, url, params=None, **kwargs):
+        # 250 articles, with every page after the first repeating the last
+        # article of the previous one, as when a new article is published.
+        start = max(0, params["offset"] - 1)
+        page = [{"id": i, "title": str(i)} for i in range(250)][start:start + params["limit"]]
+        return build_response(200, json.dumps(page).encode())
+
+    def test_iter_news(self):
+        with mock.patch.object(self._client, "_request",
+                               side_effect=self.fake_news) as request:
+            articles = list(self._client.iter_news(tickers=["aapl"], limit=100))
+        assert [article["id"] for article in articles] == list(range(250))
+        offsets = sorted(call[1]["params"]["offset"] for call in request.call_args_list)
+        assert offsets[:3] == [0, 100, 200]
+        assert len(offsets) <= 5
+
+    def test_iter_news_limit_above_page_size(self):
+        def fake_news(method, url, params=None, **kwargs):
+            # The API returns at most 1000 articles per page
+            start = params["offset"]
+            page = [{"id": i} for i in range(2500)][start:start + min(params["limit"], 1000)]
+            return build_response(200, json.dumps(page).encode())
+
+        with mock.patch.object(self._client, "_request", side_effect=fake_news):
+            articles = list(self._client.iter_news(limit=2000, prefetch=0))
+        assert len(articles) == 2500
+
+    def test_iter_news_max_articles(self):
+        with mock.patch.object(self._client, "_request", side_effect=self.fake_news):
+            articles = list(self._client.iter_news(limit=10, prefetch=0, fmt="object",
+                                                   max_articles=15))
+        assert [article.id for article in articles] == list(range(15))
+
     @vcr.use_cassette('tests/fixtures/news_empty_sources.yaml')
     def test_get_news_empty_sources(self):
         search_params = self.search_params.copy()
@@ -313,3 +408,97 @@ class TestFundamentals(TestCase):
                                                               endDate='2020-4-1',
                                                               fmt='csv')
         assert len(statements) > 1
+
+
+# Long intraday ranges are split into date windows
+class TestIntradayWindows(TestCase):
+
+    def setUp(self):
+        self._client = TiingoClient({'intraday_max_bars': 2880})
+
+    def fake_request(self, method, url, params=None, **kwargs):
+        # One bar per day at the window start and end, so neighbouring windows
+        # never overlap except when the API repeats a bar.
+        self.requested.append((params['startDate'], params['endDate']))
+        bars = [{"date": params['startDate'] + "T14:30:00.000Z", "close": 1.0},
+                {"date": params['endDate'] + "T14:30:00.000Z", "close": 2.0},
+                {"date": "2018-01-01T14:30:00.000Z", "close": 3.0}]
+        if params['format'] == 'csv':
+            body = "date,close\n" + "".join(
+                "{date},{close}\n".format(**bar) for bar in bars)
+        else:
+            body = json.dumps(bars)
+        return build_response(200, body.encode('utf-8'))
+
+    def test_windows_follow_frequency(self):
+        windows = self._client._date_windows("2018-01-01", "2018-01-10", "1min")
+        assert windows == [("2018-01-01", "2018-01-02"), ("2018-01-03", "2018-01-04"),
+                           ("2018-01-05", "2018-01-06"), ("2018-01-07", "2018-01-08"),
+                           ("2018-01-09", "2018-01-10")]
+        assert len(self._client._date_windows("2018-01-01", "2018-01-10", "5min")) == 1
+        assert len(self._client._date_windows("2018-01-01", "2018-01-10", "daily")) == 1
+        assert len(self._client._date_windows(None, None, "1min")) == 1
+
+    def test_windows_disabled(self):
+        client = TiingoClient({'intraday_max_bars': None})
+        assert client._date_windows("2018-01-01", "2018-12-31", "1min") == [
+            ("2018-01-01", "2018-12-31")]
+
+    def test_ticker_price_is_stitched(self):
+        self.requested = []
+        with mock.patch.object(self._client, '_request', side_effect=self.fake_request):
+            prices = self._client.get_ticker_price("GOOGL", startDate="2018-01-01",
+                                                   endDate="2018-01-04", frequency="1min")
+        assert sorted(self.requested) == [("2018-01-01", "2018-01-02"),
+                                          ("2018-01-03", "2018-01-04")]
+        assert [bar['date'][:10] for bar in prices] == [
+            "2018-01-01", "2018-01-02", "2018-01-03", "2018-01-04"]
+
+    def test_ticker_price_csv_is_stitched(self):
+        self.requested = []
+        with mock.patch.object(self._client, '_request', side_effect=self.fake_request):
+            prices = self._client.get_ticker_price("GOOGL", startDate="2018-01-01",
+                                                   endDate="2018-01-04", frequency="1min",
+                                                   fmt="csv")
+        rows = list(csv.reader(prices.splitlines()))
+        assert rows[0] == ["date", "close"]
+        assert [row[0][:10] for row in rows[1:]] == [
+            "2018-01-01", "2018-01-02", "2018-01-03", "2018-01-04"]
+
+    def fake_request_first_window_empty(self, method, url, params=None, **kwargs):
+        if params['startDate'] == "2018-01-01":
+            return build_response(200, b"date,close,volume\n")
+        body = "date,close,volume\n{}T14:30:00.000Z,2.5,10\n".format(params['endDate'])
+        return build_response(200, body.encode('utf-8'))
+
+    def test_empty_window_numpy(self):
+        if not numpy_is_installed:
+            self.skipTest("test_tiingo: numpy not installed.")
+        with mock.patch.object(self._client, '_request',
+                               side_effect=self.fake_request_first_window_empty):
+            prices = self._client.get_ticker_price("GOOGL", startDate="2018-01-01",
+                                                   endDate="2018-01-06", frequency="1min",
+                                                   fmt="numpy")
+        assert [str(date)[:10] for date in prices['date']] == ["2018-01-04", "2018-01-06"]
+        assert prices['close'].dtype == 'float64'
+        assert prices['volume'].dtype == 'int64'
+
+    def test_empty_window_arrow(self):
+        if not pyarrow_is_installed:
+            self.skipTest("test_tiingo: pyarrow not installed.")
+        import pyarrow as pa
+        with mock.patch.object(self._client, '_request',
+                               side_effect=self.fake_request_first_window_empty):
+            prices = self._client.get_ticker_price("GOOGL", startDate="2018-01-01",
+                                                   endDate="2018-01-06", frequency="1min",
+                                                   fmt="arrow")
+        assert prices.num_rows == 2
+        assert prices.schema.field('close').type == pa.float64()
+        assert prices.schema.field('volume').type == pa.int64()
+
+        with mock.patch.object(self._client, '_request',
+                               return_value=build_response(200, b"date,close,volume\n")):
+            prices = self._client.get_ticker_price("GOOGL", startDate="2018-01-01",
+                                                   endDate="2018-01-06", frequency="1min",
+                                                   fmt="arrow")
+        assert prices.num_rows == 0
@@ -1,10 +1,16 @@
 #!/usr/bin/env python
 """Unit tests for pandas functionality in tiingo"""
 
+import json
+import threading
+import time
 import vcr
-from unittest import TestCase
+from unittest import TestCase, mock
 from tiingo import TiingoClient
-from tiingo.exceptions import APIColumnNameError, InstallPandasException, MissingRequiredArgumentError
+from tiingo.api import utc_date_index
+from tiingo.restclient import build_response
+from tiingo.exceptions import (APIColumnNameError, InstallPandasException,
+                               MissingRequiredArgumentError, TickerFetchError)
 try:
     import pandas as pd
     pandas_is_installed = True
@@ -48,6 +54,47 @@ class TestTiingoWithPython(TestCase):
         assert len(prices.columns) == 2
         assert len(prices.index) == 3
 
+    def test_return_pandas_format_multiple_concurrent(self):
+        """Test that tickers fetched concurrently keep their input order"""
+        tickers = ["GOOGL", "AAPL", "MSFT"]
+        dates = pd.date_range('2018-01-05', periods=3, freq='W-FRI', tz='UTC')
+
+        def request_pandas(ticker, metric_name, params):
+            # Finish in reverse order to make sure results are reordered.
+            time.sleep(0.01 * (len(tickers) - tickers.index(ticker)))
+            return pd.Series([1.0, 2.0, 3.0], index=dates, name=metric_name)
+
+        with mock.patch.object(self._client, '_request_pandas', side_effect=request_pandas):
+            prices = self._client.get_dataframe(tickers, metric_name='adjClose',
+                                                frequency='weekly', max_workers=3)
+        assert list(prices.columns) == tickers
+        assert len(prices.index) == 3
+
+    @vcr.use_cassette('tests/fixtures/ticker_price_pandas_weekly_multiple_tickers.yaml')
+    def test_return_pandas_format_multiple_with_index(self):
+        """Test that multiple tickers are aligned to a pre-allocated date index"""
+        tickers = ["GOOGL", "AAPL"]
+        index = pd.date_range('2018-01-01', '2018-01-31', freq='D')
+        prices = self._client.get_dataframe(tickers, startDate='2018-01-05',
+                                            endDate='2018-01-19', metric_name='adjClose',
+                                            frequency='weekly', index=index)
+        assert list(prices.columns) == tickers
+        assert len(prices.index) == len(index)
+        assert prices.index.tz is not None
+        assert prices['GOOGL'].count() == 3
+
+    @vcr.use_cassette('tests/fixtures/ticker_price_pandas_weekly_multiple_tickers_partial_failure.yaml')
+    def test_return_pandas_format_multiple_partial_failure(self):
+        """Test that one failed ticker does not discard the others"""
+        tickers = ["GOOGL", "ZZZZNOTREAL"]
+        with self.assertRaises(TickerFetchError) as context:
+            self._client.get_dataframe(tickers, startDate='2018-01-05',
+                                       endDate='2018-01-19', metric_name='adjClose',
+                                       frequency='weekly')
+        assert list(context.exception.errors) == ["ZZZZNOTREAL"]
+        assert list(context.exception.results.columns) == ["GOOGL"]
+        assert len(context.exception.results.index) == 3
+
     @vcr.use_cassette('tests/fixtures/ticker_price_pandas_daily.yaml')
     def test_return_pandas_daily(self):
         """Test that valid pandas format is returned when specified"""
@@ -91,6 +138,22 @@ class TestTiingoWithPython(TestCase):
             1130.65,1130.7,1139.1,1135.97,1143.5]
         assert len(prices.index) == 10
 
+    @vcr.use_cassette('tests/fixtures/ticker_price_pandas_daily_metric_name_csv.yaml')
+    def test_return_pandas_daily_metric_name_csv_chunks(self):
+        """Test that csv data can be parsed in chunks while it is downloaded"""
+        chunks = list(self._client.get_dataframe("GOOGL", startDate='2018-01-05',
+                                                 metric_name='close', endDate='2018-01-19',
+                                                 frequency='daily', fmt='csv', chunksize=4))
+        assert [len(chunk) for chunk in chunks] == [4, 4, 2]
+        self.assertTrue(all(isinstance(chunk.index, pd.DatetimeIndex) for chunk in chunks))
+        assert pd.concat(chunks).values.tolist() == [
+            1110.29,1114.21,1112.79,1110.14,1112.05,
+            1130.65,1130.7,1139.1,1135.97,1143.5]
+
+    def test_chunksize_requires_single_csv_ticker(self):
+        with self.assertRaises(ValueError):
+            self._client.get_dataframe("GOOGL", metric_name='close', chunksize=4)
+
     @vcr.use_cassette('tests/fixtures/ticker_price_pandas_daily_equivalent_requesting_json_or_csv.yaml')
     def test_price_pandas_daily_equivalent_requesting_json_or_csv(self):
         """Test that equivalent data is returned when specifying reuqest format in json or csv.
@@ -105,6 +168,46 @@ class TestTiingoWithPython(TestCase):
 
         self.assertTrue(prices_json.equals(prices_csv))
 
+    def test_json_records_decoded_to_typed_columns(self):
+        """Test that json prices are decoded straight to typed columns, with the
+        same values as a DataFrame built from the records"""
+        records = [
+            {"date": "2018-01-05T00:00:00.000Z", "close": 1110, "volume": 1000,
+             "divCash": 0, "splitFactor": 1.0},
+            {"date": "2018-01-08T00:00:00.000Z", "close": 1114.21, "volume": 1200,
+             "divCash": 0.5, "splitFactor": None},
+        ]
+        prices = self._client._frame_from_records(records)
+        assert str(prices.index.dtype) == "datetime64[ns, UTC]"
+        assert prices.index.name == "date"
+        assert prices["close"].dtype == "float64"
+        assert prices["volume"].dtype == "int64"
+        assert prices["divCash"].tolist() == [0.0, 0.5]
+        expected = pd.DataFrame(records).set_index("date")
+        expected.index = pd.to_datetime(expected.index)
+        pd.testing.assert_frame_equal(prices, expected, check_index_type=False)
+
+        close = self._client._frame_from_records(records, "close")
+        assert isinstance(close, pd.Series)
+        assert close.tolist() == [1110.0, 1114.21]
+
+    def test_utc_date_index(self):
+        """Test that ISO dates from csv and json responses parse to the same UTC index"""
+        daily = utc_date_index(pd.Index(["2018-01-05", "2018-01-08"], name="date"))
+        json_dates = utc_date_index(pd.Index(["2018-01-05T00:00:00.000Z",
+                                              "2018-01-08T00:00:00.000Z"], name="date"))
+        assert str(daily.dtype) == "datetime64[ns, UTC]"
+        assert daily.name == "date"
+        assert daily.equals(json_dates)
+
+        offset = utc_date_index(pd.Index(["2018-01-05T09:30:00-05:00"]))
+        assert str(offset[0]) == "2018-01-05 14:30:00+00:00"
+        assert utc_date_index(daily) is daily
+
+        # Dates numpy can't parse fall back to pandas
+        other = utc_date_index(pd.Index(["01/05/2018"], name="date"))
+        assert str(other[0]) == "2018-01-05 00:00:00+00:00"
+
     @vcr.use_cassette('tests/fixtures/intraday_price.yaml')
     def test_intraday_ticker_price(self):
         """Test the EOD Prices Endpoint with data param"""
@@ -134,6 +237,69 @@ class TestTiingoWithPython(TestCase):
         assert len(prices) == 1
         assert len(prices.columns) == len(requested_columns.split(','))
 
+    def test_intraday_windows_are_stitched(self):
+        """Test that long intraday ranges are fetched in windows and de-duplicated"""
+        client = TiingoClient({'intraday_max_bars': 2880})
+
+        def fake_request(method, url, params=None, **kwargs):
+            bars = [{"date": day + "T14:30:00.000Z", "close": 1.0}
+                    for day in (params['startDate'], params['endDate'], '2018-01-01')]
+            return build_response(200, json.dumps(bars).encode('utf-8'))
+
+        with mock.patch.object(client, '_request', side_effect=fake_request):
+            prices = client.get_dataframe("GOOGL", startDate='2018-01-01', endDate='2018-01-04',
+                                          metric_name='close', frequency='1min')
+        assert [str(date.date()) for date in prices.index] == [
+            '2018-01-01', '2018-01-02', '2018-01-03', '2018-01-04']
+
+    def test_intraday_windows_of_tickers_share_max_workers(self):
+        """Test that the windows of concurrent tickers are fetched from one bounded pool"""
+        client = TiingoClient({'intraday_max_bars': 2880, 'max_workers': 2})
+        lock = threading.Lock()
+        in_flight = [0, 0]  # current, highest
+        requested = []
+
+        def fake_request(method, url, params=None, **kwargs):
+            with lock:
+                in_flight[0] += 1
+                in_flight[1] = max(in_flight)
+                requested.append((url, params['startDate']))
+            time.sleep(0.01)
+            with lock:
+                in_flight[0] -= 1
+            bars = [{"date": params['endDate'] + "T14:30:00.000Z", "close": 1.0}]
+            return build_response(200, json.dumps(bars).encode('utf-8'))
+
+        with mock.patch.object(client, '_request', side_effect=fake_request):
+            prices = client.get_dataframe(["A", "B", "C"], startDate='2018-01-01',
+                                          endDate='2018-01-06', metric_name='close',
+                                          frequency='1min')
+        assert list(prices.columns) == ["A", "B", "C"]
+        assert len(prices) == 3
+        assert len(requested) == 9
+        assert in_flight[1] <= 2
+
+    def test_empty_intraday_windows_are_skipped(self):
+        """Test that windows without bars, e.g. before a listing, are skipped"""
+        client = TiingoClient({'intraday_max_bars': 2880})
+
+        def fake_request(method, url, params=None, **kwargs):
+            if params['startDate'] == '2019-01-01':
+                return build_response(200, b'[]')
+            bars = [{"date": params['endDate'] + "T14:30:00.000Z", "close": 1.0}]
+            return build_response(200, json.dumps(bars).encode('utf-8'))
+
+        with mock.patch.object(client, '_request', side_effect=fake_request):
+            prices = client.get_dataframe("X", startDate='2019-01-01', endDate='2019-01-20',
+                                          frequency='1min')
+            assert len(prices) > 0
+            assert str(prices.index[0].date()) != '2019-01-01'
+
+        with mock.patch.object(client, '_request', return_value=build_response(200, b'[]')):
+            prices = client.get_dataframe("X", startDate='2019-01-01', endDate='2019-01-20',
+                                          metric_name='close', frequency='1min')
+            assert len(prices) == 0
+
     def test_metric_name_column_error(self):
         with self.assertRaises(APIColumnNameError):
             self._client.get_dataframe(['GOOGL', 'AAPL'], startDate='2018-01-05',
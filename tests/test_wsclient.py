@@ -1,6 +1,12 @@
+import asyncio
+import json
 import os
+import threading
+import time
 from unittest import TestCase,mock
+from tiingo.columnar import numpy_is_installed
 from tiingo.wsclient import TiingoWebsocketClient
+from tiingo.wsstream import BarAggregator, MessageQueue, UpdateBatcher, update_fields, update_key
 from tiingo.exceptions import MissingRequiredArgumentError
 
 class TestRestClientWithSession(TestCase):
@@ -42,3 +48,381 @@ class TestRestClientWithSession(TestCase):
             with self.assertRaises(RuntimeError) as ex:
                 TiingoWebsocketClient(config={},endpoint='iex',on_msg_cb=self.cb)
             self.assertTrue(type(ex.exception)==RuntimeError)
+
+
+class FakeWebSocketApp(object):
+    """Stand-in for websocket.WebSocketApp delivering the messages of one
+    connection from each list of sessions, then dropping the connection"""
+
+    sessions = []
+    instances = []
+
+    def __init__(self, url, on_message=None, on_error=None, on_close=None, on_open=None):
+        self.url = url
+        self.on_message = on_message
+        self.on_close = on_close
+        self.on_open = on_open
+        self.sent = []
+        self.closed = threading.Event()
+        FakeWebSocketApp.instances.append(self)
+
+    def send(self, data):
+        self.sent.append(json.loads(data))
+
+    def close(self):
+        self.closed.set()
+
+    def run_forever(self):
+        self.on_open(self)
+        if not FakeWebSocketApp.sessions:
+            self.closed.wait(5)  # Stay connected until closed
+        else:
+            for msg in FakeWebSocketApp.sessions.pop(0):
+                self.on_message(self, msg)
+        self.on_close(self, None, None)
+
+
+class LateCloseWebSocketApp(FakeWebSocketApp):
+    """Forgets a close() made before run_forever, as websocket-client does by
+    setting keep_running when it starts"""
+
+    def run_forever(self):
+        self.closed.wait(5)
+        self.closed.clear()
+        super(LateCloseWebSocketApp, self).run_forever()
+
+
+HEARTBEAT = '{"messageType":"H","response":{"code":200,"message":"HeartBeat"}}'
+QUOTE = '{"messageType":"A","service":"iex","data":["Q","2019-01-30T13:33:45.594808294-05:00",1548873225594808294,"aapl",1,2,3,4,5,6,7,8,9,10,11,12]}'
+
+
+class TestReconnectingClient(TestCase):
+
+    def setUp(self):
+        FakeWebSocketApp.instances = []
+        patcher = mock.patch("tiingo.wsclient.websocket.WebSocketApp", FakeWebSocketApp)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.config = {'eventName': 'subscribe', 'authorization': '0' * 40,
+                       'eventData': {'thresholdLevel': 5}}
+
+    def test_reconnects_and_resubscribes(self):
+        FakeWebSocketApp.sessions = [[HEARTBEAT, QUOTE], [QUOTE, HEARTBEAT]]
+        messages = []
+        client = TiingoWebsocketClient(self.config, endpoint='iex',
+                                       on_msg_cb=messages.append, blocking=False,
+                                       backoff=0.001)
+        for _ in range(500):
+            if client.connections == 3:
+                break
+            time.sleep(0.01)
+        client.close()
+
+        assert messages == [HEARTBEAT, QUOTE, QUOTE, HEARTBEAT]
+        assert client.heartbeats == 2
+        assert client.connections == 3
+        assert [app.sent for app in FakeWebSocketApp.instances] == [[self.config]] * 3
+        assert not client.is_connected
+
+    def test_blocking_without_reconnect(self):
+        FakeWebSocketApp.sessions = [[QUOTE]]
+        messages = []
+        TiingoWebsocketClient(self.config, endpoint='fx', on_msg_cb=messages.append,
+                              reconnect=False)
+        assert messages == [QUOTE]
+        assert FakeWebSocketApp.instances[0].url == "wss://api.tiingo.com/fx"
+
+    def test_silent_connection_is_reconnected(self):
+        FakeWebSocketApp.sessions = []
+        client = TiingoWebsocketClient(self.config, endpoint='iex', on_msg_cb=print,
+                                       blocking=False, reconnect=False,
+                                       heartbeat_timeout=0.05)
+        client._thread.join(5)
+        assert FakeWebSocketApp.instances[0].closed.is_set()
+        assert not client._thread.is_alive()
+
+    def test_close_before_run_forever_starts(self):
+        FakeWebSocketApp.sessions = []
+        with mock.patch("tiingo.wsclient.websocket.WebSocketApp", LateCloseWebSocketApp):
+            client = TiingoWebsocketClient(self.config, endpoint='iex', on_msg_cb=print,
+                                           blocking=False)
+            wait_for(lambda: client._ws is not None)
+            start = time.monotonic()
+            client.close()
+        assert time.monotonic() - start < 2
+        assert client.connections == 0
+        assert FakeWebSocketApp.instances[0].sent == []
+
+    def test_run_async(self):
+        FakeWebSocketApp.sessions = [[QUOTE]]
+        messages = []
+        client = TiingoWebsocketClient(self.config, endpoint='iex', on_msg_cb=messages.append,
+                                       blocking=None, reconnect=False)
+        assert FakeWebSocketApp.instances == []
+        asyncio.run(client.run_async())
+        assert messages == [QUOTE]
+        assert len(FakeWebSocketApp.instances) == 1
+
+    def test_run_async_refuses_a_started_client(self):
+        FakeWebSocketApp.sessions = []
+        client = TiingoWebsocketClient(self.config, endpoint='iex', on_msg_cb=print,
+                                       blocking=False)
+        try:
+            with self.assertRaises(RuntimeError):
+                asyncio.run(client.run_async())
+        finally:
+            client.close()
+
+
+CRYPTO_TRADE = '{"messageType":"A","service":"crypto_data","data":["T","btcusd","2019-01-30T18:03:40.195515+00:00","bitfinex",0.5,3456.5]}'
+CRYPTO_QUOTE = '{"messageType":"A","service":"crypto_data","data":["Q","btcusd","2019-01-30T18:03:41.000000+00:00","bitfinex",1.0,3456.0,3456.25,2.0,3456.5]}'
+SUBSCRIBED = '{"messageType":"I","response":{"code":200,"message":"Success"},"data":{"subscriptionId":61}}'
+
+
+class TestParsedMessages(TestCase):
+
+    def setUp(self):
+        FakeWebSocketApp.instances = []
+        patcher = mock.patch("tiingo.wsclient.websocket.WebSocketApp", FakeWebSocketApp)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.config = {'eventName': 'subscribe', 'authorization': '0' * 40}
+
+    def run_client(self, sessions, endpoint='iex', **kwargs):
+        FakeWebSocketApp.sessions = sessions
+        return TiingoWebsocketClient(self.config, endpoint=endpoint, reconnect=False,
+                                     **kwargs)
+
+    def test_parse_drops_heartbeats(self):
+        messages = []
+        client = self.run_client([[SUBSCRIBED, HEARTBEAT, QUOTE]], parse=True,
+                                 on_msg_cb=messages.append)
+        assert messages == [json.loads(SUBSCRIBED), json.loads(QUOTE)]
+        assert client.heartbeats == 1
+
+    def test_batches_of_records(self):
+        messages, batches = [], []
+        self.run_client([[SUBSCRIBED, QUOTE, HEARTBEAT, QUOTE, QUOTE]],
+                        on_msg_cb=messages.append, on_batch_cb=batches.append,
+                        batch_size=2, json_decoder="json")
+        assert messages == [json.loads(SUBSCRIBED)]
+        assert [len(batch) for batch in batches] == [2, 1]  # The rest is flushed on close
+        update = batches[0][0]
+        assert type(update).__name__ == "IexUpdate"
+        assert (update.ticker, update.lastPrice) == ("aapl", 6)
+
+    def test_batches_of_columns(self):
+        if not numpy_is_installed:
+            self.skipTest("test_wsclient: numpy not installed.")
+        batches = []
+        self.run_client([[CRYPTO_TRADE, CRYPTO_QUOTE, CRYPTO_TRADE]], endpoint='crypto',
+                        on_msg_cb=batches.append, batch_size=3, batch_format="columns")
+        trades, quotes = batches
+        assert trades["lastPrice"].tolist() == [3456.5, 3456.5]
+        assert str(trades["date"].dtype) == "datetime64[ns]"
+        assert quotes["midPrice"].tolist() == [3456.25]
+        assert "lastPrice" not in quotes
+
+    def test_batches_flushed_on_time(self):
+        batches = []
+        batcher = UpdateBatcher(batches.append, "iex", interval=0.02)
+        batcher.add(json.loads(QUOTE)["data"])
+        for _ in range(500):
+            if batches:
+                break
+            time.sleep(0.01)
+        batcher.close()
+        assert len(batches) == 1 and batcher.updates == 1
+
+    def test_unknown_update_schema(self):
+        assert update_fields("iex", ["X", 1]) == ("updateType", "field1")
+        assert update_fields("fx", ["Q", "eurusd", "2019-07-05", 1.0, 2.0, 3.0, 4.0, 5.0, 6.0])[-1] == "field8"
+
+
+class TestMessageQueue(TestCase):
+
+    def test_drop_oldest(self):
+        queue = MessageQueue(2, overflow="drop_oldest")
+        for item in "abc":
+            queue.put(item)
+        assert [queue.get(), queue.get()] == ["b", "c"]
+        assert queue.stats()["dropped"] == 1
+
+    def test_conflate_per_ticker(self):
+        queue = MessageQueue(2, overflow="conflate")
+        queue.put("aapl 1", key="aapl")
+        queue.put("msft 1", key="msft")
+        queue.put("aapl 2", key="aapl")  # Replaces the queued aapl update
+        queue.put("info")  # Nothing to conflate, so the oldest is dropped
+        queue.close()
+        assert [queue.get(), queue.get(), queue.get()] == ["msft 1", "info", None]
+        stats = queue.stats()
+        assert (stats["conflated"], stats["dropped"], stats["max_depth"]) == (1, 1, 2)
+
+    def test_quotes_dont_conflate_trades(self):
+        trade, quote = json.loads(QUOTE.replace('["Q"', '["T"')), json.loads(QUOTE)
+        assert update_key('iex', trade) == ('aapl', 'T')
+        assert update_key('iex', json.loads(SUBSCRIBED)) is None
+        queue = MessageQueue(2, overflow="conflate")
+        queue.put("trade", key=update_key('iex', trade))
+        queue.put("quote 1", key=update_key('iex', quote))
+        queue.put("quote 2", key=update_key('iex', quote))
+        queue.close()
+        assert [queue.get(), queue.get()] == ["trade", "quote 2"]
+
+    def test_block_waits_for_room(self):
+        queue = MessageQueue(1)
+        queue.put("a")
+        threading.Timer(0.05, queue.get).start()
+        queue.put("b")
+        assert queue.get() == "b"
+        assert queue.stats()["blocked"] > 0
+
+    def test_unknown_overflow_policy(self):
+        with self.assertRaises(ValueError):
+            MessageQueue(10, overflow="drop_newest")
+
+
+def wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+class TestQueuedClient(TestCase):
+
+    def setUp(self):
+        FakeWebSocketApp.instances = []
+        patcher = mock.patch("tiingo.wsclient.websocket.WebSocketApp", FakeWebSocketApp)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.config = {'eventName': 'subscribe', 'authorization': '0' * 40}
+
+    def test_slow_consumer_does_not_stall_receive(self):
+        messages = []
+        release = threading.Event()
+
+        def slow_cb(msg):
+            release.wait(5)
+            messages.append(msg)
+
+        FakeWebSocketApp.sessions = [[SUBSCRIBED] + [QUOTE] * 10]
+        client = TiingoWebsocketClient(self.config, endpoint='iex', on_msg_cb=slow_cb,
+                                       reconnect=False, blocking=False, queue_size=3,
+                                       overflow="drop_oldest")
+        # Every message is received while the consumer is still stuck
+        wait_for(lambda: client.queue_stats()["enqueued"] == 11)
+        stats = client.queue_stats()
+        assert stats["enqueued"] == 11
+        assert stats["dropped"] >= 7
+        release.set()
+        client.close()
+        assert len(messages) == 11 - client.queue_stats()["dropped"]
+
+    def test_conflated_updates_are_parsed_once(self):
+        other = QUOTE.replace('"aapl"', '"msft"')
+        release = threading.Event()
+        messages = []
+
+        def cb(msg):
+            release.wait(5)
+            messages.append(msg)
+
+        FakeWebSocketApp.sessions = [[SUBSCRIBED, QUOTE, other, QUOTE, other]]
+        client = TiingoWebsocketClient(self.config, endpoint='iex', on_msg_cb=cb, parse=True,
+                                       reconnect=False, blocking=False, queue_size=2,
+                                       overflow="conflate")
+        wait_for(lambda: client.queue_stats()["conflated"] == 2)
+        release.set()
+        client.close()
+        assert messages[-2:] == [json.loads(QUOTE), json.loads(other)]
+
+
+def iex_trade(ticker, timestamp, price, size):
+    return ["T", "2019-01-30T13:33:45-05:00", timestamp, ticker, None, None, None,
+            None, None, price, size, 0, 0, 0, 0, 0]
+
+
+MINUTE = 60 * 10 ** 9
+T0 = 1548873180 * 10 ** 9  # 2019-01-30T18:33:00Z
+
+
+class TestBarAggregator(TestCase):
+
+    def setUp(self):
+        self.bars = []
+        self.aggregator = BarAggregator(lambda ticker, bar: self.bars.append((ticker, bar)),
+                                        "1min", grace=1, capacity=1)
+
+    def test_bars_match_intraday_price_schema(self):
+        for offset, price, size in ((1, 10.0, 100), (2, 12.0, 50), (3, 9.5, 10), (59, 11.0, 40)):
+            self.aggregator.update("iex", iex_trade("aapl", T0 + offset * 10 ** 9, price, size))
+        self.aggregator.update("iex", iex_trade("aapl", T0 + MINUTE, 11.5, 5))
+        assert self.bars == [("aapl", {"date": "2019-01-30T18:33:00.000Z", "open": 10.0,
+                                       "high": 12.0, "low": 9.5, "close": 11.0,
+                                       "volume": 200})]
+        # The keys of get_ticker_price's intraday rows, requested with volume
+        assert list(self.bars[0][1]) == ["date", "open", "high", "low", "close", "volume"]
+
+    def test_crypto_trades_and_quotes(self):
+        self.aggregator.update("crypto", json.loads(CRYPTO_TRADE)["data"])
+        self.aggregator.update("crypto", json.loads(CRYPTO_QUOTE)["data"])
+        self.aggregator.flush()
+        assert self.bars == [("btcusd", {"date": "2019-01-30T18:03:00.000Z", "open": 3456.5,
+                                         "high": 3456.5, "low": 3456.5, "close": 3456.5,
+                                         "volume": 0.5})]
+        assert self.aggregator.trades == 1
+
+    def test_flush_due_and_late_trades(self):
+        for ticker in ("aapl", "msft", "googl"):  # Grows past the preallocated slot
+            self.aggregator.add_trade(ticker, T0 + 10 ** 9, 1.0, 1)
+        self.aggregator.flush_due(now=T0 + MINUTE)  # Within the grace period
+        assert self.bars == []
+        self.aggregator.flush_due(now=T0 + MINUTE + 2 * 10 ** 9)
+        assert [ticker for ticker, _ in self.bars] == ["aapl", "msft", "googl"]
+        self.aggregator.add_trade("aapl", T0 + 2 * 10 ** 9, 1.0, 1)
+        assert self.aggregator.late == 1
+        assert len(self.aggregator) == 0
+
+    def test_intervals(self):
+        assert BarAggregator(print, "5min").interval == 300
+        assert BarAggregator(print, "1s").interval == 1
+        assert BarAggregator(print, 0.5).interval == 0.5
+        with self.assertRaises(ValueError):
+            BarAggregator(print, "1day")
+
+    def test_client_emits_bars(self):
+        FakeWebSocketApp.instances = []
+        trade = json.dumps({"messageType": "A", "service": "iex",
+                            "data": iex_trade("aapl", T0 + 10 ** 9, 10.0, 100)})
+        next_trade = json.dumps({"messageType": "A", "service": "iex",
+                                 "data": iex_trade("aapl", T0 + MINUTE, 11.0, 100)})
+        FakeWebSocketApp.sessions = [[trade, HEARTBEAT, next_trade]]
+        messages = []
+        with mock.patch("tiingo.wsclient.websocket.WebSocketApp", FakeWebSocketApp):
+            client = TiingoWebsocketClient({'authorization': '0' * 40}, endpoint='iex',
+                                           on_msg_cb=messages.append, reconnect=False,
+                                           bar_interval="1min", on_bar_cb=lambda *bar: self.bars.append(bar))
+        assert len(messages) == 2
+        # The second bar is finished long ago by the clock, so it is flushed on close
+        assert [bar["close"] for _, bar in self.bars] == [10.0, 11.0]
+
+    def test_client_close_delivers_open_bars(self):
+        # A bar of the current minute, neither finished nor past its grace
+        trade = json.dumps({"messageType": "A", "service": "iex",
+                            "data": iex_trade("aapl", time.time_ns(), 10.0, 100)})
+        FakeWebSocketApp.sessions = [[trade]]
+        with mock.patch("tiingo.wsclient.websocket.WebSocketApp", FakeWebSocketApp):
+            client = TiingoWebsocketClient({'authorization': '0' * 40}, endpoint='iex',
+                                           on_msg_cb=print, reconnect=False, blocking=False,
+                                           bar_interval="1min", bar_grace=2.0,
+                                           on_bar_cb=lambda *bar: self.bars.append(bar))
+            wait_for(lambda: client.last_message is not None)
+            client.close()
+        assert [(ticker, bar["close"]) for ticker, bar in self.bars] == [("aapl", 10.0)]
+
+    def test_client_requires_bar_callback(self):
+        with self.assertRaises(MissingRequiredArgumentError):
+            TiingoWebsocketClient({'authorization': '0' * 40}, endpoint='iex',
+                                  on_msg_cb=print, bar_interval="1min")
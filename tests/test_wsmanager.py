@@ -0,0 +1,233 @@
+#!/usr/bin/env python
+"""Tests for the multiplexed websocket manager, with fake connections."""
+
+import asyncio
+import json
+from unittest import TestCase
+
+from tiingo import TiingoWebsocketManager
+from tiingo.wsmanager import aiohttp_is_installed
+
+try:
+    import aiohttp
+except ImportError:
+    pass
+
+HEARTBEAT = '{"messageType":"H","response":{"code":200,"message":"HeartBeat"}}'
+
+
+def subscribed(subscription_id):
+    return json.dumps({"messageType": "I", "response": {"code": 200},
+                       "data": {"subscriptionId": subscription_id}})
+
+
+def update(service, ticker):
+    return json.dumps({"messageType": "A", "service": service,
+                       "data": ["T", ticker, "2019-01-30T18:03:40.195515+00:00",
+                                "bitfinex", 1.0, 100.0]})
+
+
+class FakeWebSocket(object):
+
+    def __init__(self, messages):
+        self.incoming = asyncio.Queue()
+        for message in messages:
+            self.push(message)
+        self.sent = []
+        self.closed = False
+
+    def push(self, message):
+        self.incoming.put_nowait(aiohttp.WSMessage(aiohttp.WSMsgType.TEXT, message, None))
+
+    async def send_str(self, data):
+        self.sent.append(json.loads(data))
+
+    async def receive(self):
+        return await self.incoming.get()
+
+    async def close(self):
+        self.closed = True
+        self.incoming.put_nowait(aiohttp.WSMessage(aiohttp.WSMsgType.CLOSED, None, None))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+class FakeSession(object):
+    """Open a FakeWebSocket for each connection, with the next list of
+    messages scripted for its endpoint"""
+
+    def __init__(self, scripts):
+        self.scripts = scripts
+        self.sockets = {}
+        self.closed = False
+
+    def ws_connect(self, url):
+        endpoint = url.rsplit("/", 1)[1]
+        ws = FakeWebSocket(self.scripts[endpoint].pop(0))
+        self.sockets.setdefault(endpoint, []).append(ws)
+        return ws
+
+    async def close(self):
+        self.closed = True
+
+
+async def wait_for(predicate):
+    for _ in range(500):
+        if predicate():
+            return
+        await asyncio.sleep(0.001)
+    raise AssertionError("timed out")
+
+
+class TestTiingoWebsocketManager(TestCase):
+
+    def setUp(self):
+        if not aiohttp_is_installed:
+            self.skipTest("test_wsmanager: aiohttp not installed.")
+        self.messages = []
+
+    def manager(self, session, **kwargs):
+        manager = TiingoWebsocketManager(
+            on_msg_cb=lambda endpoint, msg: self.messages.append((endpoint, msg)),
+            api_key="0" * 40, backoff=0.001, **kwargs)
+        manager._session = session
+        return manager
+
+    def test_endpoints_share_one_loop_and_callback(self):
+        session = FakeSession({
+            "iex": [[subscribed(1), HEARTBEAT, update("iex", "aapl")]],
+            "crypto": [[subscribed(2), update("crypto_data", "btcusd")]],
+        })
+
+        async def main():
+            manager = self.manager(session)
+            manager.add_endpoint("iex", tickers=["AAPL"], thresholdLevel=5)
+            manager.add_endpoint("crypto", tickers=["btcusd"])
+            task = asyncio.ensure_future(manager.run())
+            await wait_for(lambda: len(self.messages) == 4)
+            stats = manager.stats()
+            await manager.close()
+            await task
+            return stats
+
+        stats = asyncio.run(main())
+        assert sorted(endpoint for endpoint, _ in self.messages) == [
+            "crypto", "crypto", "iex", "iex"]
+        assert ("iex", json.loads(update("iex", "aapl"))) in self.messages
+        assert stats["iex"]["heartbeats"] == 1
+        assert stats["crypto"]["subscription_id"] == 2
+        assert session.sockets["iex"][0].sent == [
+            {"eventName": "subscribe", "authorization": "0" * 40,
+             "eventData": {"thresholdLevel": 5, "tickers": ["aapl"]}}]
+        assert session.closed
+
+    def test_dynamic_subscriptions(self):
+        session = FakeSession({"iex": [[]]})
+
+        async def main():
+            manager = self.manager(session)
+            manager.add_endpoint("iex", tickers=["aapl"])
+            task = asyncio.ensure_future(manager.run())
+            await wait_for(lambda: "iex" in session.sockets)
+            ws = session.sockets["iex"][0]
+
+            # Changes made before the subscriptionId is known are sent with it
+            await manager.subscribe("iex", "msft")
+            ws.push(subscribed(7))
+            await wait_for(lambda: len(ws.sent) == 2)
+
+            await manager.subscribe("iex", "GOOGL")
+            await manager.unsubscribe("iex", "aapl")
+            await manager.close()
+            await task
+            return ws.sent
+
+        sent = asyncio.run(main())
+        assert [(m["eventName"], m["eventData"]) for m in sent[1:]] == [
+            ("subscribe", {"subscriptionId": 7, "tickers": ["msft"]}),
+            ("subscribe", {"subscriptionId": 7, "tickers": ["googl"]}),
+            ("unsubscribe", {"subscriptionId": 7, "tickers": ["aapl"]}),
+        ]
+
+    def test_reconnects_and_resubscribes(self):
+        session = FakeSession({"fx": [[subscribed(1)], [subscribed(2)]]})
+
+        async def main():
+            manager = self.manager(session)
+            manager.add_endpoint("fx", tickers=["eurusd"])
+            task = asyncio.ensure_future(manager.run())
+            await wait_for(lambda: len(session.sockets.get("fx", [])) == 1
+                           and manager.feeds["fx"].subscription_id == 1)
+            await manager.subscribe("fx", "gbpusd")
+            await session.sockets["fx"][0].close()  # The server drops the connection
+            await wait_for(lambda: manager.feeds["fx"].subscription_id == 2)
+            await manager.close()
+            await task
+            return manager.feeds["fx"]
+
+        feed = asyncio.run(main())
+        assert feed.connections == 2
+        assert session.sockets["fx"][1].sent[0]["eventData"] == {
+            "tickers": ["eurusd", "gbpusd"]}
+
+    def test_no_tickers_is_not_every_ticker(self):
+        session = FakeSession({"fx": [[subscribed(1)], [], []]})
+
+        async def main():
+            manager = self.manager(session)
+            manager.add_endpoint("fx", tickers=["eurusd"])
+            task = asyncio.ensure_future(manager.run())
+            await wait_for(lambda: manager.feeds["fx"].subscription_id == 1)
+            await manager.unsubscribe("fx", "eurusd")
+            await session.sockets["fx"][0].close()
+            await wait_for(lambda: len(session.sockets["fx"]) == 2)
+            ws = session.sockets["fx"][1]
+            await wait_for(lambda: manager.feeds["fx"].connections == 2)
+            sent_before = list(ws.sent)
+            await manager.subscribe("fx", "gbpusd")
+            await manager.close()
+            await task
+            return sent_before, ws.sent
+
+        sent_before, sent = asyncio.run(main())
+        assert sent_before == []
+        assert [m["eventData"] for m in sent] == [{"tickers": ["gbpusd"]}]
+
+    def test_callback_and_decode_errors_are_logged(self):
+        session = FakeSession({"iex": [["{not json", update("iex", "aapl"),
+                                        update("iex", "msft")]]})
+
+        def on_msg(endpoint, msg):
+            if msg["data"][1] == "aapl":
+                raise ValueError("bad message")
+            self.messages.append((endpoint, msg))
+
+        async def main():
+            manager = TiingoWebsocketManager(on_msg_cb=on_msg, api_key="0" * 40,
+                                             reconnect=False, heartbeat_timeout=0.01)
+            manager._session = session
+            manager.add_endpoint("iex")
+            with self.assertLogs("tiingo.wsmanager", "ERROR") as logs:
+                await manager.run()
+            return logs.output
+
+        logs = asyncio.run(main())
+        assert self.messages == [("iex", json.loads(update("iex", "msft")))]
+        assert len(logs) == 2
+
+    def test_run_ends_without_reconnect(self):
+        session = FakeSession({"iex": [[update("iex", "aapl")]]})
+
+        async def main():
+            manager = self.manager(session, reconnect=False, heartbeat_timeout=0.01,
+                                   parse=False)
+            manager.add_endpoint("iex")
+            await manager.run()
+
+        asyncio.run(main())
+        assert self.messages == [("iex", update("iex", "aapl"))]
+        assert session.sockets["iex"][0].sent[0]["eventData"] == {}
@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 from tiingo.api import TiingoClient
+from tiingo.asyncclient import AsyncTiingoClient
 from tiingo.wsclient import TiingoWebsocketClient
+from tiingo.wsmanager import TiingoWebsocketManager
 
 __author__ = """Cameron Yick"""
 __email__ = "cameron.yick@enigma.com"
@@ -1,21 +1,37 @@
 # -*- coding: utf-8 -*-
 
-from collections import namedtuple
-import csv
-import json
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import datetime
+from io import BytesIO
 import os
 import re
-import sys
-from zipfile import ZipFile
-
-import requests
-
+import time
+from urllib.parse import urlsplit
+
+from tiingo.bulk import (
+    checksum_from_metadata,
+    download_file,
+    iter_json_values,
+    open_decompressed,
+)
+from tiingo.columnar import (
+    arrow_table_from_csv,
+    concat_arrow_tables,
+    concat_numpy_columns,
+    numpy_columns_from_csv,
+    numpy_columns_from_records,
+    parse_iso_dates,
+)
+from tiingo.listing import ListingCache
 from tiingo.restclient import RestClient
 from tiingo.exceptions import (
     InstallPandasException,
     APIColumnNameError,
     InvalidFrequencyError,
     MissingRequiredArgumentError,
+    TickerFetchError,
 )
 
 from tiingo.__version__ import __version__ as VERSION
@@ -27,36 +43,203 @@ try:
 except ImportError:
     pandas_is_installed = False
 
+INSTALL_PANDAS_MESSAGE = (
+    "Pandas is not installed, but .get_ticker_price() was "
+    "called with fmt=pandas.  In order to install tiingo with "
+    "pandas, reinstall with pandas as an optional dependency. \n"
+    "Install tiingo with pandas dependency: 'pip install tiingo[pandas]'\n"
+    "Alternatively, just install pandas: pip install pandas."
+)
+
+# Formats converted locally from the format requested from the API
+REQUEST_FORMATS = {"object": "json", "numpy": "csv", "arrow": "csv"}
+
+# Most articles the news endpoint returns per page
+MAX_NEWS_LIMIT = 1000
 
-# These methods enable python 2 + 3 compatibility.
-def get_zipfile_from_response(response):
-    if sys.version_info < (3, 0):  # python 2
-        from StringIO import StringIO as Buffer
-    else:  # python 3
-        from io import BytesIO as Buffer
-    buffered = Buffer(response.content)
-    return ZipFile(buffered)
+# Concurrent requests used by get_tickers_metadata, unless config['max_workers']
+# is set.
+DEFAULT_METADATA_WORKERS = 8
 
+# Ticker metadata fields also found in the supported tickers listing, and the
+# listing column holding each.
+LISTING_METADATA_FIELDS = {
+    "ticker": "ticker",
+    "exchangeCode": "exchange",
+    "startDate": "startDate",
+    "endDate": "endDate",
+}
 
-def get_buffer_from_zipfile(zipfile, filename):
-    if sys.version_info < (3, 0):  # python 2
-        from StringIO import StringIO
+LISTING_FILE_URL = "https://apimedia.tiingo.com/docs/tiingo/daily/supported_tickers.zip"
 
-        return StringIO(zipfile.read(filename))
-    else:  # python 3
-        # Source:
-        # https://stackoverflow.com/questions/5627954/py3k-how-do-you-read-a-file-inside-a-zip-file-as-text-not-bytes
-        from io import TextIOWrapper, BytesIO
+# Timezone of every date index, created once rather than looked up per call
+UTC = datetime.timezone.utc
 
-        return TextIOWrapper(BytesIO(zipfile.read(filename)))
+
+def get_stream_from_response(response):
+    """Return a binary file-like object reading the body of response.
+
+    Responses requested with stream=True are read straight from the socket,
+    without holding the raw and decoded body in memory at the same time.
+    """
+    if response.raw is not None and not response._content_consumed:
+        response.raw.decode_content = True
+        return response.raw
+    return BytesIO(response.content)
+
+
+@lru_cache(maxsize=256)
+def get_record_type(object_name, fields):
+    """Return the namedtuple class for a record schema, creating it only once"""
+    return namedtuple(object_name, fields)
 
 
 def dict_to_object(item, object_name):
     """Converts a python dict to a namedtuple, saving memory."""
-    fields = item.keys()
-    values = item.values()
-    return json.loads(
-        json.dumps(item), object_hook=lambda d: namedtuple(object_name, fields)(*values)
+    return get_record_type(object_name, tuple(item))._make(item.values())
+
+
+def dicts_to_objects(items, object_name):
+    """Converts a list of python dicts to namedtuples, sharing one class per schema."""
+    records = []
+    fields = None
+    for item in items:
+        keys = tuple(item)
+        if keys != fields:
+            fields = keys
+            make = get_record_type(object_name, fields)._make
+        records.append(make(item.values()))
+    return records
+
+
+def run_concurrently(fn, items, max_workers=1):
+    """Call fn(item) for every item, with at most max_workers calls in flight.
+
+    Returns a list of (item, result, error) tuples in the same order as items.
+    Exactly one of result and error is set, so one failing item does not
+    discard the results of the others.
+    """
+    items = list(items)
+
+    def call(item):
+        try:
+            return item, fn(item), None
+        except Exception as e:
+            return item, None, e
+
+    if not max_workers or max_workers <= 1 or len(items) <= 1:
+        return [call(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        return list(executor.map(call, items))
+
+
+def utc_date_index(index):
+    """Return index as a UTC DatetimeIndex named "date".
+
+    The API returns ISO-8601 dates, either in UTC or, for daily csv data,
+    without a timezone, so they are parsed by numpy with a known format
+    instead of pandas inferring it. An index that is already in UTC is
+    returned unchanged; other formats fall back to pandas.to_datetime.
+    """
+    if not isinstance(index, pd.DatetimeIndex):
+        try:
+            dates = parse_iso_dates(index.tolist())
+        except (TypeError, ValueError, AttributeError):
+            return utc_date_index(pd.to_datetime(index, utc=True))
+        return pd.DatetimeIndex(dates, name="date").tz_localize(UTC)
+
+    # Localize to UTC to ensure equivalence between data returned in json format and
+    # csv format. Tiingo daily data requested in csv format does not include a timezone.
+    if index.tz is None:
+        return index.tz_localize(UTC)
+    if str(index.tz) != "UTC":
+        return index.tz_convert(UTC)
+    return index
+
+
+def combine_series(series, index=None):
+    """Combine a list of named pandas.Series into one DataFrame in a single pass.
+
+    Concatenating inside a loop copies the frame built so far on every
+    iteration, which is quadratic in the number of series.
+
+    Args:
+        series (list): pandas.Series, one per column, named after the column
+        index (pandas.Index): Optional pre-allocated index to align every series
+            to, instead of the sorted union of their indexes.
+    """
+    if index is None:
+        if not series:
+            return pd.DataFrame()
+        return pd.concat(series, axis=1, sort=True)
+
+    index = pd.DatetimeIndex(index)
+    if index.tz is None:
+        index = index.tz_localize("UTC")
+    if not series:
+        return pd.DataFrame(index=index)
+    return pd.concat([s.reindex(index) for s in series], axis=1)
+
+
+def is_empty_price_response(response, fmt):
+    """Whether a price response holds no bars: an empty JSON list, or a csv
+    body with at most a header"""
+    content = response.content.strip()
+    if fmt == "csv":
+        return len(content.splitlines()) <= 1
+    return content in (b"", b"[]")
+
+
+def stitch_windows(parts, fmt):
+    """Join the get_ticker_price results of consecutive date windows, dropping
+    bars returned by more than one window.
+    """
+    if fmt == "csv":
+        header = None
+        lines = []
+        seen = set()
+        for part in parts:
+            part_lines = part.splitlines()
+            if not part_lines:
+                continue
+            header = part_lines[0]
+            for line in part_lines[1:]:
+                date = line.split(",", 1)[0]
+                if line and date not in seen:
+                    seen.add(date)
+                    lines.append(line)
+        if header is None:
+            return ""
+        return "\n".join([header] + lines) + "\n"
+
+    if fmt == "numpy":
+        return concat_numpy_columns(parts)
+    if fmt == "arrow":
+        return concat_arrow_tables(parts)
+
+    records = []
+    seen = set()
+    for part in parts:
+        for record in part:
+            date = getattr(record, "date", None) if fmt == "object" else record["date"]
+            if date not in seen:
+                seen.add(date)
+                records.append(record)
+    return records
+
+
+def ticker_fetch_error(action, total, results, errors):
+    """Return a TickerFetchError describing which tickers failed and why"""
+    return TickerFetchError(
+        "Failed to {} {} of {} tickers: {}".format(
+            action,
+            len(errors),
+            total,
+            ", ".join("{} ({})".format(ticker, e) for ticker, e in errors.items()),
+        ),
+        results=results,
+        errors=errors,
     )
 
 
@@ -65,6 +248,16 @@ class TiingoClient(RestClient):
 
     Supply API Key via Environment Variable TIINGO_API_KEY
     or via the Config Object
+
+    Set config['max_workers'] to fetch multiple tickers concurrently by
+    default (see get_dataframe).
+
+    Intraday requests spanning more than config['intraday_max_bars'] bars
+    (default 10000) are split into date windows that are fetched concurrently
+    and stitched back together. Set it to None to disable splitting.
+
+    Ticker metadata fetched by get_tickers_metadata is kept in memory for
+    config['metadata_ttl'] seconds (default one day).
     """
 
     def __init__(self, *args, **kwargs):
@@ -76,6 +269,16 @@ class TiingoClient(RestClient):
         except KeyError:
             api_key = os.environ.get("TIINGO_API_KEY")
         self._api_key = api_key
+        self._max_workers = self._config.get("max_workers", 1)
+        self._intraday_max_bars = self._config.get("intraday_max_bars", 10000)
+
+        listing_cache = self._config.get("listing_cache")
+        if not isinstance(listing_cache, ListingCache):
+            listing_cache = ListingCache(listing_cache)
+        self._listing_cache = listing_cache
+
+        self._metadata_ttl = self._config.get("metadata_ttl", 24 * 60 * 60)
+        self._metadata_cache = {}
 
         if not (api_key):
             raise RuntimeError(
@@ -106,20 +309,33 @@ class TiingoClient(RestClient):
          on, and the currency the stock is traded on.
         Tickers for unrelated products are omitted.
         https://apimedia.tiingo.com/docs/tiingo/daily/supported_tickers.zip
+
+        The listing is downloaded once and then only revalidated (see
+        get_ticker_listing), so repeated calls are cheap.
         """
-        listing_file_url = (
-            "https://apimedia.tiingo.com/docs/tiingo/daily/supported_tickers.zip"
-        )
-        response = requests.get(listing_file_url)
-        zipdata = get_zipfile_from_response(response)
-        raw_csv = get_buffer_from_zipfile(zipdata, "supported_tickers.csv")
-        reader = csv.DictReader(raw_csv)
+        return self._filter_listing(self.get_ticker_listing(), assetTypes)
 
-        if not len(assetTypes):
-            return [row for row in reader]
+    def get_ticker_listing(self):
+        """Return the supported tickers as a tiingo.listing.TickerListing,
+        indexed by ticker, exchange, assetType and date coverage.
+
+        The listing file is kept in memory, or in the directory given as
+        config['listing_cache'], and revalidated with a conditional request
+        at most once an hour. Pass a tiingo.listing.ListingCache as
+        config['listing_cache'] to change that interval.
+        """
+        cache = self._listing_cache
+        if not cache.is_fresh():
+            response = self._session.get(
+                LISTING_FILE_URL, headers=cache.request_headers()
+            )
+            cache.update(response)
+        return cache.get_listing()
 
-        assetTypesSet = set(assetTypes)
-        return [row for row in reader if row.get("assetType") in assetTypesSet]
+    def _filter_listing(self, listing, assetTypes):
+        if not len(assetTypes):
+            return listing.to_dicts()
+        return [dict(row) for row in listing.by_asset_type(*assetTypes)]
 
     def list_stock_tickers(self):
         return self.list_tickers(["Stock"])
@@ -137,13 +353,120 @@ class TiingoClient(RestClient):
          Args:
              ticker (str) : Unique identifier for stock
         """
-        url = "tiingo/daily/{}".format(ticker)
-        response = self._request("GET", url)
-        data = response.json()
-        if fmt == "json":
-            return data
-        elif fmt == "object":
-            return dict_to_object(data, "Ticker")
+        url, params = self._prepare_ticker_metadata(ticker)
+        response = self._request("GET", url, params=params)
+        return self._format_response(response, fmt, "Ticker")
+
+    def _prepare_ticker_metadata(self, ticker):
+        return "tiingo/daily/{}".format(ticker), None
+
+    def get_tickers_metadata(self, tickers, fmt="json", fields=None, max_workers=None):
+        """Return metadata for many tickers, as a dict of ticker to metadata.
+
+        Tickers are fetched concurrently and their metadata is cached for
+        config['metadata_ttl'] seconds. When fields only names fields found in
+        the supported tickers listing (ticker, exchangeCode, startDate and
+        endDate), listed tickers are answered from get_ticker_listing()
+        without a request each.
+
+        Raises TickerFetchError, with the metadata of the other tickers as its
+        results, if any ticker fails.
+
+         Args:
+             tickers (list): Unique identifiers for stocks
+             fmt (string): 'json' (default) or 'object'
+             fields (list): Optional metadata fields to return, e.g. ['name']
+             max_workers (int): Concurrent requests, defaults to
+                config['max_workers'] or 8
+        """
+        listing = None
+        if self._listing_answers(fields):
+            listing = self.get_ticker_listing()
+        metadata, missing = self._known_metadata(tickers, fields, listing)
+
+        if max_workers is None:
+            max_workers = self._config.get("max_workers", DEFAULT_METADATA_WORKERS)
+        errors = {}
+        for ticker, ticker_metadata, error in run_concurrently(
+            self._fetch_ticker_metadata, missing, max_workers
+        ):
+            if error is not None:
+                errors[ticker] = error
+            else:
+                metadata[ticker] = ticker_metadata
+        return self._format_tickers_metadata(tickers, metadata, errors, fields, fmt)
+
+    def _fetch_ticker_metadata(self, ticker):
+        url, params = self._prepare_ticker_metadata(ticker)
+        response = self._request("GET", url, params=params)
+        return self._store_metadata(ticker, self._decode_json(response))
+
+    def _listing_answers(self, fields):
+        return bool(fields) and set(fields) <= set(LISTING_METADATA_FIELDS)
+
+    def _known_metadata(self, tickers, fields, listing=None):
+        """Split tickers into a dict of the metadata available without a
+        request, from the cache or listing, and a list of tickers to fetch."""
+        metadata = {}
+        missing = []
+        now = time.time()
+        for ticker in dict.fromkeys(tickers):
+            cached = self._metadata_cache.get(ticker.upper())
+            if cached is not None and now - cached[0] < self._metadata_ttl:
+                metadata[ticker] = cached[1]
+                continue
+            row = listing.get(ticker) if listing is not None else None
+            if row is not None:
+                metadata[ticker] = {
+                    field: row[column]
+                    for field, column in LISTING_METADATA_FIELDS.items()
+                }
+            else:
+                missing.append(ticker)
+        return metadata, missing
+
+    def _store_metadata(self, ticker, metadata):
+        self._metadata_cache[ticker.upper()] = (time.time(), metadata)
+        return metadata
+
+    def _format_tickers_metadata(self, tickers, metadata, errors, fields, fmt):
+        results = {}
+        for ticker in tickers:
+            if ticker not in metadata:
+                continue
+            ticker_metadata = metadata[ticker]
+            if fields:
+                ticker_metadata = {
+                    field: ticker_metadata.get(field) for field in fields
+                }
+            if fmt == "object":
+                ticker_metadata = dict_to_object(ticker_metadata, "Ticker")
+            results[ticker] = ticker_metadata
+
+        if errors:
+            raise ticker_fetch_error("fetch metadata of", len(tickers), results, errors)
+        return results
+
+    def _format_response(self, response, fmt, object_name=None):
+        """Decode a response according to the fmt requested by the caller.
+
+        'csv' returns the body as text, 'numpy' and 'arrow' parse a csv body
+        into columns, 'object' converts each JSON record to a namedtuple called
+        object_name, anything else returns the decoded JSON.
+        """
+        if fmt == "csv":
+            return response.content.decode("utf-8")
+        if fmt == "numpy":
+            return numpy_columns_from_csv(get_stream_from_response(response))
+        if fmt == "arrow":
+            return arrow_table_from_csv(get_stream_from_response(response))
+
+        data = self._decode_json(response)
+        if fmt == "object":
+            if isinstance(data, list):
+                return dicts_to_objects(data, object_name)
+            return dict_to_object(data, object_name)
+        return data
 
     def _invalid_frequency(self, frequency):
         """
@@ -176,7 +499,7 @@ class TiingoClient(RestClient):
             else:
                 return "iex/{}/prices".format(ticker)
 
-    def _request_pandas(self, ticker, metric_name, params):
+    def _request_pandas(self, ticker, metric_name, params, max_workers=None):
         """
         Return data for ticker as a pandas.DataFrame if metric_name is not
         specified or as a pandas.Series if metric_name is specified.
@@ -188,19 +511,175 @@ class TiingoClient(RestClient):
             ticker.  In the event of a single ticker, this is optional and if not specified
             all of the available data will be returned.  In the event of a list of tickers,
             this parameter is required.
+        :param max_workers (int): Date windows requested concurrently, defaults
+            to config['max_workers']
         """
-        url = self._get_url(ticker, params["resampleFreq"])
-        response = self._request("GET", url, params=params)
-        if params["format"] == "csv":
-            if sys.version_info < (3, 0):  # python 2
-                from StringIO import StringIO
-            else:  # python 3
-                from io import StringIO
+        windows = self._window_params(params)
+        if len(windows) > 1:
+            ((_, prices, error),) = self._request_windows_pandas(
+                [ticker], metric_name, windows, max_workers
+            )
+            if error is not None:
+                raise error
+            return prices
+
+        return self._request_frame(ticker, metric_name, params)
+
+    def _request_windows_pandas(self, tickers, metric_name, windows, max_workers):
+        """Request the date windows of every ticker from one pool of at most
+        max_workers requests, so that concurrent tickers don't each open their
+        own pool of windows. Returns (ticker, prices, error) tuples in the
+        order of tickers, with the error of the first failed window of a
+        ticker, since partial histories would silently have gaps.
+        """
+        if max_workers is None:
+            max_workers = self._max_workers
+
+        def request_window(item):
+            ticker, window_params = item
+            return self._request_frame(
+                ticker, metric_name, window_params, skip_empty=True
+            )
 
-            df = pd.read_csv(StringIO(response.content.decode("utf-8")))
+        items = [(ticker, window) for ticker in tickers for window in windows]
+        fetched = run_concurrently(request_window, items, max_workers)
+        results = []
+        for i, ticker in enumerate(tickers):
+            parts = fetched[i * len(windows) : (i + 1) * len(windows)]
+            errors = [error for _, _, error in parts if error is not None]
+            if errors:
+                results.append((ticker, None, errors[0]))
+            else:
+                frames = [frame for _, frame, _ in parts]
+                results.append((ticker, self._stitch_frames(frames, metric_name), None))
+        return results
+
+    def _window_params(self, params):
+        """Return the request params of each date window of a get_dataframe
+        request, or [params] when the range needs no split"""
+        windows = self._date_windows(
+            params.get("startDate"), params.get("endDate"), params["resampleFreq"]
+        )
+        if len(windows) == 1:
+            return [params]
+        return [dict(params, startDate=start, endDate=end) for start, end in windows]
+
+    def _frame_from_window(self, response, metric_name, params):
+        """Build the frame of one date window, or None when it has no bars"""
+        if is_empty_price_response(response, params["format"]):
+            return None
+        return self._frame_from_response(response, metric_name, params)
+
+    def _stitch_frames(self, frames, metric_name):
+        """Concatenate the frames of consecutive date windows, skipping the
+        windows without bars (None) and dropping repeated dates"""
+        frames = [frame for frame in frames if frame is not None]
+        if not frames:
+            # No window had any bars, e.g. a ticker listed after the range
+            index = pd.DatetimeIndex([], tz=UTC, name="date")
+            if metric_name is not None:
+                return pd.Series(index=index, name=metric_name, dtype="float64")
+            return pd.DataFrame(index=index)
+        prices = pd.concat(frames)
+        return prices[~prices.index.duplicated()]
+
+    def _request_frame(self, ticker, metric_name, params, skip_empty=False):
+        """Request one date range of prices as a frame. With skip_empty,
+        return None when the range has no bars instead of failing to index
+        an empty response by date."""
+        url = self._get_url(ticker, params["resampleFreq"])
+        stream = self._stream_csv(params) and not skip_empty
+        response = self._request("GET", url, params=params, stream=stream)
+        try:
+            if skip_empty:
+                return self._frame_from_window(response, metric_name, params)
+            return self._frame_from_response(response, metric_name, params)
+        finally:
+            response.close()
+
+    def _date_windows(self, startDate, endDate, frequency):
+        """Split an intraday date range into windows of at most
+        config['intraday_max_bars'] bars, as (startDate, endDate) pairs.
+        Returns a single window when no split is needed.
+        """
+        match = self._frequency_pattern.match(frequency)
+        if not (startDate and self._intraday_max_bars and match):
+            return [(startDate, endDate)]
+
+        minutes = int(frequency[: match.start(1)])
+        if match.group(1).lower() == "hour":
+            minutes *= 60
+        # Assume bars around the clock, so that windows stay under the limit
+        # even with pre and post market data.
+        days = max(1, self._intraday_max_bars * minutes // (24 * 60))
+
+        start = datetime.date.fromisoformat(str(startDate)[:10])
+        if endDate:
+            end = datetime.date.fromisoformat(str(endDate)[:10])
         else:
-            df = pd.DataFrame(response.json())
+            end = datetime.datetime.now(datetime.timezone.utc).date()
+        if (end - start).days < days:
+            return [(startDate, endDate)]
+
+        windows = []
+        while start <= end:
+            stop = min(start + datetime.timedelta(days=days - 1), end)
+            windows.append((start.isoformat(), stop.isoformat()))
+            start = stop + datetime.timedelta(days=1)
+        return windows
+
+    def _fetch_windows(self, fetch_window, windows):
+        """Fetch every date window concurrently and return the results in order.
+        Raises the error of the first failed window, since partial histories
+        would silently have gaps.
+        """
+        results = []
+        for _, result, error in run_concurrently(
+            fetch_window, windows, self._max_workers
+        ):
+            if error is not None:
+                raise error
+            results.append(result)
+        return results
+
+    def _stream_csv(self, params):
+        # Cached responses are read in full anyway, so only stream without a cache.
+        return params["format"] == "csv" and self._cache is None
+
+    def _frame_from_response(self, response, metric_name, params):
+        """Build the DataFrame or Series returned by _request_pandas"""
+        if params["format"] == "csv":
+            df = pd.read_csv(get_stream_from_response(response))
+            return self._index_by_date(df, metric_name)
+
+        records = self._decode_json(response)
+        if not isinstance(records, list) or not records or "date" not in records[0]:
+            return self._index_by_date(pd.DataFrame(records), metric_name)
+        return self._frame_from_records(records, metric_name)
+
+    def _frame_from_records(self, records, metric_name=None):
+        """Build a date indexed frame from JSON price records, converting each
+        column straight to a typed array instead of going through an object
+        DataFrame and re-parsing its date strings."""
+        columns = None if metric_name is None else ["date", metric_name]
+        arrays = numpy_columns_from_records(records, columns)
+        index = pd.DatetimeIndex(arrays.pop("date"), name="date").tz_localize(UTC)
+        if metric_name is not None:
+            return pd.Series(arrays[metric_name], index=index, name=metric_name)
+        return pd.DataFrame(arrays, index=index)
 
+    def _iter_frames_from_response(self, response, metric_name, chunksize):
+        """Yield the csv rows of response as date indexed frames of chunksize rows"""
+        try:
+            with pd.read_csv(
+                get_stream_from_response(response), chunksize=chunksize
+            ) as reader:
+                for df in reader:
+                    yield self._index_by_date(df, metric_name)
+        finally:
+            response.close()
+
+    def _index_by_date(self, df, metric_name):
         df.set_index("date", inplace=True)
 
         if metric_name is not None:
@@ -208,13 +687,7 @@ class TiingoClient(RestClient):
         else:
             prices = df
 
-        prices.index = pd.to_datetime(prices.index)
-
-        # Localize to UTC to ensure equivalence between data returned in json format and
-        # csv format. Tiingo daily data requested in csv format does not include a timezone.
-        if prices.index.tz is None:
-            prices.index = prices.index.tz_localize("UTC")
-
+        prices.index = utc_date_index(prices.index)
         return prices
 
     def get_ticker_price(
@@ -238,12 +711,60 @@ class TiingoClient(RestClient):
              endDate (string): End of ticker range in YYYY-MM-DD format
              columns (string): Optional comma separated parameter specifying which columns to retrieve.
                 By default, 'date', 'open', 'close', 'high' and 'low' are retrieved. 'volume' is an extra option.
-             fmt (string): 'csv' or 'json'
+             fmt (string): 'csv', 'json', 'object', or one of the columnar formats
+                'numpy' (a dict of column name to numpy array, with datetime64[ns]
+                UTC dates, int64 volumes and float64 prices) and 'arrow'
+                (a pyarrow.Table). Columnar formats are parsed straight from the
+                csv response without building per-bar dicts.
              frequency (string): Resample frequency
         """
+        windows = self._date_windows(startDate, endDate, frequency)
+        if len(windows) > 1:
+
+            def request_window(window):
+                url, params = self._prepare_ticker_price(
+                    ticker, window[0], window[1], columns, fmt, frequency
+                )
+                response = self._request("GET", url, params=params)
+                try:
+                    return self._format_price_window(response, fmt)
+                finally:
+                    response.close()
+
+            return self._stitch_price_windows(
+                self._fetch_windows(request_window, windows), fmt
+            )
+
+        url, params = self._prepare_ticker_price(
+            ticker, startDate, endDate, columns, fmt, frequency
+        )
+
+        response = self._request(
+            "GET", url, params=params, stream=self._stream_csv(params)
+        )
+        try:
+            return self._format_response(response, fmt, "TickerPrice")
+        finally:
+            response.close()
+
+    def _format_price_window(self, response, fmt):
+        """Return (empty, result) for the response of one date window"""
+        empty = is_empty_price_response(response, REQUEST_FORMATS.get(fmt, fmt))
+        return empty, self._format_response(response, fmt, "TickerPrice")
+
+    def _stitch_price_windows(self, parts, fmt):
+        """Stitch the (empty, result) parts of _format_price_window. Windows
+        without bars are skipped, as their csv header alone parses to columns
+        of a different type, unless every window is empty."""
+        results = [result for empty, result in parts if not empty]
+        return stitch_windows(results or [parts[0][1]], fmt)
+
+    def _prepare_ticker_price(
+        self, ticker, startDate, endDate, columns, fmt, frequency
+    ):
         url = self._get_url(ticker, frequency)
         params = {
-            "format": fmt if fmt != "object" else "json",  # conversion local
+            "format": REQUEST_FORMATS.get(fmt, fmt),  # conversion local
             "resampleFreq": frequency,
         }
 
@@ -253,17 +774,7 @@ class TiingoClient(RestClient):
             params["endDate"] = endDate
         if columns:
             params["columns"] = columns
-
-        # TODO: evaluate whether to stream CSV to cache on disk, or
-        # load as array in memory, or just pass plain text
-        response = self._request("GET", url, params=params)
-        if fmt == "json":
-            return response.json()
-        elif fmt == "object":
-            data = response.json()
-            return [dict_to_object(item, "TickerPrice") for item in data]
-        else:
-            return response.content.decode("utf-8")
+        return url, params
 
     def get_dataframe(
         self,
@@ -274,6 +785,9 @@ class TiingoClient(RestClient):
         columns=None,
         frequency="daily",
         fmt="json",
+        max_workers=None,
+        index=None,
+        chunksize=None,
     ):
         """Return a pandas.DataFrame of historical prices for one or more ticker symbols.
 
@@ -296,8 +810,71 @@ class TiingoClient(RestClient):
                 this parameter is required.
             frequency (string): Resample frequency (defaults to daily).
             fmt (string): 'csv' or 'json'
+            max_workers (int): Maximum number of requests in flight, for the tickers of
+                a list and the date windows of long intraday ranges. Defaults to
+                config['max_workers'], or 1 (serial).
+                Columns keep the order of tickers. If any ticker fails, the others are
+                still fetched and a TickerFetchError is raised carrying both the
+                DataFrame of the successful tickers and the per-ticker errors.
+            index (pandas.DatetimeIndex): Optional pre-allocated date index for the
+                result when tickers is a list. Each ticker's series is aligned to it
+                directly instead of to the union of all returned dates; naive indexes
+                are treated as UTC.
+            chunksize (int): With a single ticker and fmt='csv', return an iterator
+                of DataFrames (or Series) of at most chunksize rows each, parsed
+                while the response is being downloaded.
         """
+        params = self._prepare_dataframe(
+            tickers, startDate, endDate, metric_name, columns, frequency, fmt
+        )
+
+        if pandas_is_installed:
+            if chunksize is not None:
+                if type(tickers) is not str or fmt != "csv":
+                    raise ValueError(
+                        "chunksize is only supported for a single ticker with fmt='csv'"
+                    )
+                url = self._get_url(tickers, frequency)
+                response = self._request(
+                    "GET", url, params=params, stream=self._stream_csv(params)
+                )
+                return self._iter_frames_from_response(response, metric_name, chunksize)
+
+            if max_workers is None:
+                max_workers = self._max_workers
+
+            if type(tickers) is str:
+                prices = self._request_pandas(
+                    ticker=tickers,
+                    params=params,
+                    metric_name=metric_name,
+                    max_workers=max_workers,
+                )
+            else:
+                windows = self._window_params(params)
+                if len(windows) > 1:
+                    results = self._request_windows_pandas(
+                        tickers, metric_name, windows, max_workers
+                    )
+                else:
+
+                    def request_ticker(stock):
+                        return self._request_pandas(
+                            ticker=stock, params=params, metric_name=metric_name
+                        )
+
+                    results = run_concurrently(request_ticker, tickers, max_workers)
+                prices = self._combine_ticker_results(results, index)
 
+            return prices
+
+        else:
+            raise InstallPandasException(INSTALL_PANDAS_MESSAGE)
+
+    def _prepare_dataframe(
+        self, tickers, startDate, endDate, metric_name, columns, frequency, fmt
+    ):
+        """Validate get_dataframe arguments and return the request params"""
         valid_columns = {
             "open",
             "high",
@@ -329,32 +906,102 @@ class TiingoClient(RestClient):
             params["endDate"] = endDate
         if columns:
             params["columns"] = columns
+        return params
 
-        if pandas_is_installed:
-            if type(tickers) is str:
-                prices = self._request_pandas(
-                    ticker=tickers, params=params, metric_name=metric_name
-                )
-            else:
-                prices = pd.DataFrame()
-                for stock in tickers:
-                    ticker_series = self._request_pandas(
-                        ticker=stock, params=params, metric_name=metric_name
-                    )
-                    ticker_series = ticker_series.rename(stock)
-                    prices = pd.concat([prices, ticker_series], axis=1, sort=True)
+    def _combine_ticker_results(self, results, index=None):
+        """Combine (ticker, series, error) results into one DataFrame.
 
-            return prices
+        Raises TickerFetchError carrying the combined DataFrame of the
+        successful tickers if any ticker failed.
+        """
+        series = []
+        errors = {}
+        for stock, ticker_series, error in results:
+            if error is not None:
+                errors[stock] = error
+                continue
+            series.append(ticker_series.rename(stock))
+        prices = combine_series(series, index=index)
+
+        if errors:
+            raise ticker_fetch_error("fetch", len(results), prices, errors)
+        return prices
 
-        else:
-            error_message = (
-                "Pandas is not installed, but .get_ticker_price() was "
-                "called with fmt=pandas.  In order to install tiingo with "
-                "pandas, reinstall with pandas as an optional dependency. \n"
-                "Install tiingo with pandas dependency: 'pip install tiingo[pandas]'\n"
-                "Alternatively, just install pandas: pip install pandas."
+    def sync_prices(
+        self,
+        tickers,
+        store,
+        startDate="1900-01-01",
+        endDate=None,
+        columns=None,
+        frequency="daily",
+        max_workers=None,
+    ):
+        """Bring the price history held in store up to date, downloading only
+        the bars that come after the latest bar already stored per ticker.
+
+        Args:
+            tickers (string/list): One or more unique identifiers for a stock ticker.
+            store: Where the history is kept, e.g. a tiingo.stores.CSVPriceStore.
+                It must provide last_date(ticker), returning the date of the
+                latest stored bar (or None), and append(ticker, prices).
+            startDate (string): Start of the history to download for tickers that
+                have nothing stored yet, in YYYY-MM-DD format.
+            endDate (string): End of ticker range in YYYY-MM-DD format.
+            columns (string): Optional comma separated parameter specifying which columns to retrieve.
+            frequency (string): Resample frequency (defaults to daily).
+            max_workers (int): Maximum number of tickers synced concurrently.
+                Defaults to config['max_workers'], or 1 (serial).
+
+        Returns a dict of ticker to number of bars appended. If any ticker fails,
+        the others are still synced and a TickerFetchError carrying that dict
+        is raised.
+        """
+        if isinstance(tickers, str):
+            tickers = [tickers]
+        if max_workers is None:
+            max_workers = self._max_workers
+        is_eod = self._is_eod_frequency(frequency)
+
+        def sync_ticker(ticker):
+            last_date = store.last_date(ticker)
+            if last_date is None:
+                start = startDate
+            elif is_eod:
+                last_day = datetime.date.fromisoformat(str(last_date)[:10])
+                start = (last_day + datetime.timedelta(days=1)).isoformat()
+            else:
+                # Intraday bars of the last stored day may still be missing.
+                start = str(last_date)[:10]
+
+            if endDate and start > endDate:
+                return 0
+            if start > datetime.datetime.now(datetime.timezone.utc).date().isoformat():
+                return 0
+
+            prices = self.get_ticker_price(
+                ticker,
+                startDate=start,
+                endDate=endDate,
+                columns=columns,
+                frequency=frequency,
             )
-            raise InstallPandasException(error_message)
+            if last_date is not None:
+                prices = [row for row in prices if row["date"] > str(last_date)]
+            store.append(ticker, prices)
+            return len(prices)
+
+        appended = {}
+        errors = {}
+        for ticker, count, error in run_concurrently(sync_ticker, tickers, max_workers):
+            if error is not None:
+                errors[ticker] = error
+            else:
+                appended[ticker] = count
+
+        if errors:
+            raise ticker_fetch_error("sync", len(tickers), appended, errors)
+        return appended
 
     # NEWS FEEDS
     # tiingo/news
@@ -386,6 +1033,32 @@ class TiingoClient(RestClient):
             sortBy (string): "publishedDate" OR "crawlDate", descending
             onlyWithTickers (bool): If true, only links with tagged tickers will return.
         """
+        url, params = self._prepare_news(
+            tickers,
+            tags,
+            sources,
+            startDate,
+            endDate,
+            limit,
+            offset,
+            sortBy,
+            onlyWithTickers,
+        )
+        response = self._request("GET", url, params=params)
+        return self._format_response(response, fmt, "NewsArticle")
+
+    def _prepare_news(
+        self,
+        tickers,
+        tags,
+        sources,
+        startDate,
+        endDate,
+        limit,
+        offset,
+        sortBy,
+        onlyWithTickers,
+    ):
         url = "tiingo/news"
         params = {
             "limit": limit,
@@ -398,12 +1071,89 @@ class TiingoClient(RestClient):
             "endDate": endDate,
             "onlyWithTickers": onlyWithTickers,
         }
-        response = self._request("GET", url, params=params)
-        data = response.json()
-        if fmt == "json":
-            return data
-        elif fmt == "object":
-            return [dict_to_object(item, "NewsArticle") for item in data]
+        return url, params
+
+    def iter_news(
+        self,
+        tickers=[],
+        tags=[],
+        sources=[],
+        startDate=None,
+        endDate=None,
+        limit=100,
+        offset=0,
+        sortBy="publishedDate",
+        onlyWithTickers=False,
+        fmt="json",
+        prefetch=2,
+        max_articles=None,
+    ):
+        """Iterate over every news article matching the search terms, one page
+        of limit articles at a time.
+
+        While a page is being consumed, the next prefetch pages are requested
+        in the background. Articles are de-duplicated by id, since new articles
+        shift the offsets of the pages still to come, and iteration stops at
+        the first page that isn't full.
+
+        Args:
+            See get_news for the search terms.
+            limit (int): Articles per page. Default 100, larger values are
+                lowered to the API's maximum of 1000
+            offset (int): Offset of the first page
+            prefetch (int): Pages requested ahead of the one being consumed
+            max_articles (int): Stop after this many articles
+        """
+        limit = min(limit, MAX_NEWS_LIMIT)
+
+        def fetch_page(page_offset):
+            url, params = self._prepare_news(
+                tickers,
+                tags,
+                sources,
+                startDate,
+                endDate,
+                limit,
+                page_offset,
+                sortBy,
+                onlyWithTickers,
+            )
+            return self._decode_json(self._request("GET", url, params=params))
+
+        seen = set()
+        count = 0
+        pending = deque()
+        executor = ThreadPoolExecutor(max_workers=max(1, prefetch))
+        try:
+            while True:
+                while len(pending) <= prefetch:
+                    pending.append(executor.submit(fetch_page, offset))
+                    offset += limit
+                page = pending.popleft().result()
+                for article in self._new_articles(page, seen, fmt):
+                    yield article
+                    count += 1
+                    if max_articles is not None and count >= max_articles:
+                        return
+                if len(page) < limit:
+                    return
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    def _new_articles(self, page, seen, fmt):
+        """Return the articles of page whose id isn't in seen, adding them"""
+        articles = []
+        for article in page:
+            article_id = article.get("id")
+            if article_id in seen:
+                continue
+            seen.add(article_id)
+            if fmt == "object":
+                article = dict_to_object(article, "NewsArticle")
+            articles.append(article)
+        return articles
 
     def get_bulk_news(self, file_id=None, fmt="json"):
         """Only available to institutional clients.
@@ -411,17 +1161,60 @@ class TiingoClient(RestClient):
         If ID is provided, provides URL which you can use to download your
         file, as well as some metadata about that file.
         """
+        url, params = self._prepare_bulk_news(file_id)
+        response = self._request("GET", url, params=params)
+        return self._format_response(response, fmt, "BulkNews")
+
+    def _prepare_bulk_news(self, file_id):
         if file_id:
-            url = "tiingo/news/bulk_download/{}".format(file_id)
-        else:
-            url = "tiingo/news/bulk_download"
+            return "tiingo/news/bulk_download/{}".format(file_id), None
+        return "tiingo/news/bulk_download", None
+
+    def download_bulk_news(self, file_id, directory=".", checksum=None):
+        """Only available to institutional clients.
+        Download a bulk news file to directory and return its path.
+
+        The file is streamed to disk, so it is never held in memory, and a
+        download interrupted by a dropped connection or an earlier failed call
+        is resumed where it stopped. The file's size, and its checksum when
+        known, are verified before it is given its final name; files already
+        downloaded are not downloaded again.
+
+         Args:
+             file_id (str): Id of the file, see get_bulk_news()
+             directory (str): Directory to save the file in
+             checksum (str): Expected checksum as "algorithm:hexdigest", if the
+                file metadata doesn't list one
+        """
+        metadata = self.get_bulk_news(file_id)
+        url = metadata["url"]
+        filename = metadata.get("filename") or os.path.basename(urlsplit(url).path)
+        path = os.path.join(directory, filename)
+        if os.path.exists(path):
+            return path
+
+        headers = self._headers if url.startswith(self._base_url) else None
+        return download_file(
+            self._session,
+            url,
+            path,
+            headers=headers,
+            checksum=checksum or checksum_from_metadata(metadata),
+        )
 
-        response = self._request("GET", url)
-        data = response.json()
-        if fmt == "json":
-            return data
-        elif fmt == "object":
-            return dict_to_object(data, "BulkNews")
+    def iter_bulk_news(self, path, fmt="json"):
+        """Iterate over the articles of a downloaded bulk news file, one at a
+        time, decompressing it lazily so memory use doesn't depend on its size.
+
+         Args:
+             path (str): Path of the file, as returned by download_bulk_news()
+             fmt (str): 'json' (default) for dicts or 'object' for namedtuples
+        """
+        with open_decompressed(path) as stream:
+            for article in iter_json_values(stream):
+                if fmt == "object":
+                    article = dict_to_object(article, "NewsArticle")
+                yield article
 
     # Crypto
     # tiingo/crypto
@@ -431,6 +1224,15 @@ class TiingoClient(RestClient):
         exchanges=[],
         includeRawExchangeData=False,
         convertCurrency=None,
+    ):
+        url, params = self._prepare_crypto_top_of_book(
+            tickers, exchanges, includeRawExchangeData, convertCurrency
+        )
+        response = self._request("GET", url, params=params)
+        return self._decode_json(response)
+
+    def _prepare_crypto_top_of_book(
+        self, tickers, exchanges, includeRawExchangeData, convertCurrency
     ):
         url = "tiingo/crypto/top"
         params = {"tickers": ",".join(tickers)}
@@ -441,9 +1243,7 @@ class TiingoClient(RestClient):
             params["includeRawExchangeData"] = True
         if convertCurrency:
             params["convertCurrency"] = convertCurrency
-
-        response = self._request("GET", url, params=params)
-        return response.json()
+        return url, params
 
     def get_crypto_price_history(
         self,
@@ -456,6 +1256,32 @@ class TiingoClient(RestClient):
         includeRawExchangeData=False,
         resampleFreq=None,
         convertCurrency=None,
+    ):
+        url, params = self._prepare_crypto_price_history(
+            tickers,
+            baseCurrency,
+            startDate,
+            endDate,
+            exchanges,
+            consolidateBaseCurrency,
+            includeRawExchangeData,
+            resampleFreq,
+            convertCurrency,
+        )
+        response = self._request("GET", url, params=params)
+        return self._decode_json(response)
+
+    def _prepare_crypto_price_history(
+        self,
+        tickers,
+        baseCurrency,
+        startDate,
+        endDate,
+        exchanges,
+        consolidateBaseCurrency,
+        includeRawExchangeData,
+        resampleFreq,
+        convertCurrency,
     ):
         url = "tiingo/crypto/prices"
         params = {"tickers": ",".join(tickers)}
@@ -474,23 +1300,21 @@ class TiingoClient(RestClient):
             params["resampleFreq"] = resampleFreq
         if convertCurrency:
             params["convertCurrency"] = convertCurrency
+        return url, params
 
+    def get_crypto_metadata(self, tickers=[], fmt="json"):
+        url, params = self._prepare_crypto_metadata(tickers, fmt)
         response = self._request("GET", url, params=params)
-        return response.json()
+        return self._format_response(response, fmt)
 
-    def get_crypto_metadata(self, tickers=[], fmt="json"):
+    def _prepare_crypto_metadata(self, tickers, fmt):
         url = "tiingo/crypto"
 
         params = {
             "tickers": ",".join(tickers),
             "format": fmt,
         }
-
-        response = self._request("GET", url, params=params)
-        if fmt == "csv":
-            return response.content.decode("utf-8")
-        else:
-            return response.json()
+        return url, params
 
     # FUNDAMENTAL DEFINITIONS
     # tiingo/fundamentals/definitions
@@ -502,13 +1326,14 @@ class TiingoClient(RestClient):
             tickers [string] : optional, either list or string
             fmt (string): 'csv' or 'json'
         """
+        url, params = self._prepare_fundamentals_definitions(tickers, fmt)
+        response = self._request("GET", url, params=params)
+        return self._format_response(response, fmt)
+
+    def _prepare_fundamentals_definitions(self, tickers, fmt):
         url = "tiingo/fundamentals/definitions"
         params = {"tickers": tickers, "format": fmt}
-        response = self._request("GET", url, params=params)
-        if fmt == "json":
-            return response.json()
-        elif fmt == "csv":
-            return response.content.decode("utf-8")
+        return url, params
 
     # FUNDAMENTAL DAILY
     # tiingo/fundamentals/<ticker>/daily
@@ -523,13 +1348,14 @@ class TiingoClient(RestClient):
             startDate, endDate [date]: Boundaries of search window
             fmt (string): 'csv' or 'json'
         """
+        url, params = self._prepare_fundamentals_daily(ticker, fmt, startDate, endDate)
+        response = self._request("GET", url, params=params)
+        return self._format_response(response, fmt)
+
+    def _prepare_fundamentals_daily(self, ticker, fmt, startDate, endDate):
         url = "tiingo/fundamentals/{}/daily".format(ticker)
         params = {"startDate": startDate, "endDate": endDate, "format": fmt}
-        response = self._request("GET", url, params=params)
-        if fmt == "json":
-            return response.json()
-        elif fmt == "csv":
-            return response.content.decode("utf-8")
+        return url, params
 
     # FUNDAMENTAL STATEMENTS
     # tiingo/fundamentals/<ticker>/statements
@@ -549,6 +1375,15 @@ class TiingoClient(RestClient):
                                    (True)
                 fmt (string): 'csv' or 'json'
         """
+        url, params = self._prepare_fundamentals_statements(
+            ticker, asReported, fmt, startDate, endDate
+        )
+        response = self._request("GET", url, params=params)
+        return self._format_response(response, fmt)
+
+    def _prepare_fundamentals_statements(
+        self, ticker, asReported, fmt, startDate, endDate
+    ):
         if asReported:
             asReported = "true"
         else:
@@ -561,8 +1396,4 @@ class TiingoClient(RestClient):
             "asReported": asReported,
             "format": fmt,
         }
-        response = self._request("GET", url, params=params)
-        if fmt == "json":
-            return response.json()
-        elif fmt == "csv":
-            return response.content.decode("utf-8")
+        return url, params
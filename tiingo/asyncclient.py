@@ -0,0 +1,429 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+from collections import deque
+
+import requests
+
+from tiingo.api import (
+    INSTALL_PANDAS_MESSAGE,
+    LISTING_FILE_URL,
+    MAX_NEWS_LIMIT,
+    TiingoClient,
+    pandas_is_installed,
+)
+from tiingo.exceptions import InstallAiohttpException, InstallPandasException
+from tiingo.restclient import build_response, check_response
+
+try:
+    import aiohttp
+    from yarl import URL
+
+    aiohttp_is_installed = True
+except ImportError:
+    aiohttp_is_installed = False
+
+
+class AsyncTiingoClient(object):
+    """asyncio client for the Tiingo REST API, mirroring TiingoClient.
+
+    Every endpoint method of TiingoClient is available as a coroutine. URLs and
+    query parameters are built by the same TiingoClient helpers, and all calls
+    share one pooled aiohttp session. At most config['max_concurrency']
+    requests (default 10) are in flight at once, so many calls can be fanned
+    out safely with asyncio.gather:
+
+        async with AsyncTiingoClient() as client:
+            prices = await asyncio.gather(
+                *(client.get_ticker_price(ticker) for ticker in tickers)
+            )
+
+    The client must be used from a single event loop. Call close() (or use it
+    as an async context manager) to release the session.
+    """
+
+    def __init__(self, config={}):
+        if not aiohttp_is_installed:
+            raise InstallAiohttpException(
+                "aiohttp is not installed, but AsyncTiingoClient requires it. "
+                "Install tiingo with async dependencies: 'pip install tiingo[async]'"
+            )
+
+        self._client = TiingoClient(config)
+        self._base_url = self._client._base_url
+        self._headers = self._client._headers
+        self._max_concurrency = self._client._config.get("max_concurrency", 10)
+        self._session = None
+        self._semaphore = None
+
+    def __repr__(self):
+        return '<AsyncTiingoClient(url="{}")>'.format(self._base_url)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        self._client.close()
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self._max_concurrency)
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+        return self._session
+
+    async def _fetch(self, method, url, headers=None):
+        """Download url and return it as a requests.Response"""
+        session = self._get_session()
+        async with self._semaphore:
+            async with session.request(
+                method, URL(url, encoded=True), headers=headers
+            ) as resp:
+                content = await resp.read()
+                return build_response(
+                    resp.status, content, resp.headers, url, resp.reason
+                )
+
+    async def _request(self, method, url, params=None):
+        """Make HTTP request and return response object
+
+        Args:
+            method (str): GET, POST, PUT, DELETE
+            url (str): path appended to the base_url to create request
+            params (dict): query parameters, encoded exactly like requests does
+        """
+        full_url = (
+            requests.Request(method, "{}/{}".format(self._base_url, url), params=params)
+            .prepare()
+            .url
+        )
+        cache_key = self._client._cache_key(method, full_url, {})
+        if cache_key is not None:
+            resp = self._client._cached_response(cache_key)
+            if resp is not None:
+                return resp
+
+        attempt = 0
+        while True:
+            if self._client._rate_limiter is not None:
+                await self._client._rate_limiter.acquire_async()
+            try:
+                resp = await self._fetch(method, full_url, headers=self._headers)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                delay = self._client._retry_delay(method, attempt, error=e)
+                if delay is None:
+                    raise
+            else:
+                delay = self._client._retry_delay(method, attempt, response=resp)
+                if delay is None:
+                    break
+            await asyncio.sleep(delay)
+            attempt += 1
+        check_response(resp)
+        if cache_key is not None:
+            self._client._store_response(cache_key, url, params, resp)
+        return resp
+
+    # TICKER PRICE ENDPOINTS
+    async def list_tickers(self, assetTypes=[]):
+        listing = await self.get_ticker_listing()
+        return self._client._filter_listing(listing, assetTypes)
+
+    async def get_ticker_listing(self):
+        cache = self._client._listing_cache
+        if not cache.is_fresh():
+            response = await self._fetch(
+                "GET", LISTING_FILE_URL, headers=cache.request_headers()
+            )
+            cache.update(response)
+        return cache.get_listing()
+
+    async def list_stock_tickers(self):
+        return await self.list_tickers(["Stock"])
+
+    async def list_etf_tickers(self):
+        return await self.list_tickers(["ETF"])
+
+    async def list_fund_tickers(self):
+        return await self.list_tickers(["Mutual Fund"])
+
+    async def get_ticker_metadata(self, ticker, fmt="json"):
+        url, params = self._client._prepare_ticker_metadata(ticker)
+        response = await self._request("GET", url, params=params)
+        return self._client._format_response(response, fmt, "Ticker")
+
+    async def get_tickers_metadata(self, tickers, fmt="json", fields=None):
+        """See TiingoClient.get_tickers_metadata. Tickers are requested
+        concurrently, bounded by config['max_concurrency'].
+        """
+        client = self._client
+        listing = None
+        if client._listing_answers(fields):
+            listing = await self.get_ticker_listing()
+        metadata, missing = client._known_metadata(tickers, fields, listing)
+
+        async def request_metadata(ticker):
+            url, params = client._prepare_ticker_metadata(ticker)
+            try:
+                response = await self._request("GET", url, params=params)
+            except Exception as e:
+                return ticker, None, e
+            return (
+                ticker,
+                client._store_metadata(ticker, client._decode_json(response)),
+                None,
+            )
+
+        errors = {}
+        for ticker, ticker_metadata, error in await asyncio.gather(
+            *(request_metadata(ticker) for ticker in missing)
+        ):
+            if error is not None:
+                errors[ticker] = error
+            else:
+                metadata[ticker] = ticker_metadata
+        return client._format_tickers_metadata(tickers, metadata, errors, fields, fmt)
+
+    async def get_ticker_price(
+        self,
+        ticker,
+        startDate=None,
+        endDate=None,
+        columns=None,
+        fmt="json",
+        frequency="daily",
+    ):
+        """See TiingoClient.get_ticker_price. The date windows of long
+        intraday ranges are requested concurrently."""
+        client = self._client
+        windows = client._date_windows(startDate, endDate, frequency)
+        if len(windows) > 1:
+
+            async def request_window(window):
+                url, params = client._prepare_ticker_price(
+                    ticker, window[0], window[1], columns, fmt, frequency
+                )
+                response = await self._request("GET", url, params=params)
+                return client._format_price_window(response, fmt)
+
+            parts = await asyncio.gather(*(request_window(w) for w in windows))
+            return client._stitch_price_windows(parts, fmt)
+
+        url, params = client._prepare_ticker_price(
+            ticker, startDate, endDate, columns, fmt, frequency
+        )
+        response = await self._request("GET", url, params=params)
+        return client._format_response(response, fmt, "TickerPrice")
+
+    async def _request_pandas(self, ticker, metric_name, params):
+        client = self._client
+        url = client._get_url(ticker, params["resampleFreq"])
+        windows = client._window_params(params)
+        if len(windows) > 1:
+
+            async def request_window(window_params):
+                response = await self._request("GET", url, params=window_params)
+                return client._frame_from_window(response, metric_name, window_params)
+
+            frames = await asyncio.gather(*(request_window(w) for w in windows))
+            return client._stitch_frames(frames, metric_name)
+
+        response = await self._request("GET", url, params=params)
+        return client._frame_from_response(response, metric_name, params)
+
+    async def get_dataframe(
+        self,
+        tickers,
+        startDate=None,
+        endDate=None,
+        metric_name=None,
+        columns=None,
+        frequency="daily",
+        fmt="json",
+        index=None,
+    ):
+        """See TiingoClient.get_dataframe. Multiple tickers are requested
+        concurrently, bounded by config['max_concurrency'].
+        """
+        params = self._client._prepare_dataframe(
+            tickers, startDate, endDate, metric_name, columns, frequency, fmt
+        )
+        if not pandas_is_installed:
+            raise InstallPandasException(INSTALL_PANDAS_MESSAGE)
+
+        if type(tickers) is str:
+            return await self._request_pandas(tickers, metric_name, params)
+
+        async def request_ticker(stock):
+            try:
+                return (
+                    stock,
+                    await self._request_pandas(stock, metric_name, params),
+                    None,
+                )
+            except Exception as e:
+                return stock, None, e
+
+        results = await asyncio.gather(*(request_ticker(stock) for stock in tickers))
+        return self._client._combine_ticker_results(results, index)
+
+    # NEWS FEEDS
+    async def get_news(
+        self,
+        tickers=[],
+        tags=[],
+        sources=[],
+        startDate=None,
+        endDate=None,
+        limit=100,
+        offset=0,
+        sortBy="publishedDate",
+        onlyWithTickers=False,
+        fmt="json",
+    ):
+        url, params = self._client._prepare_news(
+            tickers,
+            tags,
+            sources,
+            startDate,
+            endDate,
+            limit,
+            offset,
+            sortBy,
+            onlyWithTickers,
+        )
+        response = await self._request("GET", url, params=params)
+        return self._client._format_response(response, fmt, "NewsArticle")
+
+    async def iter_news(
+        self,
+        tickers=[],
+        tags=[],
+        sources=[],
+        startDate=None,
+        endDate=None,
+        limit=100,
+        offset=0,
+        sortBy="publishedDate",
+        onlyWithTickers=False,
+        fmt="json",
+        prefetch=2,
+        max_articles=None,
+    ):
+        """See TiingoClient.iter_news. Use with async for."""
+        limit = min(limit, MAX_NEWS_LIMIT)
+
+        async def fetch_page(page_offset):
+            url, params = self._client._prepare_news(
+                tickers,
+                tags,
+                sources,
+                startDate,
+                endDate,
+                limit,
+                page_offset,
+                sortBy,
+                onlyWithTickers,
+            )
+            response = await self._request("GET", url, params=params)
+            return self._client._decode_json(response)
+
+        seen = set()
+        count = 0
+        pending = deque()
+        try:
+            while True:
+                while len(pending) <= prefetch:
+                    pending.append(asyncio.ensure_future(fetch_page(offset)))
+                    offset += limit
+                page = await pending.popleft()
+                for article in self._client._new_articles(page, seen, fmt):
+                    yield article
+                    count += 1
+                    if max_articles is not None and count >= max_articles:
+                        return
+                if len(page) < limit:
+                    return
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def get_bulk_news(self, file_id=None, fmt="json"):
+        url, params = self._client._prepare_bulk_news(file_id)
+        response = await self._request("GET", url, params=params)
+        return self._client._format_response(response, fmt, "BulkNews")
+
+    # Crypto
+    async def get_crypto_top_of_book(
+        self,
+        tickers=[],
+        exchanges=[],
+        includeRawExchangeData=False,
+        convertCurrency=None,
+    ):
+        url, params = self._client._prepare_crypto_top_of_book(
+            tickers, exchanges, includeRawExchangeData, convertCurrency
+        )
+        response = await self._request("GET", url, params=params)
+        return self._client._decode_json(response)
+
+    async def get_crypto_price_history(
+        self,
+        tickers=[],
+        baseCurrency=None,
+        startDate=None,
+        endDate=None,
+        exchanges=[],
+        consolidateBaseCurrency=False,
+        includeRawExchangeData=False,
+        resampleFreq=None,
+        convertCurrency=None,
+    ):
+        url, params = self._client._prepare_crypto_price_history(
+            tickers,
+            baseCurrency,
+            startDate,
+            endDate,
+            exchanges,
+            consolidateBaseCurrency,
+            includeRawExchangeData,
+            resampleFreq,
+            convertCurrency,
+        )
+        response = await self._request("GET", url, params=params)
+        return self._client._decode_json(response)
+
+    async def get_crypto_metadata(self, tickers=[], fmt="json"):
+        url, params = self._client._prepare_crypto_metadata(tickers, fmt)
+        response = await self._request("GET", url, params=params)
+        return self._client._format_response(response, fmt)
+
+    # FUNDAMENTALS
+    async def get_fundamentals_definitions(self, tickers=[], fmt="json"):
+        url, params = self._client._prepare_fundamentals_definitions(tickers, fmt)
+        response = await self._request("GET", url, params=params)
+        return self._client._format_response(response, fmt)
+
+    async def get_fundamentals_daily(
+        self, ticker, fmt="json", startDate=None, endDate=None
+    ):
+        url, params = self._client._prepare_fundamentals_daily(
+            ticker, fmt, startDate, endDate
+        )
+        response = await self._request("GET", url, params=params)
+        return self._client._format_response(response, fmt)
+
+    async def get_fundamentals_statements(
+        self, ticker, asReported=False, fmt="json", startDate=None, endDate=None
+    ):
+        url, params = self._client._prepare_fundamentals_statements(
+            ticker, asReported, fmt, startDate, endDate
+        )
+        response = await self._request("GET", url, params=params)
+        return self._client._format_response(response, fmt)
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+"""Resumable downloads and lazy parsing of bulk news files."""
+
+from contextlib import contextmanager
+import gzip
+import hashlib
+import io
+import json
+import os
+from zipfile import ZipFile
+
+from requests.exceptions import ChunkedEncodingError
+
+from tiingo.exceptions import ChecksumMismatchError
+from tiingo.restclient import check_response
+from tiingo.retry import RETRYABLE_ERRORS
+
+# Failures after which a download is resumed: network errors, and a
+# connection dropped while the body is streamed, which requests raises as
+# ChunkedEncodingError.
+RESUMABLE_ERRORS = RETRYABLE_ERRORS + (ChunkedEncodingError,)
+
+# Metadata keys that may hold the checksum of a bulk file, with their algorithm.
+CHECKSUM_KEYS = (("sha256", "sha256"), ("md5", "md5"), ("checksum", "md5"))
+
+
+def download_file(
+    session,
+    url,
+    path,
+    headers=None,
+    checksum=None,
+    chunk_size=1024 * 1024,
+    max_resumes=3,
+):
+    """Download url to path without holding it in memory, resuming a partial
+    download left by an earlier attempt.
+
+    The body is written to path + ".part" and only renamed to path once its
+    size and checksum have been verified. Connections dropped mid-download are
+    resumed with a Range request up to max_resumes times.
+
+    Args:
+        session: requests.Session (or the requests module) to download with
+        url (str): URL of the file
+        path (str): Where to save the file
+        headers (dict): Extra request headers
+        checksum (str): Expected checksum as "algorithm:hexdigest", e.g.
+            "md5:9e107d9d372bb6826bd81d3542a419d6"
+        chunk_size (int): Bytes read from the network at a time
+        max_resumes (int): Times a dropped download is resumed before giving up
+    """
+    partial = path + ".part"
+    algorithm, expected = _parse_checksum(checksum)
+    resumes = 0
+    while True:
+        try:
+            total = _download_part(session, url, partial, headers, chunk_size)
+            break
+        except RESUMABLE_ERRORS:
+            resumes += 1
+            if resumes > max_resumes:
+                raise
+
+    size = os.path.getsize(partial)
+    if total is not None and size != total:
+        raise ChecksumMismatchError(
+            "Downloaded {} bytes of {}, expected {}".format(size, url, total)
+        )
+    if expected is not None:
+        digest = file_digest(partial, algorithm)
+        if digest != expected:
+            os.remove(partial)
+            raise ChecksumMismatchError(
+                "{} checksum of {} is {}, expected {}".format(
+                    algorithm, url, digest, expected
+                )
+            )
+    os.replace(partial, path)
+    return path
+
+
+def _download_part(session, url, partial, headers, chunk_size):
+    """Download the rest of url into partial and return the full file size,
+    if the server sent it"""
+    headers = dict(headers or {})
+    offset = os.path.getsize(partial) if os.path.exists(partial) else 0
+    if offset:
+        headers["Range"] = "bytes={}-".format(offset)
+
+    response = session.get(url, headers=headers, stream=True)
+    try:
+        if response.status_code == 416:  # Nothing left to download
+            return None
+        check_response(response)
+
+        if response.status_code == 206:
+            content_range = response.headers.get("Content-Range", "")
+            total = content_range.rpartition("/")[2]
+            mode = "ab"
+        else:  # The server sent the whole file
+            total = response.headers.get("Content-Length")
+            mode = "wb"
+        if response.headers.get("Content-Encoding"):
+            total = None  # Content-Length counts the encoded bytes
+
+        with open(partial, mode) as f:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                f.write(chunk)
+    finally:
+        response.close()
+    return int(total) if total and total.isdigit() else None
+
+
+def file_digest(path, algorithm="md5", chunk_size=1024 * 1024):
+    """Return the hex digest of a file, reading it in chunks"""
+    digest = hashlib.new(algorithm)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def checksum_from_metadata(metadata):
+    """Return the "algorithm:hexdigest" checksum listed in bulk file metadata,
+    or None"""
+    for key, algorithm in CHECKSUM_KEYS:
+        if metadata.get(key):
+            return "{}:{}".format(algorithm, metadata[key])
+    return None
+
+
+def _parse_checksum(checksum):
+    if not checksum:
+        return None, None
+    algorithm, _, expected = checksum.rpartition(":")
+    return (algorithm or "md5").lower(), expected.lower()
+
+
+@contextmanager
+def open_decompressed(path):
+    """Open a plain, gzip or zip (first member) file as a binary stream,
+    decompressing it lazily"""
+    with open(path, "rb") as f:
+        magic = f.read(4)
+    if magic[:2] == b"\x1f\x8b":
+        with gzip.open(path, "rb") as stream:
+            yield stream
+    elif magic == b"PK\x03\x04":
+        with ZipFile(path) as archive:
+            with archive.open(archive.namelist()[0]) as stream:
+                yield stream
+    else:
+        with open(path, "rb") as stream:
+            yield stream
+
+
+def iter_json_values(stream, chunk_size=1024 * 1024):
+    """Yield the values of a JSON array, or of JSON lines, one at a time.
+
+    Only the value being decoded and one chunk of input are held in memory.
+
+    Args:
+        stream: binary file-like object
+        chunk_size (int): Bytes read at a time
+    """
+    decoder = json.JSONDecoder()
+    text = io.TextIOWrapper(stream, encoding="utf-8")
+    buffer = ""
+    position = 0
+    read_size = chunk_size
+    eof = False
+    started = False
+    while True:
+        # Skip whitespace and the separators between values
+        while position < len(buffer) and buffer[position] in " \t\r\n,":
+            position += 1
+        if position == len(buffer):
+            if eof:
+                return
+            buffer = text.read(read_size)
+            position = 0
+            eof = not buffer
+            continue
+
+        if not started:
+            started = True
+            if buffer[position] == "[":  # A JSON array rather than JSON lines
+                position += 1
+                continue
+        if buffer[position] == "]":
+            return
+
+        try:
+            value, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            end = None
+            if eof:
+                raise
+        if end is None or (end == len(buffer) and not eof):
+            # The value may continue past the end of the buffer
+            more = text.read(read_size)
+            eof = not more
+            buffer = buffer[position:] + more
+            position = 0
+            read_size *= 2
+            continue
+        yield value
+        position = end
+        read_size = chunk_size
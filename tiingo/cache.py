@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+
+# Endpoints whose responses never change once their date range has closed.
+HISTORICAL_URL_PATTERN = re.compile(
+    r"(tiingo/daily/[^/]+/prices|iex/[^/]+/prices|tiingo/crypto/prices"
+    r"|tiingo/fundamentals/[^/]+/(daily|statements))$"
+)
+
+# Headers describing the transfer rather than the (already decoded) body.
+TRANSFER_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+
+class ResponseCache(object):
+    """Persistent, size-bounded cache of successful GET responses.
+
+    Responses are stored in a SQLite database inside directory and evicted in
+    least-recently-used order once their total size exceeds max_size bytes.
+
+    How long a response stays fresh depends on the endpoint:
+
+    - Historical endpoints (prices, crypto prices, fundamentals) queried with
+      an endDate before today are kept forever, since that data is final.
+    - Otherwise the first pattern in ttls that matches the request path
+      decides, e.g. {r"tiingo/daily/[^/]+$": 86400} for ticker metadata.
+    - Anything else is kept for ttl seconds.
+
+    A ttl of None means forever and 0 disables caching for that endpoint.
+    The hits, misses and evictions counters are available through stats().
+
+    Args:
+        directory (str): Directory for the cache database, created if missing
+        max_size (int): Maximum total size of cached bodies in bytes
+        ttl (int): Default time to live in seconds
+        ttls (dict): Regex pattern of request path to time to live in seconds
+    """
+
+    def __init__(self, directory, max_size=256 * 1024 * 1024, ttl=300, ttls=None):
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        self.directory = directory
+        self.max_size = max_size
+        self.ttl = ttl
+        self._ttls = [
+            (re.compile(pattern), seconds) for pattern, seconds in (ttls or {}).items()
+        ]
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            os.path.join(directory, "responses.sqlite"), check_same_thread=False
+        )
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, status INTEGER, headers TEXT,"
+                " content BLOB, size INTEGER, expires REAL, accessed REAL)"
+            )
+
+    def __repr__(self):
+        return '<ResponseCache(directory="{}")>'.format(self.directory)
+
+    @staticmethod
+    def key(method, url, params=None):
+        """Return the cache key of a request, independent of param order"""
+        prepared = requests.Request(method, url, params=params).prepare().url
+        parts = urlsplit(prepared)
+        query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+        return "{} {}".format(
+            method.upper(), urlunsplit(parts._replace(query=query, fragment=""))
+        )
+
+    def ttl_for(self, path, params=None):
+        """Return how long the response to a request stays fresh, in seconds"""
+        end_date = (params or {}).get("endDate")
+        if end_date and HISTORICAL_URL_PATTERN.search(path):
+            today = datetime.datetime.now(datetime.timezone.utc).date().isoformat()
+            if str(end_date)[:10] < today:
+                return None
+
+        for pattern, seconds in self._ttls:
+            if pattern.search(path):
+                return seconds
+        return self.ttl
+
+    def get(self, key):
+        """Return the cached (status_code, headers, content) for key, or None"""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT status, headers, content, expires FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is not None and row[3] is not None and row[3] <= now:
+                with self._db:
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                row = None
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            with self._db:
+                self._db.execute(
+                    "UPDATE responses SET accessed = ? WHERE key = ?", (now, key)
+                )
+            self.hits += 1
+
+        status_code, headers, content, _ = row
+        return status_code, json.loads(headers), bytes(content)
+
+    def set(self, key, status_code, headers, content, ttl=None):
+        """Store a response under key for ttl seconds (None for forever)"""
+        if ttl == 0:
+            return
+
+        now = time.time()
+        expires = None if ttl is None else now + ttl
+        headers = {
+            name: value
+            for name, value in headers.items()
+            if name.lower() not in TRANSFER_HEADERS
+        }
+        with self._lock:
+            with self._db:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        key,
+                        status_code,
+                        json.dumps(headers),
+                        sqlite3.Binary(content),
+                        len(content),
+                        expires,
+                        now,
+                    ),
+                )
+                self._evict()
+
+    def _evict(self):
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses")
+        total = total.fetchone()[0]
+        if total <= self.max_size:
+            return
+
+        rows = self._db.execute(
+            "SELECT key, size FROM responses ORDER BY accessed"
+        ).fetchall()
+        for key, size in rows:
+            if total <= self.max_size:
+                break
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            self.evictions += 1
+
+    def clear(self):
+        """Remove every cached response"""
+        with self._lock:
+            with self._db:
+                self._db.execute("DELETE FROM responses")
+
+    def stats(self):
+        """Return the hit, miss and eviction counters and the cache size"""
+        with self._lock:
+            entries, size = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": entries,
+            "size": size,
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
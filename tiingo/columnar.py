@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""Parse price responses straight into column arrays.
+
+Used by TiingoClient.get_ticker_price for fmt="numpy" and fmt="arrow", and by
+get_dataframe for json responses, so that no intermediate list of dicts or
+object-dtype DataFrame is built.
+"""
+
+import csv
+import datetime
+import io
+
+from tiingo.exceptions import InstallNumpyException, InstallPyarrowException
+
+try:
+    import numpy as np
+
+    numpy_is_installed = True
+except ImportError:
+    numpy_is_installed = False
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    pyarrow_is_installed = True
+except ImportError:
+    pyarrow_is_installed = False
+
+# Columns holding share counts, parsed as int64 when every value is integral.
+INTEGER_COLUMNS = {"volume", "adjVolume"}
+
+# Columns holding prices, always parsed as float64.
+PRICE_COLUMNS = {
+    "open",
+    "high",
+    "low",
+    "close",
+    "adjOpen",
+    "adjHigh",
+    "adjLow",
+    "adjClose",
+    "divCash",
+    "splitFactor",
+}
+
+
+def numpy_columns_from_csv(stream):
+    """Return a dict of column name to numpy array for a csv price response.
+
+    Dates become datetime64[ns] in UTC, volumes int64 and prices float64.
+
+    Args:
+        stream: binary file-like object with the csv body
+    """
+    if not numpy_is_installed:
+        raise InstallNumpyException(
+            "numpy is not installed, but fmt='numpy' was requested. "
+            "Install it with: pip install numpy"
+        )
+
+    reader = csv.reader(io.TextIOWrapper(stream, encoding="utf-8", newline=""))
+    header = next(reader, [])
+    values = [[] for _ in header]
+    appends = [column.append for column in values]
+    for row in reader:
+        for append, value in zip(appends, row):
+            append(value)
+
+    return {
+        name: _to_array(name, column_values)
+        for name, column_values in zip(header, values)
+    }
+
+
+def numpy_columns_from_records(records, columns=None):
+    """Return a dict of column name to numpy array for decoded JSON records.
+
+    Each column is converted in a single pass over the records: dates to
+    datetime64[ns] in UTC, integral columns to int64, other numbers to float64
+    (with None as NaN) and anything else to object arrays.
+
+    Args:
+        records (list): dicts sharing the same keys, as decoded from the API
+        columns (list): Optional subset of the columns to convert
+    """
+    if not numpy_is_installed:
+        raise InstallNumpyException(
+            "numpy is not installed. Install it with: pip install numpy"
+        )
+    if columns is None:
+        columns = list(records[0]) if records else []
+    return {
+        name: records_to_array(name, [record.get(name) for record in records])
+        for name in columns
+    }
+
+
+def records_to_array(name, values):
+    """Convert the decoded JSON values of one column to a typed numpy array"""
+    if name == "date":
+        return parse_iso_dates(values)
+
+    types = set(map(type, values))
+    if types == {int}:
+        try:
+            return np.array(values, dtype=np.int64)
+        except OverflowError:
+            pass
+    if types <= {int, float, type(None)}:
+        return np.array(values, dtype=np.float64)
+    if types == {bool}:
+        return np.array(values, dtype=bool)
+    return np.array(values, dtype=object)
+
+
+def arrow_table_from_csv(stream):
+    """Return a pyarrow.Table for a csv price response.
+
+    The date column is a timestamp[ns, tz=UTC], volumes int64 and prices float64.
+
+    Args:
+        stream: binary file-like object with the csv body
+    """
+    if not pyarrow_is_installed:
+        raise InstallPyarrowException(
+            "pyarrow is not installed, but fmt='arrow' was requested. "
+            "Install it with: pip install pyarrow"
+        )
+
+    # Prices are typed explicitly, as pyarrow infers int64 for whole prices
+    # and null for the columns of a response without rows.
+    table = pa_csv.read_csv(
+        stream,
+        convert_options=pa_csv.ConvertOptions(
+            column_types=dict.fromkeys(PRICE_COLUMNS, pa.float64())
+        ),
+    )
+    for index, field in enumerate(table.schema):
+        if field.name in INTEGER_COLUMNS and pa.types.is_null(field.type):
+            table = table.set_column(
+                index, field.name, table.column(index).cast(pa.int64())
+            )
+    if "date" not in table.column_names:
+        return table
+
+    index = table.column_names.index("date")
+    dates = table.column(index)
+    if pa.types.is_date(dates.type):
+        dates = dates.cast(pa.timestamp("s"))
+    if pa.types.is_timestamp(dates.type):
+        dates = dates.cast(pa.timestamp("ns", tz="UTC"))
+    else:
+        dates = pa.array(
+            _to_array("date", dates.to_pylist()), type=pa.timestamp("ns")
+        ).cast(pa.timestamp("ns", tz="UTC"))
+    return table.set_column(index, "date", dates)
+
+
+def concat_numpy_columns(parts):
+    """Concatenate numpy column dicts, keeping the first row of every date"""
+    parts = [part for part in parts if part]
+    if not parts:
+        return {}
+    columns = {
+        name: np.concatenate([part[name] for part in parts]) for name in parts[0]
+    }
+    if "date" in columns:
+        first = _first_occurrences(columns["date"])
+        if first is not None:
+            columns = {name: values[first] for name, values in columns.items()}
+    return columns
+
+
+def concat_arrow_tables(parts):
+    """Concatenate pyarrow Tables, keeping the first row of every date"""
+    table = pa.concat_tables(parts)
+    if "date" in table.column_names:
+        first = _first_occurrences(table.column("date").to_numpy())
+        if first is not None:
+            table = table.take(first)
+    return table
+
+
+def _first_occurrences(dates):
+    """Return the sorted indexes of the first row of each date, or None if
+    there are no duplicates."""
+    _, first = np.unique(dates, return_index=True)
+    if len(first) == len(dates):
+        return None
+    first.sort()
+    return first
+
+
+def _to_array(name, values):
+    if name == "date":
+        return parse_iso_dates(values)
+
+    strings = np.array(values)
+    if name in INTEGER_COLUMNS:
+        try:
+            return strings.astype(np.int64)
+        except ValueError:
+            pass
+    try:
+        return np.where(strings == "", "nan", strings).astype(np.float64)
+    except ValueError:
+        return strings
+
+
+def parse_iso_dates(values):
+    """Parse ISO-8601 strings to UTC datetime64[ns] without per-value tz handling
+    when the API uses a single, UTC, representation.
+
+    Raises ValueError for values that are not ISO-8601 dates.
+    """
+    if not values:
+        return np.array([], dtype="datetime64[ns]")
+
+    sample = values[0]
+    if sample.endswith("Z"):
+        values = [value[:-1] for value in values]
+    elif sample.endswith("+00:00"):
+        values = [value[:-6] for value in values]
+    elif len(sample) > 10 and sample[-6] in "+-" and sample[-3] == ":":
+        values = [
+            datetime.datetime.fromisoformat(value)
+            .astimezone(datetime.timezone.utc)
+            .replace(tzinfo=None)
+            .isoformat()
+            for value in values
+        ]
+    return np.array(values, dtype="datetime64[ns]")
@@ -3,6 +3,22 @@ class InstallPandasException(Exception):
     pass
 
 
+class InstallAiohttpException(Exception):
+    pass
+
+
+class InstallNumpyException(Exception):
+    pass
+
+
+class InstallPyarrowException(Exception):
+    pass
+
+
+class InstallOrjsonException(Exception):
+    pass
+
+
 class APIColumnNameError(Exception):
     pass
 
@@ -13,3 +29,20 @@ class InvalidFrequencyError(Exception):
 
 class MissingRequiredArgumentError(Exception):
     pass
+
+
+class ChecksumMismatchError(Exception):
+    pass
+
+
+class TickerFetchError(Exception):
+    """Raised when some tickers of a multi-ticker request could not be fetched.
+
+    The data for the tickers that succeeded is kept on ``results``, and
+    ``errors`` maps each failed ticker to the exception it raised.
+    """
+
+    def __init__(self, message, results=None, errors=None):
+        super(TickerFetchError, self).__init__(message)
+        self.results = results
+        self.errors = errors if errors is not None else {}
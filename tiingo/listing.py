@@ -0,0 +1,396 @@
+# -*- coding: utf-8 -*-
+"""Local copy and in-memory index of the supported_tickers listing."""
+
+from array import array
+from collections.abc import Mapping
+import bisect
+import csv
+import datetime
+import heapq
+import io
+import itertools
+import json
+import os
+import time
+from zipfile import ZipFile
+
+from tiingo.exceptions import InstallPandasException
+from tiingo.restclient import check_response
+
+LISTING_FILENAME = "supported_tickers.csv"
+
+# Columns with few distinct values, stored as integer codes into a list of
+# their distinct values.
+CATEGORY_COLUMNS = ("exchange", "assetType", "priceCurrency")
+DATE_COLUMNS = ("startDate", "endDate")
+CODED_COLUMNS = CATEGORY_COLUMNS + DATE_COLUMNS
+
+try:
+    import numpy as np
+    import pandas as pd
+
+    pandas_is_installed = True
+except ImportError:
+    pandas_is_installed = False
+
+
+class ListingRow(Mapping):
+    """Read-only, dict-like view of one row of a TickerListing"""
+
+    __slots__ = ("_listing", "_position")
+
+    def __init__(self, listing, position):
+        self._listing = listing
+        self._position = position
+
+    def __getitem__(self, column):
+        return self._listing._value(column, self._position)
+
+    def __iter__(self):
+        return iter(self._listing.columns)
+
+    def __len__(self):
+        return len(self._listing.columns)
+
+    def __repr__(self):
+        return "ListingRow({!r})".format(dict(self))
+
+
+class TickerListing(object):
+    """The rows of supported_tickers.csv, indexed for constant-time lookups.
+
+    Rows are stored column by column rather than as one dict each. Exchange,
+    assetType, priceCurrency and the dates repeat a few thousand distinct
+    values at most, so those columns are stored as integer codes into a list
+    of their values, which takes a fraction of the memory of a list of dicts.
+    Iterating, indexing and lookups return ListingRow objects, which behave
+    like read-only dicts; to_dicts() and to_dataframe() convert the whole
+    listing.
+
+    A ticker can be listed more than once, e.g. on several exchanges, so
+    lookups by ticker return a list of rows.
+
+    Args:
+        rows (iterable): The listing rows, as dicts, or as sequences of values
+            when columns is given
+        columns (list): The column names of rows given as sequences
+    """
+
+    def __init__(self, rows, columns=None):
+        if columns is None:
+            rows = iter(rows)
+            first = next(rows, None)
+            columns = list(first) if first is not None else []
+            if first is not None:
+                rows = itertools.chain([first], rows)
+            rows = (tuple(row[column] for column in columns) for row in rows)
+
+        self.columns = list(columns)
+        self._values = {}
+        self._categories = {}
+        self._category_codes = {}
+        self._by_ticker = {}
+        self._by_category = {}
+        encoders = []
+        for column in self.columns:
+            if column in CODED_COLUMNS:
+                self._values[column] = array("I")
+                self._categories[column] = []
+                self._category_codes[column] = {}
+                if column in CATEGORY_COLUMNS:
+                    self._by_category[column] = {}
+                encoders.append(self._encoder(column))
+            else:
+                self._values[column] = []
+                encoders.append(None)
+
+        appends = [self._values[column].append for column in self.columns]
+        ticker_column = self.columns.index("ticker") if self.columns else None
+        position = -1
+        for position, values in enumerate(rows):
+            for value, append, encode in zip(values, appends, encoders):
+                append(value if encode is None else encode(value, position))
+            self._index_ticker(values[ticker_column], position)
+        self._length = position + 1
+
+        # ISO dates of every startDate and endDate category, for range queries
+        self._iso_dates = {
+            column: [_iso_date(value) for value in self._categories[column]]
+            for column in DATE_COLUMNS
+            if column in self._categories
+        }
+        starts = [
+            self._iso_date(position, "startDate") for position in range(len(self))
+        ]
+        dated = sorted(
+            (position for position, start in enumerate(starts) if start),
+            key=starts.__getitem__,
+        )
+        self._by_start = array("I", dated)
+        self._start_dates = [starts[position] for position in dated]
+
+    def _encoder(self, column):
+        """Return a function storing a value of column as its category code"""
+        codes = self._category_codes[column]
+        categories = self._categories[column]
+        index = self._by_category.get(column)
+
+        def encode(value, position):
+            code = codes.get(value)
+            if code is None:
+                code = codes[value] = len(categories)
+                categories.append(value)
+                if index is not None:
+                    index[code] = array("I")
+            if index is not None:
+                index[code].append(position)
+            return code
+
+        return encode
+
+    def _index_ticker(self, ticker, position):
+        key = ticker.upper()
+        if key == ticker:
+            key = ticker  # Share one string between the column and the index
+        existing = self._by_ticker.get(key)
+        if existing is None:
+            self._by_ticker[key] = position
+        elif isinstance(existing, list):
+            existing.append(position)
+        else:
+            self._by_ticker[key] = [existing, position]
+
+    def _value(self, column, position):
+        values = self._values[column]
+        if column in CODED_COLUMNS:
+            return self._categories[column][values[position]]
+        return values[position]
+
+    def _iso_date(self, position, column):
+        if column not in self._iso_dates:
+            return ""
+        return self._iso_dates[column][self._values[column][position]]
+
+    @classmethod
+    def from_zip(cls, content):
+        """Parse the body of supported_tickers.zip"""
+        with ZipFile(io.BytesIO(content)) as zipdata:
+            with zipdata.open(LISTING_FILENAME) as raw:
+                reader = csv.reader(io.TextIOWrapper(raw, encoding="utf-8"))
+                return cls(reader, columns=next(reader, []))
+
+    def __repr__(self):
+        return "<TickerListing({} rows)>".format(self._length)
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, position):
+        if position < 0:
+            position += self._length
+        if not 0 <= position < self._length:
+            raise IndexError("TickerListing index out of range")
+        return ListingRow(self, position)
+
+    def __iter__(self):
+        return (ListingRow(self, position) for position in range(self._length))
+
+    def __contains__(self, ticker):
+        return ticker.upper() in self._by_ticker
+
+    def get(self, ticker, default=None):
+        """Return the first row listing ticker, or default"""
+        position = self._by_ticker.get(ticker.upper())
+        if position is None:
+            return default
+        if isinstance(position, list):
+            position = position[0]
+        return ListingRow(self, position)
+
+    def lookup(self, ticker):
+        """Return every row listing ticker"""
+        positions = self._by_ticker.get(ticker.upper(), [])
+        if not isinstance(positions, list):
+            positions = [positions]
+        return [ListingRow(self, position) for position in positions]
+
+    def by_exchange(self, *exchanges):
+        """Return the rows of tickers traded on any of exchanges"""
+        return self._select("exchange", exchanges)
+
+    def by_asset_type(self, *assetTypes):
+        """Return the rows of any of assetTypes, e.g. "Stock" or "ETF" """
+        return self._select("assetType", assetTypes)
+
+    def covering(self, startDate, endDate=None):
+        """Return the rows whose price history spans startDate to endDate
+        (ISO dates, endDate defaults to startDate)"""
+        end = _iso_date(endDate or startDate)
+        stop = bisect.bisect_right(self._start_dates, _iso_date(startDate))
+        return [
+            ListingRow(self, position)
+            for position in self._by_start[:stop]
+            if self._iso_date(position, "endDate") >= end
+        ]
+
+    def _select(self, column, keys):
+        """Return the rows with any of keys in column, in listing order"""
+        codes = self._category_codes.get(column, {})
+        index = self._by_category.get(column, {})
+        positions = heapq.merge(
+            *(index[codes[key]] for key in set(keys) if key in codes)
+        )
+        return [ListingRow(self, position) for position in positions]
+
+    def to_dicts(self):
+        """Return the rows as a list of new dicts"""
+        columns = [
+            (
+                [self._categories[column][code] for code in self._values[column]]
+                if column in CODED_COLUMNS
+                else self._values[column]
+            )
+            for column in self.columns
+        ]
+        return [dict(zip(self.columns, values)) for values in zip(*columns)]
+
+    def to_dataframe(self):
+        """Return the listing as a pandas.DataFrame, with categorical exchange,
+        assetType and priceCurrency columns and datetime64 dates."""
+        if not pandas_is_installed:
+            raise InstallPandasException(
+                "pandas is not installed, but TickerListing.to_dataframe() was "
+                "called. Install it with: pip install pandas"
+            )
+
+        data = {}
+        for column in self.columns:
+            values = self._values[column]
+            if column in CODED_COLUMNS:
+                codes = np.asarray(values, dtype=np.int64)
+            if column in self._iso_dates:
+                dates = [date or "NaT" for date in self._iso_dates[column]]
+                data[column] = np.array(dates, dtype="datetime64[D]")[codes]
+            elif column in CODED_COLUMNS:
+                data[column] = pd.Categorical.from_codes(
+                    codes, self._categories[column]
+                )
+            else:
+                data[column] = values
+        return pd.DataFrame(data, columns=self.columns)
+
+
+def _iso_date(value):
+    """Return a listing date as YYYY-MM-DD, or "" if it is missing or unknown.
+    A few rows of the listing use M/D/YYYY dates."""
+    if not value:
+        return ""
+    if len(value) >= 10 and value[4] == "-" and value[7] == "-":
+        return value[:10]
+    for date_format in ("%Y-%m-%d", "%m/%d/%Y"):
+        try:
+            return (
+                datetime.datetime.strptime(value[:10], date_format).date().isoformat()
+            )
+        except ValueError:
+            pass
+    return ""
+
+
+class ListingCache(object):
+    """Keep supported_tickers.zip up to date with conditional requests.
+
+    The file is downloaded once, then revalidated with its ETag and
+    Last-Modified validators at most every max_age seconds, so an unchanged
+    listing costs one small 304 response instead of a full download. With a
+    directory, the file and its validators are kept on disk and reused by
+    later processes.
+
+    Args:
+        directory (str): Optional directory to keep the listing in
+        max_age (float): Seconds a downloaded listing is used without
+            revalidating it
+    """
+
+    def __init__(self, directory=None, max_age=3600):
+        if directory is not None and not os.path.isdir(directory):
+            os.makedirs(directory)
+        self.directory = directory
+        self.max_age = max_age
+
+        self.listing = None
+        self._content = None
+        self._validators = {}
+        self._checked = None
+
+    def __repr__(self):
+        return '<ListingCache(directory="{}")>'.format(self.directory)
+
+    def _path(self, filename):
+        return os.path.join(self.directory, filename)
+
+    def _load(self):
+        """Read a listing kept on disk by an earlier process, if any"""
+        if self._content is not None or self.directory is None:
+            return
+        try:
+            with open(self._path("supported_tickers.json")) as f:
+                meta = json.load(f)
+            with open(self._path("supported_tickers.zip"), "rb") as f:
+                self._content = f.read()
+        except (OSError, ValueError):
+            return
+        self._validators = meta.get("validators", {})
+        self._checked = meta.get("checked")
+
+    def is_fresh(self):
+        """Whether the listing can be used without revalidating it"""
+        self._load()
+        return (
+            self._content is not None
+            and self._checked is not None
+            and time.time() - self._checked < self.max_age
+        )
+
+    def request_headers(self):
+        """Return the conditional request headers for the next download"""
+        self._load()
+        headers = {}
+        if self._content is not None:
+            if "ETag" in self._validators:
+                headers["If-None-Match"] = self._validators["ETag"]
+            if "Last-Modified" in self._validators:
+                headers["If-Modified-Since"] = self._validators["Last-Modified"]
+        return headers
+
+    def update(self, response):
+        """Store a downloaded (200) or revalidated (304) listing"""
+        if response.status_code == 304 and self._content is not None:
+            self._checked = time.time()
+        else:
+            check_response(response)
+            self._content = response.content
+            self._validators = {
+                name: response.headers[name]
+                for name in ("ETag", "Last-Modified")
+                if response.headers.get(name)
+            }
+            self._checked = time.time()
+            self.listing = None
+            if self.directory is not None:
+                with open(self._path("supported_tickers.zip"), "wb") as f:
+                    f.write(self._content)
+        self._save_meta()
+
+    def _save_meta(self):
+        if self.directory is None:
+            return
+        with open(self._path("supported_tickers.json"), "w") as f:
+            json.dump({"validators": self._validators, "checked": self._checked}, f)
+
+    def get_listing(self):
+        """Return the TickerListing of the stored file, parsing it only once"""
+        self._load()
+        if self.listing is None:
+            self.listing = TickerListing.from_zip(self._content)
+        return self.listing
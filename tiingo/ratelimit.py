@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import json
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+HOUR = 60 * 60
+DAY = 24 * HOUR
+
+
+class RateLimiter(object):
+    """Client-side token buckets enforcing hourly and daily request budgets.
+
+    Each budget is a bucket holding up to that many requests, refilled
+    continuously over its period, so requests can burst up to the budget and
+    then proceed at the sustainable rate. A request goes ahead once every
+    bucket has a token. The limiter can be shared by threads, asyncio tasks
+    (use acquire_async) and, through state_file, by several processes on one
+    machine.
+
+    Args:
+        per_hour (int): Requests allowed per hour, or None for no limit
+        per_day (int): Requests allowed per day, or None for no limit
+        state_file (str): Optional path of a file holding the bucket state, so
+            that processes using the same path share their budgets (POSIX only)
+    """
+
+    def __init__(self, per_hour=None, per_day=None, state_file=None):
+        self._limits = {}
+        if per_hour:
+            self._limits["hour"] = (per_hour, HOUR)
+        if per_day:
+            self._limits["day"] = (per_day, DAY)
+
+        if state_file is not None and fcntl is None:
+            raise RuntimeError(
+                "Sharing a RateLimiter through a state file requires fcntl (POSIX)"
+            )
+        self.state_file = state_file
+
+        self._lock = threading.Lock()
+        self._state = self._initial_state()
+        self.requests = 0
+        self.waited = 0.0
+
+    def __repr__(self):
+        return "<RateLimiter({})>".format(
+            ", ".join(
+                "per_{}={}".format(name, limit)
+                for name, (limit, _) in self._limits.items()
+            )
+        )
+
+    def _initial_state(self):
+        return {
+            "tokens": {name: float(limit) for name, (limit, _) in self._limits.items()},
+            "updated": time.time(),
+        }
+
+    def _refill(self, state, now):
+        elapsed = max(0.0, now - state["updated"])
+        for name, (limit, period) in self._limits.items():
+            tokens = state["tokens"].get(name, float(limit))
+            state["tokens"][name] = min(float(limit), tokens + elapsed * limit / period)
+        state["updated"] = now
+
+    def _take(self, state, now):
+        """Take a token from every bucket, or return how long to wait first"""
+        self._refill(state, now)
+        wait = 0.0
+        for name, (limit, period) in self._limits.items():
+            missing = 1.0 - state["tokens"][name]
+            if missing > 0:
+                wait = max(wait, missing * period / limit)
+        if wait > 0:
+            return wait
+
+        for name in self._limits:
+            state["tokens"][name] -= 1.0
+        return 0.0
+
+    def _with_state(self, update):
+        """Run update(state, now) on the shared state and return its result"""
+        with self._lock:
+            if self.state_file is None:
+                return update(self._state, time.time())
+
+            with open(self.state_file, "a+") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    f.seek(0)
+                    content = f.read()
+                    state = json.loads(content) if content else self._initial_state()
+                    result = update(state, time.time())
+                    f.seek(0)
+                    f.truncate()
+                    json.dump(state, f)
+                    f.flush()
+                    os.fsync(f.fileno())
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+            return result
+
+    def try_acquire(self):
+        """Take one request from the budget if possible, without waiting.
+
+        Returns 0 when the request may proceed, otherwise the number of
+        seconds until it could.
+        """
+        wait = self._with_state(self._take)
+        if wait == 0:
+            with self._lock:
+                self.requests += 1
+        return wait
+
+    def acquire(self, timeout=None):
+        """Wait until a request fits in the budget and take it.
+
+        Returns False if that would take longer than timeout seconds.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            wait = self.try_acquire()
+            if wait == 0:
+                return True
+            if deadline is not None and time.time() + wait > deadline:
+                return False
+            self._record_wait(wait)
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """Like acquire, but sleeps without blocking the event loop. With a
+        state_file, the file is locked and updated in the loop's default
+        executor, as another process may hold its lock."""
+        loop = asyncio.get_running_loop()
+        while True:
+            if self.state_file is None:
+                wait = self.try_acquire()
+            else:
+                wait = await loop.run_in_executor(None, self.try_acquire)
+            if wait == 0:
+                return True
+            self._record_wait(wait)
+            await asyncio.sleep(wait)
+
+    def _record_wait(self, wait):
+        with self._lock:
+            self.waited += wait
+
+    def remaining(self):
+        """Return the requests currently available in each budget, e.g.
+        {'hour': 498, 'day': 19873}"""
+
+        def read(state, now):
+            self._refill(state, now)
+            return {name: int(tokens) for name, tokens in state["tokens"].items()}
+
+        return self._with_state(read)
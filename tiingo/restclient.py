@@ -1,8 +1,25 @@
 # -*- coding: utf-8 -*-
 
+import json
 import logging
+import time
+
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import HTTPError
+from requests.structures import CaseInsensitiveDict
+
+from tiingo.cache import ResponseCache
+from tiingo.exceptions import InstallOrjsonException
+from tiingo.ratelimit import RateLimiter
+from tiingo.retry import RETRYABLE_ERRORS, RetryPolicy
+
+try:
+    import orjson
+
+    orjson_is_installed = True
+except ImportError:
+    orjson_is_installed = False
 
 
 # TODO: Possibly print HTTP json response if available?
@@ -12,13 +29,86 @@ class RestClientError(Exception):
     pass
 
 
+def build_response(status_code, content, headers=None, url=None, reason=None):
+    """Build a requests.Response from an already-downloaded body, so that
+    responses obtained without requests can be handled by the same code.
+    """
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = content
+    response._content_consumed = True
+    response.headers = CaseInsensitiveDict(headers or {})
+    response.url = url
+    response.reason = reason
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    return response
+
+
+def get_json_decoder(decoder=None):
+    """Return a function decoding a JSON response body (bytes).
+
+    Args:
+        decoder: "orjson", "json" (the standard library), a function taking
+            bytes, such as simdjson.loads, or None for orjson when it is
+            installed and the standard library otherwise.
+    """
+    if callable(decoder):
+        return decoder
+    if decoder is None:
+        decoder = "orjson" if orjson_is_installed else "json"
+    if decoder == "json":
+        return json.loads
+    if decoder == "orjson":
+        if not orjson_is_installed:
+            raise InstallOrjsonException(
+                "orjson is not installed, but config['json_decoder'] is 'orjson'. "
+                "Install it with: pip install tiingo[orjson]"
+            )
+        return orjson.loads
+    raise ValueError("Unknown JSON decoder: {!r}".format(decoder))
+
+
+def check_response(resp):
+    """Raise RestClientError if resp holds an HTTP error status"""
+    try:
+        resp.raise_for_status()
+    except HTTPError as e:
+        logging.error(resp.content)
+        raise RestClientError(e)
+
+
 class RestClient(object):
     def __init__(self, config={}):
         """Base class for interacting with RESTful APIs
         Child class MUST have a ._base_url property!
 
+        Requests go through a pooled keep-alive requests.Session by default, so
+        connections are reused across calls. Use close(), or the client as a
+        context manager, to release the pooled connections.
+
          Args:
-             config (dict): Arbitrary options that child classes can access
+             config (dict): Arbitrary options that child classes can access.
+                The connection pool is configured with these keys:
+                session: True (default) for a pooled session, False to make
+                    every call with a fresh connection, or a requests.Session
+                    to use as is.
+                pool_connections (int): Number of hosts to keep pools for.
+                pool_maxsize (int): Connections kept open per host. Defaults to
+                    config['max_workers'] when that is larger than 10.
+                pool_block (bool): Wait for a free connection instead of opening
+                    extra, unpooled ones when a host's pool is exhausted.
+                keep_alive (bool): Keep connections open between requests.
+                gzip (bool): Ask the server for compressed responses.
+                Successful GET responses are cached on disk when config['cache']
+                is a ResponseCache, or a directory to create one in.
+                Requests that reach the network wait for the request budget
+                when config['rate_limit'] is a RateLimiter, or a dict of its
+                arguments, e.g. {"per_hour": 10000, "per_day": 100000}.
+                Failed requests are retried following config['retry']: a
+                RetryPolicy, a dict of its arguments, True (default) for the
+                default policy, or False to never retry.
+                JSON bodies are decoded with config['json_decoder'] (see
+                get_json_decoder), orjson by default when it is installed.
         """
         self._config = config
 
@@ -28,11 +118,80 @@ class RestClient(object):
         self._headers = {}
         self._base_url = ""
 
-        if config.get("session"):
-            self._session = requests.Session()
+        session = config.get("session", True)
+        self._owns_session = False
+        if isinstance(session, requests.Session):
+            self._session = session
+        elif session:
+            self._session = self._create_session()
+            self._owns_session = True
         else:
             self._session = requests
 
+        cache = config.get("cache")
+        if cache is not None and not isinstance(cache, ResponseCache):
+            cache = ResponseCache(cache)
+        self._cache = cache
+
+        rate_limit = config.get("rate_limit")
+        if rate_limit is not None and not isinstance(rate_limit, RateLimiter):
+            rate_limit = RateLimiter(**rate_limit)
+        self._rate_limiter = rate_limit
+
+        self._json_decoder = get_json_decoder(config.get("json_decoder"))
+
+        retry = config.get("retry", True)
+        if retry is True:
+            retry = RetryPolicy()
+        elif isinstance(retry, dict):
+            retry = RetryPolicy(**retry)
+        self._retry_policy = retry or None
+
+    def _create_session(self):
+        config = self._config
+        pool_maxsize = config.get("pool_maxsize", max(10, config.get("max_workers", 1)))
+        adapter = HTTPAdapter(
+            pool_connections=config.get("pool_connections", 10),
+            pool_maxsize=pool_maxsize,
+            pool_block=config.get("pool_block", False),
+        )
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+        if not config.get("keep_alive", True):
+            session.headers["Connection"] = "close"
+        if not config.get("gzip", True):
+            session.headers["Accept-Encoding"] = "identity"
+        return session
+
+    def close(self):
+        """Close the pooled connections of a session created by this client"""
+        if self._owns_session:
+            self._session.close()
+        if self._cache is not None and self._cache is not self._config.get("cache"):
+            self._cache.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def remaining_quota(self):
+        """Return the requests left in each budget of config['rate_limit'],
+        e.g. {'hour': 498, 'day': 19873}, or None without a rate limit."""
+        if self._rate_limiter is None:
+            return None
+        return self._rate_limiter.remaining()
+
+    def retry_stats(self):
+        """Return the counters of config['retry'] (see RetryPolicy.stats),
+        or None when retries are disabled."""
+        if self._retry_policy is None:
+            return None
+        return self._retry_policy.stats()
+
     def __repr__(self):
         return '<RestClient(url="{}")>'.format(self._base_url)
 
@@ -44,14 +203,67 @@ class RestClient(object):
             url (str): path appended to the base_url to create request
             **kwargs: passed directly to a requests.request object
         """
-        resp = self._session.request(
-            method, "{}/{}".format(self._base_url, url), headers=self._headers, **kwargs
-        )
+        full_url = "{}/{}".format(self._base_url, url)
+        cache_key = self._cache_key(method, full_url, kwargs)
+        if cache_key is not None:
+            resp = self._cached_response(cache_key)
+            if resp is not None:
+                return resp
 
-        try:
-            resp.raise_for_status()
-        except HTTPError as e:
-            logging.error(resp.content)
-            raise RestClientError(e)
+        attempt = 0
+        while True:
+            if self._rate_limiter is not None:
+                self._rate_limiter.acquire()
+            try:
+                resp = self._session.request(
+                    method, full_url, headers=self._headers, **kwargs
+                )
+            except RETRYABLE_ERRORS as e:
+                delay = self._retry_delay(method, attempt, error=e)
+                if delay is None:
+                    raise
+            else:
+                delay = self._retry_delay(method, attempt, response=resp)
+                if delay is None:
+                    break
+                resp.close()
+            time.sleep(delay)
+            attempt += 1
 
+        check_response(resp)
+        if cache_key is not None:
+            self._store_response(cache_key, url, kwargs.get("params"), resp)
         return resp
+
+    def _decode_json(self, response):
+        """Decode the JSON body of response with config['json_decoder']"""
+        return self._json_decoder(response.content)
+
+    def _retry_delay(self, method, attempt, response=None, error=None):
+        """Return the seconds to wait before retrying a failed request, or
+        None if it succeeded or shouldn't be retried"""
+        if self._retry_policy is None or (response is not None and response.ok):
+            return None
+        return self._retry_policy.delay(method, attempt, response, error)
+
+    def _cache_key(self, method, full_url, kwargs):
+        """Return the cache key for a request, or None if it can't be cached"""
+        if self._cache is None or method.upper() != "GET" or kwargs.get("stream"):
+            return None
+        return self._cache.key(method, full_url, kwargs.get("params"))
+
+    def _cached_response(self, cache_key):
+        cached = self._cache.get(cache_key)
+        if cached is None:
+            return None
+        status_code, headers, content = cached
+        return build_response(status_code, content, headers, cache_key.split(" ")[1])
+
+    def _store_response(self, cache_key, url, params, resp):
+        self._cache.set(
+            cache_key,
+            resp.status_code,
+            resp.headers,
+            resp.content,
+            self._cache.ttl_for(url, params),
+        )
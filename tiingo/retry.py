@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+
+import email.utils
+import logging
+import random
+import threading
+import time
+
+from requests.exceptions import ConnectionError, Timeout
+
+# Methods that can be repeated without changing anything on the server.
+IDEMPOTENT_METHODS = frozenset(["GET", "HEAD", "OPTIONS", "PUT", "DELETE"])
+
+# Network failures worth retrying; the request may not have reached the server.
+RETRYABLE_ERRORS = (ConnectionError, Timeout)
+
+logger = logging.getLogger(__name__)
+
+
+class RetryPolicy(object):
+    """Decide whether and when a failed request is retried.
+
+    Retries wait an exponentially growing, fully jittered delay
+    (uniform between 0 and backoff * 2 ** attempt, capped at max_backoff),
+    or as long as the response's Retry-After header asks. Only idempotent
+    methods are retried, and all requests sharing the policy draw from one
+    retry budget, so a failing API can't multiply the load put on it.
+
+    Counters of retries per status, time spent waiting and requests given up
+    on are available through stats().
+
+    Args:
+        retries (dict): Maximum retries per status code (e.g. 429), status
+            class ("4xx", "5xx") or "connection" for network errors. The most
+            specific key wins. Defaults to 5 for 429, 3 for 5xx and connection
+            errors.
+        backoff (float): Base delay in seconds
+        max_backoff (float): Longest delay between two attempts in seconds
+        max_retry_after (float): Give up instead of waiting when Retry-After
+            asks for longer than this many seconds
+        budget (int): Maximum number of retries over the policy's lifetime,
+            or None for no limit
+    """
+
+    DEFAULT_RETRIES = {429: 5, "5xx": 3, "connection": 3}
+
+    def __init__(
+        self,
+        retries=None,
+        backoff=0.5,
+        max_backoff=60,
+        max_retry_after=300,
+        budget=None,
+    ):
+        self.retries = dict(self.DEFAULT_RETRIES if retries is None else retries)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_retry_after = max_retry_after
+        self.budget = budget
+
+        self._lock = threading.Lock()
+        self._retries = {}
+        self._waited = 0.0
+        self._gave_up = 0
+        self._budget_exhausted = 0
+
+    def __repr__(self):
+        return "<RetryPolicy(retries={})>".format(self.retries)
+
+    def max_retries(self, status_code=None):
+        """Return how often a failure is retried, by status code or, for
+        status_code=None, a network error"""
+        if status_code is None:
+            return self.retries.get("connection", 0)
+        if status_code in self.retries:
+            return self.retries[status_code]
+        return self.retries.get("{}xx".format(status_code // 100), 0)
+
+    def delay(self, method, attempt, response=None, error=None):
+        """Return the seconds to wait before retrying, or None to give up.
+
+        Args:
+            method (str): HTTP method of the failed request
+            attempt (int): Number of retries already made for this request
+            response (requests.Response): The failed response, if any
+            error (Exception): The network error, if there was no response
+        """
+        status_code = None if response is None else response.status_code
+        if method.upper() not in IDEMPOTENT_METHODS:
+            return None
+        if attempt >= self.max_retries(status_code):
+            if self.max_retries(status_code):
+                self._count("_gave_up")
+            return None
+
+        retry_after = None if response is None else retry_after_seconds(response)
+        if retry_after is not None and retry_after > self.max_retry_after:
+            self._count("_gave_up")
+            return None
+
+        with self._lock:
+            if self.budget is not None and sum(self._retries.values()) >= self.budget:
+                self._budget_exhausted += 1
+                return None
+            key = "connection" if status_code is None else status_code
+            self._retries[key] = self._retries.get(key, 0) + 1
+
+        if retry_after is not None:
+            seconds = retry_after
+        else:
+            seconds = random.uniform(
+                0, min(self.max_backoff, self.backoff * 2**attempt)
+            )
+        with self._lock:
+            self._waited += seconds
+
+        logger.warning(
+            "Retrying %s request after %s in %.2fs (retry %d of %d)",
+            method,
+            status_code or type(error).__name__,
+            seconds,
+            attempt + 1,
+            self.max_retries(status_code),
+        )
+        return seconds
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def stats(self):
+        """Return the retry counters, e.g.
+        {'retries': 4, 'by_status': {429: 3, 502: 1}, 'waited': 12.5,
+        'gave_up': 0, 'budget_exhausted': 0}"""
+        with self._lock:
+            return {
+                "retries": sum(self._retries.values()),
+                "by_status": dict(self._retries),
+                "waited": self._waited,
+                "gave_up": self._gave_up,
+                "budget_exhausted": self._budget_exhausted,
+            }
+
+
+def retry_after_seconds(response):
+    """Return the delay asked for by a Retry-After header in seconds, or None"""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+import csv
+import os
+
+
+class CSVPriceStore(object):
+    """Keep price history as one CSV file per ticker, for TiingoClient.sync_prices.
+
+    Any object with the same two methods can be used as a store:
+
+    - last_date(ticker): the date of the latest stored bar exactly as returned
+      by the API (e.g. "2018-01-05T00:00:00.000Z"), or None if there is none.
+    - append(ticker, prices): add a list of price dicts, oldest first.
+
+    Args:
+        directory (str): Directory holding the <ticker>.csv files
+    """
+
+    def __init__(self, directory):
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        self.directory = directory
+
+    def __repr__(self):
+        return '<CSVPriceStore(directory="{}")>'.format(self.directory)
+
+    def path(self, ticker):
+        return os.path.join(self.directory, "{}.csv".format(ticker))
+
+    def last_date(self, ticker):
+        last_line = _read_last_line(self.path(ticker))
+        if last_line is None:
+            return None
+
+        row = next(csv.reader([last_line]))
+        if row[0] == "date":  # Header only
+            return None
+        return row[0]
+
+    def append(self, ticker, prices):
+        if not prices:
+            return
+
+        path = self.path(ticker)
+        is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+        with open(path, "a", newline="") as f:
+            if is_new:
+                fieldnames = ["date"] + [key for key in prices[0] if key != "date"]
+            else:
+                with open(path, newline="") as existing:
+                    fieldnames = next(csv.reader(existing))
+            writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction="ignore")
+            if is_new:
+                writer.writeheader()
+            writer.writerows(prices)
+
+    def read(self, ticker):
+        """Return the stored prices of ticker as a list of dicts"""
+        path = self.path(ticker)
+        if not os.path.exists(path):
+            return []
+        with open(path, newline="") as f:
+            return list(csv.DictReader(f))
+
+
+def _read_last_line(path, block_size=4096):
+    """Return the last non-empty line of a text file without reading all of it"""
+    if not os.path.exists(path):
+        return None
+
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+        data = b""
+        position = end
+        while position > 0:
+            position = max(0, position - block_size)
+            f.seek(position)
+            data = f.read(end - position)
+            lines = data.rstrip(b"\r\n").splitlines()
+            if len(lines) > 1 or position == 0:
+                return lines[-1].decode("utf-8") if lines else None
+    return None
@@ -1,7 +1,26 @@
+import asyncio
 import os
+import logging
+import random
+import re
+import threading
+import time
 import websocket
 import json
 from tiingo.exceptions import MissingRequiredArgumentError
+from tiingo.restclient import get_json_decoder
+from tiingo.wsstream import BarAggregator, MessageQueue, UpdateBatcher, update_key
+
+logger = logging.getLogger(__name__)
+
+ENDPOINTS = ("iex", "fx", "crypto")
+
+# Tiingo sends a heartbeat ("H") message to keep quiet connections alive. A
+# connection that sends nothing, not even a heartbeat, for this many seconds
+# is considered dead and reconnected.
+DEFAULT_HEARTBEAT_TIMEOUT = 90
+
+HEARTBEAT_PATTERN = re.compile(r'"messageType"\s*:\s*"H"')
 
 
 class TiingoWebsocketClient:
@@ -37,9 +56,89 @@ class TiingoWebsocketClient:
     # any logic should be implemented in the callback function
     TiingoWebsocketClient(subscribe,endpoint="iex",on_msg_cb=cb_fn)
     while True:pass
+
+    With blocking=False the client runs on a background thread instead, and
+    is stopped with close():
+
+    client = TiingoWebsocketClient(subscribe, endpoint="iex", on_msg_cb=cb_fn,
+                                   blocking=False)
+    ...
+    client.close()
+
+    With blocking=None the client is not started, for example to run it
+    from an asyncio task with run_async():
+
+    client = TiingoWebsocketClient(subscribe, endpoint="iex", on_msg_cb=cb_fn,
+                                   blocking=None)
+    task = asyncio.create_task(client.run_async())
+
+    Dropped connections are reconnected with jittered exponential backoff
+    (uniform between 0 and backoff * 2 ** attempt, capped at max_backoff)
+    and subscribed again with the same config. A connection that sends no
+    message, not even a heartbeat, for heartbeat_timeout seconds is
+    reconnected too.
+
+    With parse=True each message is decoded once, with orjson when it is
+    installed (see json_decoder), heartbeats are dropped and on_msg_cb is
+    called with the decoded dict. With batch_size and/or batch_interval, the
+    data of price update ("A") messages is delivered in batches to
+    on_batch_cb (on_msg_cb by default) instead, as a list of namedtuples
+    (batch_format="records") or as a dict of numpy column arrays
+    (batch_format="columns"); see tiingo.wsstream.UpdateBatcher.
+
+    def on_batch(updates):
+        for update in updates:
+            print(update.ticker, update.lastPrice)
+
+    TiingoWebsocketClient(subscribe, endpoint="iex", on_msg_cb=print,
+                          on_batch_cb=on_batch, batch_size=500,
+                          batch_interval=0.25)
+
+    With queue_size, received messages are put in a bounded MessageQueue and
+    the callbacks run on a separate dispatch thread, so a slow consumer
+    doesn't stall reading the socket. When the queue is full, overflow
+    decides whether to wait for room ("block"), drop the oldest message
+    ("drop_oldest") or replace the queued update of the same ticker and
+    type, so a quote never replaces a trade ("conflate"). queue_stats()
+    reports the queue depth and drop counters.
+
+    With bar_interval (e.g. "1s" or "1min"), IEX and crypto trades are also
+    aggregated into OHLCV bars per ticker, and on_bar_cb is called with the
+    ticker and each finished bar, in the schema of get_ticker_price's intraday
+    rows; see tiingo.wsstream.BarAggregator. Messages are then decoded, as
+    with parse=True. When the client is closed, or its connection ends
+    without reconnect, every bar still being built is delivered, including
+    the unfinished last one, since no more trades will arrive for it.
+
+    def on_bar(ticker, bar):
+        print(ticker, bar["date"], bar["close"], bar["volume"])
+
+    TiingoWebsocketClient(subscribe, endpoint="iex", on_msg_cb=print,
+                          bar_interval="1min", on_bar_cb=on_bar)
     """
 
-    def __init__(self, config=None, endpoint=None, on_msg_cb=None):
+    def __init__(
+        self,
+        config=None,
+        endpoint=None,
+        on_msg_cb=None,
+        blocking=True,
+        reconnect=True,
+        backoff=0.5,
+        max_backoff=60,
+        heartbeat_timeout=DEFAULT_HEARTBEAT_TIMEOUT,
+        parse=False,
+        json_decoder=None,
+        batch_size=None,
+        batch_interval=None,
+        batch_format="records",
+        on_batch_cb=None,
+        queue_size=None,
+        overflow="block",
+        bar_interval=None,
+        on_bar_cb=None,
+        bar_grace=2.0,
+    ):
         self._base_url = "wss://api.tiingo.com"
         self.config = {} if config is None else config
 
@@ -58,9 +157,7 @@ class TiingoWebsocketClient:
             )
 
         self.endpoint = endpoint
-        if not (
-            self.endpoint == "iex" or self.endpoint == "fx" or self.endpoint == "crypto"
-        ):
+        if self.endpoint not in ENDPOINTS:
             raise AttributeError("Endpoint must be defined as either (iex,fx,crypto) ")
 
         self.on_msg_cb = on_msg_cb
@@ -72,35 +169,270 @@ class TiingoWebsocketClient:
                 "    print(msg)"
             )
 
+        self.reconnect = reconnect
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.heartbeat_timeout = heartbeat_timeout
+
+        self._decode = None
+        self._batcher = None
+        self._bars = None
+        if parse or batch_size or batch_interval or bar_interval:
+            self._decode = get_json_decoder(json_decoder)
+        if bar_interval:
+            if on_bar_cb is None:
+                raise MissingRequiredArgumentError(
+                    "please define on_bar_cb, a callback called with the ticker "
+                    "and each finished bar, when bar_interval is set"
+                )
+            self._bars = BarAggregator(on_bar_cb, bar_interval, grace=bar_grace)
+        if batch_size or batch_interval:
+            self._batcher = UpdateBatcher(
+                on_batch_cb or on_msg_cb,
+                endpoint,
+                batch_size=batch_size,
+                interval=batch_interval,
+                fmt=batch_format,
+            )
+
+        self._queue = None
+        self._dispatcher = None
+        self._key_decode = None
+        if queue_size:
+            self._queue = MessageQueue(queue_size, overflow)
+            if overflow == "conflate":
+                self._key_decode = self._decode or get_json_decoder(json_decoder)
+            self._dispatcher = threading.Thread(
+                target=self._dispatch_queued,
+                name="TiingoWebsocketClient-{}-dispatch".format(endpoint),
+                daemon=True,
+            )
+            self._dispatcher.start()
+
+        self.connections = 0
+        self.heartbeats = 0
+        self.last_message = None
+        self.last_heartbeat = None
+
+        self._ws = None
+        self._opened = False
+        self._connected = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
         websocket.enableTrace(False)
 
-        ws = websocket.WebSocketApp(
-            "{0}/{1}".format(self._base_url, self.endpoint),
-            on_message=self.get_on_msg_cb(),
-            on_error=self.on_error,
-            on_close=self.on_close,
-            on_open=self.get_on_open(self.config),
-        )
-        ws.run_forever()
+        if blocking:
+            self.run_forever()
+        elif blocking is not None:
+            self.start()
+
+    def __repr__(self):
+        return '<TiingoWebsocketClient(endpoint="{}")>'.format(self.endpoint)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def url(self):
+        return "{0}/{1}".format(self._base_url, self.endpoint)
+
+    @property
+    def is_connected(self):
+        return self._connected.is_set()
+
+    def start(self):
+        """Run the client on a background (daemon) thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stopped.clear()
+            self._thread = threading.Thread(
+                target=self.run_forever,
+                name="TiingoWebsocketClient-{}".format(self.endpoint),
+                daemon=True,
+            )
+            self._thread.start()
+        return self._thread
+
+    async def run_async(self):
+        """Run the client from an asyncio task, until the task is cancelled.
+
+        websocket-client is synchronous, so the connection itself runs in the
+        event loop's default executor. Construct the client with
+        blocking=None, as it must not be running on its own thread already.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            raise RuntimeError(
+                "TiingoWebsocketClient is already running on a background thread, "
+                "construct it with blocking=None to use run_async"
+            )
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, self.run_forever)
+        finally:
+            self.close()
+
+    def run_forever(self):
+        """Connect and deliver messages until close() is called, reconnecting
+        dropped connections unless reconnect is False"""
+        attempt = 0
+        while not self._stopped.is_set():
+            self._ws = websocket.WebSocketApp(
+                self.url,
+                on_message=self.get_on_msg_cb(),
+                on_error=self.on_error,
+                on_close=self.on_close,
+                on_open=self.get_on_open(self.config),
+            )
+            watchdog = self._start_watchdog(self._ws)
+            try:
+                self._ws.run_forever()
+            finally:
+                self._connected.clear()
+                if watchdog is not None:
+                    watchdog.set()
+
+            if self._stopped.is_set() or not self.reconnect:
+                break
+            if self._opened:  # Start the backoff over after a good connection
+                attempt = 0
+                self._opened = False
+            delay = random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
+            logger.warning(
+                "Websocket connection to %s closed, reconnecting in %.1fs",
+                self.url,
+                delay,
+            )
+            attempt += 1
+            self._stopped.wait(delay)
+
+        if self._stopped.is_set() or not self.reconnect:
+            self._drain()
+
+    def _start_watchdog(self, ws):
+        """Close ws when it stays silent for heartbeat_timeout seconds"""
+        if not self.heartbeat_timeout:
+            return None
+        stop = threading.Event()
+
+        def watch():
+            while not stop.wait(min(1.0, self.heartbeat_timeout)):
+                if not self._connected.is_set():
+                    continue
+                if time.monotonic() - self.last_message > self.heartbeat_timeout:
+                    logger.warning(
+                        "No message or heartbeat from %s for %ss, reconnecting",
+                        self.url,
+                        self.heartbeat_timeout,
+                    )
+                    ws.close()
+                    return
+
+        threading.Thread(target=watch, daemon=True).start()
+        return stop
+
+    def close(self):
+        """Close the connection and stop reconnecting"""
+        self._stopped.set()
+        if self._ws is not None:
+            self._ws.close()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        self._drain()
+        if self._batcher is not None:
+            self._batcher.close()
+
+    def _drain(self):
+        """Deliver the queued and batched messages, and every bar being built"""
+        if self._queue is not None:
+            self._queue.close()
+            if self._dispatcher is not threading.current_thread():
+                self._dispatcher.join()
+        if self._batcher is not None:
+            self._batcher.flush()
+        if self._bars is not None:
+            self._bars.flush()
+
+    def queue_stats(self):
+        """Return the depth and counters of the message queue, or None without
+        queue_size"""
+        return None if self._queue is None else self._queue.stats()
 
     def get_on_open(self, config):
         # the methods passed to websocketClient have to be unbounded if we want WebSocketApp to pass everything correctly
         # see websocket-client/#471
         def on_open(ws):
+            if self._stopped.is_set():
+                # close() ran before run_forever started, and was undone by
+                # run_forever setting keep_running again
+                ws.close()
+                return
+            self.connections += 1
+            self._opened = True
+            self.last_message = time.monotonic()
+            self._connected.set()
             ws.send(json.dumps(config))
 
         return on_open
 
     def get_on_msg_cb(self):
         def on_msg_cb_local(ws, msg):
-            self.on_msg_cb(msg)
+            self.last_message = time.monotonic()
+            if self._queue is not None:
+                self._enqueue(msg)
+            else:
+                self._handle(msg)
             return
 
         return on_msg_cb_local
 
-    # since methods need to be unbound in order for websocketClient these methods don't have a self as their first parameter
-    def on_error(ws, error):  # lgtm[py/not-named-self]
-        print(error)
+    def _enqueue(self, msg):
+        message = key = None
+        if self._key_decode is not None:
+            message = self._key_decode(msg)
+            key = update_key(self.endpoint, message)
+        self._queue.put((msg, message), key)
+
+    def _dispatch_queued(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            try:
+                self._handle(*item)
+            except Exception:
+                logger.exception("Error delivering websocket message from %s", self.url)
+
+    def _handle(self, msg, message=None):
+        if self._decode is not None:
+            self._dispatch(self._decode(msg) if message is None else message)
+            return
+        if HEARTBEAT_PATTERN.search(msg):
+            self.heartbeats += 1
+            self.last_heartbeat = self.last_message
+        self.on_msg_cb(msg)
+
+    def _dispatch(self, message):
+        """Deliver a decoded message, dropping heartbeats and batching price
+        updates when batching is on"""
+        message_type = message.get("messageType")
+        if self._bars is not None:
+            if message_type == "A":
+                self._bars.update(self.endpoint, message["data"])
+            self._bars.flush_due()
+        if message_type == "H":
+            self.heartbeats += 1
+            self.last_heartbeat = self.last_message
+        elif message_type == "A" and self._batcher is not None:
+            self._batcher.add(message["data"])
+        else:
+            self.on_msg_cb(message)
+
+    def on_error(self, ws, error):
+        logger.error("Websocket error from %s: %s", self.url, error)
 
-    def on_close(ws):  # lgtm[py/not-named-self]
-        pass
+    def on_close(self, ws, close_status_code=None, close_msg=None):
+        self._connected.clear()
@@ -0,0 +1,341 @@
+# -*- coding: utf-8 -*-
+"""Websocket connections to several Tiingo endpoints on one event loop."""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+
+from tiingo.exceptions import InstallAiohttpException, MissingRequiredArgumentError
+from tiingo.restclient import get_json_decoder
+from tiingo.wsclient import DEFAULT_HEARTBEAT_TIMEOUT, ENDPOINTS
+
+try:
+    import aiohttp
+
+    aiohttp_is_installed = True
+except ImportError:
+    aiohttp_is_installed = False
+
+logger = logging.getLogger(__name__)
+
+
+class Feed(object):
+    """Connection state and subscribed tickers of one endpoint"""
+
+    def __init__(self, endpoint, tickers=None, event_data=None):
+        self.endpoint = endpoint
+        self.all_tickers = tickers is None
+        self.tickers = set(tickers or ())
+        self.event_data = dict(event_data or {})
+
+        self.subscription_id = None
+        # The tickers the server was asked for, None until the connection
+        # sent its subscribe message
+        self.subscribed = None
+        self.ws = None
+        self.task = None
+        self.connections = 0
+        self.heartbeats = 0
+        self.last_message = None
+
+    def __repr__(self):
+        return '<Feed(endpoint="{}", tickers={})>'.format(
+            self.endpoint, sorted(self.tickers)
+        )
+
+    def stats(self):
+        return {
+            "connected": self.ws is not None and not self.ws.closed,
+            "subscription_id": self.subscription_id,
+            "tickers": sorted(self.tickers),
+            "connections": self.connections,
+            "heartbeats": self.heartbeats,
+        }
+
+
+class TiingoWebsocketManager(object):
+    """asyncio client for several websocket endpoints (iex, fx and crypto)
+    at once, each on its own aiohttp connection, all on one event loop and
+    delivering to one callback.
+
+    on_msg_cb is called with the endpoint and each message, decoded (with
+    orjson when installed, see json_decoder) unless parse=False. Heartbeats
+    are dropped. It may be a function or a coroutine function.
+
+        async def main():
+            manager = TiingoWebsocketManager(on_msg_cb=print)
+            manager.add_endpoint("iex", tickers=["aapl"], thresholdLevel=5)
+            manager.add_endpoint("crypto", tickers=["btcusd"])
+            task = asyncio.create_task(manager.run())
+
+            await manager.subscribe("iex", "msft", "googl")
+            await manager.unsubscribe("crypto", "btcusd")
+            ...
+            await manager.close()
+
+    Tickers are added and removed on the open connections, using their
+    subscriptionId, without reconnecting. Like TiingoWebsocketClient,
+    dropped or silent connections are reconnected with jittered exponential
+    backoff and subscribed again to their current tickers.
+
+    Args:
+        on_msg_cb (callable): Called with (endpoint, message)
+        api_key (str): Defaults to the TIINGO_API_KEY environment variable
+        parse (bool): Deliver decoded dicts rather than raw strings
+        json_decoder: See TiingoClient's config['json_decoder']
+        reconnect (bool): Reconnect dropped connections
+        backoff (float): Base of the reconnection backoff, in seconds
+        max_backoff (float): Longest wait between reconnections
+        heartbeat_timeout (float): Seconds without a message or heartbeat
+            after which a connection is reconnected
+    """
+
+    def __init__(
+        self,
+        on_msg_cb=None,
+        api_key=None,
+        parse=True,
+        json_decoder=None,
+        reconnect=True,
+        backoff=0.5,
+        max_backoff=60,
+        heartbeat_timeout=DEFAULT_HEARTBEAT_TIMEOUT,
+    ):
+        if not aiohttp_is_installed:
+            raise InstallAiohttpException(
+                "aiohttp is not installed, but TiingoWebsocketManager requires it. "
+                "Install tiingo with async dependencies: 'pip install tiingo[async]'"
+            )
+        self._base_url = "wss://api.tiingo.com"
+        self._api_key = api_key or os.environ.get("TIINGO_API_KEY")
+        if not self._api_key:
+            raise RuntimeError(
+                "Tiingo API Key not provided. Please provide"
+                " via environment variable or api_key argument."
+            )
+        if on_msg_cb is None:
+            raise MissingRequiredArgumentError(
+                "please define on_msg_cb, a callback called with the endpoint "
+                "and each message"
+            )
+        self.on_msg_cb = on_msg_cb
+        self.parse = parse
+        self.reconnect = reconnect
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.heartbeat_timeout = heartbeat_timeout
+
+        self.feeds = {}
+        self._decode = get_json_decoder(json_decoder)
+        self._session = None
+        self._running = False
+        self._closed = False
+
+    def __repr__(self):
+        return "<TiingoWebsocketManager(endpoints={})>".format(list(self.feeds))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def add_endpoint(self, endpoint, tickers=None, **eventData):
+        """Connect to endpoint, subscribed to tickers (all tickers if None).
+
+        Other keyword arguments, such as thresholdLevel, are sent in the
+        eventData of the subscribe message. Endpoints added while run() is
+        running are connected right away.
+        """
+        if endpoint not in ENDPOINTS:
+            raise AttributeError("Endpoint must be defined as either (iex,fx,crypto) ")
+        if endpoint in self.feeds:
+            raise ValueError("{} was already added".format(endpoint))
+        if tickers is not None:
+            tickers = [ticker.lower() for ticker in tickers]
+        feed = self.feeds[endpoint] = Feed(endpoint, tickers, eventData)
+        if self._running:
+            feed.task = asyncio.ensure_future(self._run_feed(feed))
+        return feed
+
+    async def remove_endpoint(self, endpoint):
+        """Disconnect from endpoint"""
+        feed = self.feeds.pop(endpoint)
+        if feed.task is not None:
+            feed.task.cancel()
+            await asyncio.gather(feed.task, return_exceptions=True)
+
+    async def subscribe(self, endpoint, *tickers):
+        """Add tickers to the subscription of endpoint"""
+        feed = self.feeds[endpoint]
+        feed.tickers.update(ticker.lower() for ticker in tickers)
+        await self._sync_tickers(feed)
+
+    async def unsubscribe(self, endpoint, *tickers):
+        """Remove tickers from the subscription of endpoint"""
+        feed = self.feeds[endpoint]
+        feed.tickers.difference_update(ticker.lower() for ticker in tickers)
+        await self._sync_tickers(feed)
+
+    def stats(self):
+        """Return the connection state and counters of every endpoint"""
+        return {endpoint: feed.stats() for endpoint, feed in self.feeds.items()}
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession()
+        return self._session
+
+    async def run(self):
+        """Connect to every endpoint and deliver their messages until close()
+        is called, or until every connection ended when reconnect is False"""
+        self._running = True
+        try:
+            for feed in self.feeds.values():
+                if feed.task is None or feed.task.done():
+                    feed.task = asyncio.ensure_future(self._run_feed(feed))
+            while True:
+                tasks = [
+                    feed.task
+                    for feed in self.feeds.values()
+                    if feed.task is not None and not feed.task.done()
+                ]
+                if not tasks:
+                    break
+                await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            self._running = False
+            if self._session is not None:
+                await self._session.close()
+                self._session = None
+
+    async def close(self):
+        """Close every connection and stop reconnecting"""
+        self._closed = True
+        for feed in list(self.feeds.values()):
+            if feed.ws is not None:
+                await feed.ws.close()
+            if feed.task is not None and not feed.task.done():
+                feed.task.cancel()
+        await asyncio.gather(
+            *(feed.task for feed in self.feeds.values() if feed.task is not None),
+            return_exceptions=True,
+        )
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _run_feed(self, feed):
+        attempt = 0
+        url = "{}/{}".format(self._base_url, feed.endpoint)
+        while not self._closed:
+            try:
+                async with self._get_session().ws_connect(url) as ws:
+                    feed.ws = ws
+                    feed.connections += 1
+                    feed.last_message = time.monotonic()
+                    attempt = 0
+                    await self._send_subscribe(feed)
+                    await self._receive(feed, ws)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.error("Websocket error from %s: %s", url, e)
+            finally:
+                feed.ws = None
+                feed.subscription_id = None
+                feed.subscribed = None
+
+            if self._closed or not self.reconnect:
+                return
+            delay = random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
+            logger.warning(
+                "Websocket connection to %s closed, reconnecting in %.1fs", url, delay
+            )
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def _receive(self, feed, ws):
+        while True:
+            try:
+                msg = await asyncio.wait_for(ws.receive(), self.heartbeat_timeout)
+            except asyncio.TimeoutError:
+                logger.warning(
+                    "No message or heartbeat from %s for %ss, reconnecting",
+                    feed.endpoint,
+                    self.heartbeat_timeout,
+                )
+                return
+            if msg.type != aiohttp.WSMsgType.TEXT:
+                return  # Closed, or an error
+            feed.last_message = time.monotonic()
+            await self._handle(feed, msg.data)
+
+    async def _handle(self, feed, data):
+        try:
+            message = self._decode(data)
+        except ValueError:
+            logger.exception("Could not decode a message from %s", feed.endpoint)
+            return
+        message_type = message.get("messageType")
+        if message_type == "H":
+            feed.heartbeats += 1
+            return
+        if message_type == "I" and isinstance(message.get("data"), dict):
+            subscription_id = message["data"].get("subscriptionId")
+            if subscription_id is not None and feed.subscription_id is None:
+                feed.subscription_id = subscription_id
+                await self._sync_tickers(feed)
+
+        try:
+            result = self.on_msg_cb(feed.endpoint, message if self.parse else data)
+            if asyncio.iscoroutine(result):
+                await result
+        except Exception:
+            logger.exception("Error in on_msg_cb for a message from %s", feed.endpoint)
+
+    async def _send(self, feed, eventName, eventData):
+        await feed.ws.send_str(
+            json.dumps(
+                {
+                    "eventName": eventName,
+                    "authorization": self._api_key,
+                    "eventData": eventData,
+                }
+            )
+        )
+
+    async def _send_subscribe(self, feed):
+        """Open the subscription of a new connection, to every ticker when
+        the feed was added with tickers=None. A feed whose tickers were all
+        unsubscribed waits for the next subscribe() instead, since a
+        subscribe message without tickers asks for every ticker."""
+        eventData = dict(feed.event_data)
+        if not feed.all_tickers:
+            if not feed.tickers:
+                return
+            eventData["tickers"] = sorted(feed.tickers)
+        feed.subscribed = set(feed.tickers)
+        await self._send(feed, "subscribe", eventData)
+
+    async def _sync_tickers(self, feed):
+        """Update the subscription of an open connection to feed.tickers.
+        Before the subscriptionId is known, changes wait for it."""
+        if feed.ws is None or feed.ws.closed:
+            return
+        if feed.subscribed is None:
+            await self._send_subscribe(feed)
+            return
+        if feed.subscription_id is None:
+            return
+        added = sorted(feed.tickers - feed.subscribed)
+        removed = sorted(feed.subscribed - feed.tickers)
+        feed.subscribed = set(feed.tickers)
+        for eventName, tickers in (("subscribe", added), ("unsubscribe", removed)):
+            if tickers:
+                await self._send(
+                    feed,
+                    eventName,
+                    {"subscriptionId": feed.subscription_id, "tickers": tickers},
+                )
@@ -0,0 +1,558 @@
+# -*- coding: utf-8 -*-
+"""Queueing, decoding, batching and bar aggregation of websocket price
+updates."""
+
+from array import array
+from collections import deque
+import datetime
+import re
+import threading
+import time
+
+from tiingo.api import get_record_type
+from tiingo.columnar import numpy_is_installed, records_to_array
+from tiingo.exceptions import InstallNumpyException
+
+# Fields of the "data" array of "A" (price update) messages, by endpoint and
+# update type ("Q" quote, "T" trade, "B" break). See
+# https://api.tiingo.com/documentation/websockets/iex > Response
+IEX_FIELDS = (
+    "updateType",
+    "date",
+    "timestamp",
+    "ticker",
+    "bidSize",
+    "bidPrice",
+    "midPrice",
+    "askPrice",
+    "askSize",
+    "lastPrice",
+    "lastSize",
+    "halted",
+    "afterHours",
+    "intermarketSweepOrder",
+    "oddlot",
+    "nmsRule611",
+)
+FX_FIELDS = (
+    "updateType",
+    "ticker",
+    "date",
+    "bidSize",
+    "bidPrice",
+    "midPrice",
+    "askSize",
+    "askPrice",
+)
+CRYPTO_QUOTE_FIELDS = (
+    "updateType",
+    "ticker",
+    "date",
+    "exchange",
+    "bidSize",
+    "bidPrice",
+    "midPrice",
+    "askSize",
+    "askPrice",
+)
+CRYPTO_TRADE_FIELDS = (
+    "updateType",
+    "ticker",
+    "date",
+    "exchange",
+    "lastSize",
+    "lastPrice",
+)
+
+UPDATE_FIELDS = {
+    "iex": {"Q": IEX_FIELDS, "T": IEX_FIELDS, "B": IEX_FIELDS},
+    "fx": {"Q": FX_FIELDS},
+    "crypto": {"Q": CRYPTO_QUOTE_FIELDS, "T": CRYPTO_TRADE_FIELDS},
+}
+
+RECORD_NAMES = {
+    ("iex", IEX_FIELDS): "IexUpdate",
+    ("fx", FX_FIELDS): "FxQuote",
+    ("crypto", CRYPTO_QUOTE_FIELDS): "CryptoQuote",
+    ("crypto", CRYPTO_TRADE_FIELDS): "CryptoTrade",
+}
+
+# Position of the ticker in the data array of "A" messages, by endpoint
+TICKER_POSITIONS = {"iex": 3, "fx": 1, "crypto": 1}
+
+# Positions of the ticker, time, price and size of trade ("T") updates, by
+# endpoint. IEX trades carry their time in epoch nanoseconds, crypto trades
+# as an ISO-8601 date.
+TRADE_POSITIONS = {"iex": (3, 2, 9, 10), "crypto": (1, 2, 5, 4)}
+
+BAR_INTERVAL_PATTERN = re.compile(r"^\s*(\d+)\s*(s|sec|min|hour)\s*$", re.IGNORECASE)
+BAR_INTERVAL_UNITS = {"s": 1, "sec": 1, "min": 60, "hour": 3600}
+
+# Later than any epoch nanoseconds, for when no bar is being built
+NO_FLUSH = 2**63 - 1
+
+BATCH_FORMATS = ("records", "columns")
+OVERFLOW_POLICIES = ("block", "drop_oldest", "conflate")
+
+
+def update_fields(endpoint, data):
+    """Return the field names of the data array of an "A" message"""
+    fields = UPDATE_FIELDS.get(endpoint, {}).get(data[0] if data else None)
+    if fields is None or len(fields) != len(data):
+        fields = (fields or ("updateType",))[: len(data)]
+        fields += tuple(
+            "field{}".format(position) for position in range(len(fields), len(data))
+        )
+    return fields
+
+
+def update_key(endpoint, message):
+    """Return the (ticker, updateType) of a decoded "A" message, or None for
+    other messages, so that a trade and a quote of one ticker differ"""
+    if message.get("messageType") != "A":
+        return None
+    try:
+        data = message["data"]
+        return data[TICKER_POSITIONS[endpoint]], data[0]
+    except (KeyError, IndexError, TypeError):
+        return None
+
+
+class MessageQueue(object):
+    """Bounded FIFO queue between the thread receiving websocket messages and
+    the thread delivering them, so a slow consumer doesn't stall the socket.
+
+    When the queue is full, put() either waits for room (overflow="block"),
+    drops the oldest queued message (overflow="drop_oldest"), or, for
+    overflow="conflate", replaces the queued message with the same key,
+    i.e. the queued update of the same ticker and type, with the new one,
+    dropping the oldest message when nothing can be conflated.
+
+    Args:
+        maxsize (int): Most messages held
+        overflow (str): "block", "drop_oldest" or "conflate"
+    """
+
+    def __init__(self, maxsize, overflow="block"):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(
+                "overflow must be one of {}, not {!r}".format(
+                    OVERFLOW_POLICIES, overflow
+                )
+            )
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.overflow = overflow
+
+        self.enqueued = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.conflated = 0
+        self.max_depth = 0
+        self.blocked = 0.0
+
+        # Each queued message is a [key, item] slot, so that a conflated
+        # message is replaced in place and keeps its position.
+        self._slots = deque()
+        self._latest = {}
+        self._condition = threading.Condition()
+        self._closed = False
+
+    def __len__(self):
+        return len(self._slots)
+
+    def put(self, item, key=None):
+        """Queue item, applying the overflow policy when the queue is full.
+        Returns False if the queue was closed"""
+        with self._condition:
+            if self._closed:
+                return False
+            if len(self._slots) >= self.maxsize:
+                slot = self._latest.get(key) if self.overflow == "conflate" else None
+                if slot is not None:
+                    slot[1] = item
+                    self.conflated += 1
+                    return True
+                if self.overflow == "block":
+                    start = time.monotonic()
+                    while len(self._slots) >= self.maxsize and not self._closed:
+                        self._condition.wait()
+                    self.blocked += time.monotonic() - start
+                    if self._closed:
+                        return False
+                else:
+                    self._forget(self._slots.popleft())
+                    self.dropped += 1
+
+            slot = [key, item]
+            self._slots.append(slot)
+            if key is not None:
+                self._latest[key] = slot
+            self.enqueued += 1
+            self.max_depth = max(self.max_depth, len(self._slots))
+            self._condition.notify_all()
+            return True
+
+    def get(self):
+        """Return the oldest item, waiting for one. Returns None once the
+        queue is closed and empty"""
+        with self._condition:
+            while not self._slots:
+                if self._closed:
+                    return None
+                self._condition.wait()
+            slot = self._slots.popleft()
+            self._forget(slot)
+            self.delivered += 1
+            self._condition.notify_all()
+            return slot[1]
+
+    def _forget(self, slot):
+        if slot[0] is not None and self._latest.get(slot[0]) is slot:
+            del self._latest[slot[0]]
+
+    def close(self):
+        """Stop accepting items; get() returns the queued ones, then None"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def stats(self):
+        """Return the queue depth and message counters"""
+        with self._condition:
+            return {
+                "depth": len(self._slots),
+                "max_depth": self.max_depth,
+                "enqueued": self.enqueued,
+                "delivered": self.delivered,
+                "dropped": self.dropped,
+                "conflated": self.conflated,
+                "blocked": self.blocked,
+            }
+
+
+class UpdateBatcher(object):
+    """Collect the data arrays of "A" messages and deliver them in batches.
+
+    A batch is delivered once it holds batch_size updates, or once its oldest
+    update is interval seconds old, whichever comes first. With
+    fmt="records" a batch is a list of namedtuples, one class per update
+    schema; with fmt="columns" it is a dict of column name to numpy array,
+    one dict per update schema in the batch (IEX and fx updates share one
+    schema, crypto quotes and trades don't). Batches are delivered one at a
+    time, in order, from the thread adding the update that fills them or
+    from the interval timer.
+
+    Args:
+        callback (callable): Called with each batch
+        endpoint (str): "iex", "fx" or "crypto"
+        batch_size (int): Updates per batch
+        interval (float): Seconds an update waits for its batch to fill
+        fmt (str): "records" or "columns"
+    """
+
+    def __init__(
+        self, callback, endpoint, batch_size=None, interval=None, fmt="records"
+    ):
+        if fmt not in BATCH_FORMATS:
+            raise ValueError(
+                "batch_format must be one of {}, not {!r}".format(BATCH_FORMATS, fmt)
+            )
+        if fmt == "columns" and not numpy_is_installed:
+            raise InstallNumpyException(
+                "numpy is not installed, but batch_format='columns' was requested. "
+                "Install it with: pip install numpy"
+            )
+        self.callback = callback
+        self.endpoint = endpoint
+        self.batch_size = batch_size
+        self.interval = interval
+        self.fmt = fmt
+
+        self.batches = 0
+        self.updates = 0
+
+        self._size = batch_size or float("inf")
+        self._record_types = {}
+        self._pending = []
+        self._oldest = None
+        self._lock = threading.RLock()
+        self._stopped = threading.Event()
+        self._timer = None
+        if interval:
+            self._timer = threading.Thread(target=self._flush_on_time, daemon=True)
+            self._timer.start()
+
+    def add(self, data):
+        """Queue the data array of one "A" message"""
+        with self._lock:
+            pending = self._pending
+            if not pending:
+                self._oldest = time.monotonic()
+            pending.append(data)
+            if len(pending) >= self._size or (self.interval and self._due()):
+                self._deliver(self._take())
+
+    def flush(self):
+        """Deliver the pending updates now"""
+        with self._lock:
+            self._deliver(self._take())
+
+    def close(self):
+        """Deliver the pending updates and stop the interval timer"""
+        self._stopped.set()
+        self.flush()
+
+    def _due(self):
+        return (
+            self.interval is not None
+            and self._pending
+            and time.monotonic() - self._oldest >= self.interval
+        )
+
+    def _take(self):
+        batch, self._pending = self._pending, []
+        return batch
+
+    def _flush_on_time(self):
+        while not self._stopped.wait(self.interval / 4.0):
+            with self._lock:
+                if self._due():
+                    self._deliver(self._take())
+
+    def _deliver(self, batch):
+        if not batch:
+            return
+        self.batches += 1
+        self.updates += len(batch)
+        if self.fmt == "records":
+            self.callback(self._records(batch))
+        else:
+            for columns in self._columns(batch):
+                self.callback(columns)
+
+    def _record_type(self, data):
+        """Return the namedtuple class of an update, creating it once per
+        update type and length"""
+        key = (data[0], len(data))
+        record_type = self._record_types.get(key)
+        if record_type is None:
+            fields = update_fields(self.endpoint, data)
+            name = RECORD_NAMES.get((self.endpoint, fields), "Update")
+            record_type = self._record_types[key] = get_record_type(name, fields)
+        return record_type
+
+    def _records(self, batch):
+        record_type = self._record_type
+        return [record_type(data)._make(data) for data in batch]
+
+    def _columns(self, batch):
+        """Return a dict of column arrays for each update schema in batch,
+        in the order the schemas first appear"""
+        schemas = {}
+        for data in batch:
+            schemas.setdefault(self._record_type(data)._fields, []).append(data)
+        return [_columns(fields, rows) for fields, rows in schemas.items()]
+
+
+def _columns(fields, rows):
+    values = dict(zip(fields, zip(*rows)))
+    columns = {}
+    for name in fields:
+        if name == "date" and "timestamp" in values:
+            # IEX dates carry a UTC offset, which is slow to parse; the
+            # timestamp field holds the same time in epoch nanoseconds.
+            continue
+        columns[name] = records_to_array(name, list(values[name]))
+    if "timestamp" in columns and columns["timestamp"].dtype.kind == "i":
+        columns["date"] = columns["timestamp"].astype("datetime64[ns]")
+    elif "date" in values and "date" not in columns:
+        columns["date"] = records_to_array("date", list(values["date"]))
+    return {name: columns[name] for name in fields}
+
+
+def interval_seconds(interval):
+    """Return a bar interval, given in seconds or as e.g. "1s", "1min" or
+    "1hour" like get_ticker_price's frequency, in seconds"""
+    if isinstance(interval, str):
+        match = BAR_INTERVAL_PATTERN.match(interval)
+        if match is None:
+            raise ValueError(
+                "Bar interval {!r} should look like 1s, 5min or 1hour".format(interval)
+            )
+        seconds = int(match.group(1)) * BAR_INTERVAL_UNITS[match.group(2).lower()]
+    else:
+        seconds = interval
+    if seconds <= 0:
+        raise ValueError("Bar interval must be positive")
+    return seconds
+
+
+def iso_to_ns(date):
+    """Return an ISO-8601 date with a UTC offset as epoch nanoseconds"""
+    moment = datetime.datetime.fromisoformat(date.replace("Z", "+00:00"))
+    seconds = int(moment.timestamp())
+    return seconds * 1000000000 + moment.microsecond * 1000
+
+
+class BarAggregator(object):
+    """Aggregate trade updates into open/high/low/close/volume bars per ticker.
+
+    The bar being built for each ticker is kept in preallocated typed arrays,
+    one slot per ticker, grown by doubling, so a trade costs a few array
+    updates and no allocation. Bars cover fixed intervals aligned to the
+    epoch (e.g. whole minutes) and are passed to callback as
+    callback(ticker, bar) once they are finished: when a trade of a later
+    interval arrives, or when flush_due() finds them grace seconds past
+    their end. Trades for an interval whose bar was already delivered are
+    counted in late and ignored.
+
+    Bars have the schema of get_ticker_price rows for intraday frequencies,
+    requested with columns="open,high,low,close,volume":
+
+        {"date": "2019-01-30T18:03:00.000Z", "open": 165.2, "high": 165.5,
+         "low": 165.1, "close": 165.4, "volume": 1200}
+
+    Args:
+        callback (callable): Called with the ticker and each finished bar
+        interval: Bar length, in seconds or as e.g. "1s", "1min", "5min"
+        grace (float): Seconds flush_due() waits past the end of a bar for
+            late trades
+        capacity (int): Tickers to preallocate room for
+    """
+
+    def __init__(self, callback, interval="1min", grace=2.0, capacity=1024):
+        self.callback = callback
+        self.interval = interval_seconds(interval)
+        self.grace = grace
+
+        self.trades = 0
+        self.bars = 0
+        self.late = 0
+
+        self._interval_ns = int(self.interval * 1000000000)
+        self._grace_ns = int(grace * 1000000000)
+        self._next_flush = NO_FLUSH  # When flush_due() next has bars to deliver
+        self._slots = {}
+        self._tickers = []
+        self._start = array("q", [-1]) * capacity  # -1 when no bar is open
+        self._emitted = array("q", [-1]) * capacity
+        self._open = array("d", [0.0]) * capacity
+        self._high = array("d", [0.0]) * capacity
+        self._low = array("d", [0.0]) * capacity
+        self._close = array("d", [0.0]) * capacity
+        self._volume = array("d", [0.0]) * capacity
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        """Number of tickers with a bar being built"""
+        return sum(1 for start in self._start[: len(self._tickers)] if start >= 0)
+
+    def _slot(self, ticker):
+        slot = self._slots[ticker] = len(self._tickers)
+        self._tickers.append(ticker)
+        if slot == len(self._start):
+            for values in (self._start, self._emitted):
+                values.extend(array("q", [-1]) * len(values))
+            for values in (self._open, self._high, self._low, self._close):
+                values.extend(array("d", [0.0]) * len(values))
+            self._volume.extend(array("d", [0.0]) * len(self._volume))
+        return slot
+
+    def update(self, endpoint, data):
+        """Aggregate the data array of an "A" message, if it is a trade"""
+        positions = TRADE_POSITIONS.get(endpoint)
+        if positions is None or not data or data[0] != "T":
+            return
+        ticker, moment, price, size = positions
+        price = data[price]
+        if price is None:
+            return
+        moment = data[moment]
+        if not isinstance(moment, int):
+            moment = iso_to_ns(moment)
+        self.add_trade(data[ticker], moment, price, data[size] or 0)
+
+    def add_trade(self, ticker, timestamp, price, size):
+        """Aggregate one trade, at timestamp epoch nanoseconds"""
+        with self._lock:
+            self.trades += 1
+            slot = self._slots.get(ticker)
+            if slot is None:
+                slot = self._slot(ticker)
+            start = timestamp - timestamp % self._interval_ns
+            current = self._start[slot]
+            if start == current:
+                if price > self._high[slot]:
+                    self._high[slot] = price
+                elif price < self._low[slot]:
+                    self._low[slot] = price
+                self._close[slot] = price
+                self._volume[slot] += size
+                return
+            if start < current or start <= self._emitted[slot]:
+                self.late += 1
+                return
+            if current >= 0:
+                self._emit(slot)
+            self._start[slot] = start
+            due = start + self._interval_ns + self._grace_ns
+            if due < self._next_flush:
+                self._next_flush = due
+            self._open[slot] = self._high[slot] = self._low[slot] = price
+            self._close[slot] = price
+            self._volume[slot] = size
+
+    def flush_due(self, now=None):
+        """Deliver the bars that ended more than grace seconds before now
+        (epoch nanoseconds, defaults to the current time)"""
+        if now is None:
+            now = time.time_ns()
+        if now < self._next_flush:
+            return
+        with self._lock:
+            cutoff = now - self._grace_ns - self._interval_ns
+            next_flush = NO_FLUSH
+            for slot in range(len(self._tickers)):
+                start = self._start[slot]
+                if 0 <= start <= cutoff:
+                    self._emit(slot)
+                elif start >= 0:
+                    next_flush = min(
+                        next_flush, start + self._interval_ns + self._grace_ns
+                    )
+            self._next_flush = next_flush
+
+    def flush(self):
+        """Deliver every bar being built, finished or not"""
+        with self._lock:
+            for slot in range(len(self._tickers)):
+                if self._start[slot] >= 0:
+                    self._emit(slot)
+
+    def _emit(self, slot):
+        start = self._start[slot]
+        self._emitted[slot] = start
+        self._start[slot] = -1
+        self.bars += 1
+        volume = self._volume[slot]
+        self.callback(
+            self._tickers[slot],
+            {
+                "date": _iso_from_ns(start),
+                "open": self._open[slot],
+                "high": self._high[slot],
+                "low": self._low[slot],
+                "close": self._close[slot],
+                "volume": int(volume) if volume.is_integer() else volume,
+            },
+        )
+
+
+def _iso_from_ns(timestamp):
+    seconds, nanoseconds = divmod(timestamp, 1000000000)
+    moment = datetime.datetime.fromtimestamp(seconds, datetime.timezone.utc)
+    return "{}.{:03d}Z".format(
+        moment.strftime("%Y-%m-%dT%H:%M:%S"), nanoseconds // 1000000
+    )